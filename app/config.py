@@ -1,4 +1,5 @@
 # app/config.py
+import os
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
@@ -17,7 +18,98 @@ class Settings(BaseSettings):
     cors_origins: list[str] = ["*"]   # Lista de orígenes permitidos
     api_key_salt: str = "llave_super_secreta"   # la key de la api
 
-    @field_validator("cors_origins", mode="before")
+    # False para workers solo-CRUD: no se cargan YOLO/EasyOCR
+    vision_habilitada: bool = True
+
+    # "local": modelos y cámaras en este proceso. "remoto": los tiene el worker de
+    # visión (python -m app.vision.worker) y la API le habla por IPC local
+    vision_modo: str = "local"
+    vision_ipc: str = r"\\.\pipe\park-iot-vision" if os.name == "nt" else "/tmp/park-iot-vision.sock"
+    vision_ipc_clave: str = "park-iot-vision"
+    vision_ipc_timeout_s: float = 30.0
+
+    # Captura: un hilo por cámara activa con los últimos frames en memoria
+    camaras_persistentes: bool = True
+    camaras_buffer_frames: int = 10
+
+    # Modo continuo (Camara.modo_continuo): YOLO solo cuando hay movimiento
+    continuo_intervalo_ms: float = 100          # cada cuánto se revisa movimiento
+    continuo_umbral_movimiento: float = 0.02    # fracción de píxeles que cambian
+    continuo_post_movimiento_s: float = 2.0     # se sigue leyendo un rato tras el movimiento
+    continuo_debounce_s: float = 10.0           # misma placa en esta ventana = mismo auto
+    continuo_min_confianza: float = 0.5
+
+    # Inferencia (YOLO + OCR) fuera del event loop
+    inferencia_workers: int = 1
+    inferencia_cola_max: int = 4      # trabajos en espera antes de responder 503
+    inferencia_retry_after: int = 2   # segundos sugeridos en el header Retry-After
+    porteria_hilos: int = 4           # cámaras sin buffer que una portería abre a la vez (entre todas las capturas)
+
+    # Detector de placas: "torch" (ultralytics) u "onnx" (ONNX Runtime, CPU)
+    detector_backend: str = "torch"
+    detector_modelo: str = "app/vision/modelo/license_plate_detector.pt"
+    detector_onnx_modelo: str = "app/vision/modelo/license_plate_detector.onnx"
+    detector_int8: bool = False       # usa license_plate_detector.int8.onnx
+    detector_proveedores: list[str] = ["CPUExecutionProvider"]   # p.ej. OpenVINOExecutionProvider
+    detector_hilos: int = 0           # 0 = lo que decida ONNX Runtime
+    detector_imgsz: int = 640         # lado de entrada de YOLO (múltiplo de 32); la ROI se reduce a esto
+
+    # Recarga en caliente de modelos (POST /modelos/recargar y vigilante del archivo del detector)
+    recarga_vigilar_s: float = 10.0       # cada cuánto se revisa el archivo (0 = sin vigilante)
+    recarga_muestras: int = 50            # capturas guardadas para la paridad
+    recarga_recall_min: float = 0.9       # cajas del modelo actual que el candidato debe encontrar
+    recarga_tolerancia: float = 0.02      # cuánto puede bajar el acierto contra la placa guardada
+    recarga_sombra_fraccion: float = 0.1  # lecturas reales que también lee el candidato en sombra
+
+    # Motor OCR: "easyocr" o "segmentacion" (liviano, solo formato AAA-999)
+    ocr_backend: str = "easyocr"
+    ocr_solo_placa: bool = False      # true: EasyOCR limitado a A-Z0-9
+    ocr_plantillas: str = "app/vision/modelo/caracteres.npz"
+
+    # Micro-lotes de YOLO: solo se usan con inferencia_workers > 1 (con un solo hilo
+    # de inferencia no pueden llegar frames concurrentes y esperar solo suma latencia)
+    yolo_lote_max: int = 4
+    yolo_lote_espera_ms: float = 5.0
+
+    # Votación entre varios frames de una ráfaga
+    votacion_frames_max: int = 10
+    votacion_umbral: float = 0.8
+
+    # Calidad de frame (nitidez x exposición, 0-1, ver app/vision/calidad.py): bajo calidad_min
+    # el frame no pasa a YOLO/OCR (0 = sin filtro); una captura elige el mejor de calidad_candidatos
+    calidad_min: float = 0.25
+    calidad_candidatos: int = 3
+
+    # Preprocesado en cascada: se prueba cada nivel (0 = gris, 1 = amarillo->blanco + Otsu)
+    # en orden y solo se pasa al siguiente si el OCR no da confianza suficiente o formato AAA999
+    procesamiento_niveles: list[float] = [0.0, 0.4, 1.0]
+    procesamiento_min_confianza: float = 0.6
+
+    # Imágenes subidas por cámaras de red (ESP32-CAM)
+    subida_max_bytes: int = 2_000_000   # por imagen; más grande responde 413
+
+    # Imágenes de capturas (se escriben en segundo plano)
+    imagenes_formato: str = "jpg"     # jpg | webp | png
+    imagenes_calidad: int = 90        # calidad JPEG/WebP (1-100)
+    imagenes_dir_completas: str = "app/vision/capturas/capturas_completas"
+    imagenes_dir_recortes: str = "app/vision/capturas/placas_procesadas"
+
+    # Retención de imágenes (hilo en segundo plano, ver app/vision/almacen_imagenes.py)
+    imagenes_retencion: bool = True
+    imagenes_retencion_intervalo_min: float = 60
+    imagenes_compactar_dias: int = 7      # pasado esto la imagen completa se reduce (0 = nunca)
+    imagenes_compactar_ancho: int = 960
+    imagenes_compactar_calidad: int = 60
+    imagenes_recortes_dias: int = 30      # pasado esto se borran los recortes (0 = nunca)
+    imagenes_completas_dias: int = 0      # pasado esto se borran las completas (0 = nunca)
+    imagenes_presupuesto_mb: int = 2048   # tope de disco para ambas carpetas (0 = sin tope)
+
+    # Cache de OCR por hash perceptual del recorte (0 la desactiva)
+    ocr_cache_max: int = 256
+    ocr_cache_ttl_s: float = 30.0
+    ocr_cache_distancia: int = 4      # distancia de Hamming máxima entre hashes
+
+    @field_validator("cors_origins", "detector_proveedores", "procesamiento_niveles", mode="before")
     @classmethod
     def split_csv(cls, v):
         # Permite CORS_ORIGINS="http://localhost:5173,http://localhost:3000" o "*"
@@ -28,6 +120,25 @@ class Settings(BaseSettings):
             return [s.strip() for s in v.split(",") if s.strip()]
         return v
 
+    def ruta_detector(self) -> str:
+        """Ruta del modelo según el backend elegido."""
+        if self.detector_backend != "onnx":
+            return self.detector_modelo
+        if self.detector_int8:
+            base, ext = os.path.splitext(self.detector_onnx_modelo)
+            return f"{base}.int8{ext}"
+        return self.detector_onnx_modelo
+
+    def opciones_detector(self) -> dict:
+        if self.detector_backend != "onnx":
+            return {"imgsz": self.detector_imgsz}
+        return {"proveedores": self.detector_proveedores, "hilos": self.detector_hilos, "imgsz": self.detector_imgsz}
+
+    def opciones_ocr(self) -> dict:
+        if self.ocr_backend == "segmentacion":
+            return {"plantillas_path": self.ocr_plantillas}
+        return {"solo_placa": self.ocr_solo_placa}
+
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
@@ -1,6 +1,7 @@
 # app/db.py
 from sqlmodel import SQLModel, Session, create_engine
-from sqlalchemy import event
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.engine import Engine
 from .config import get_settings
 from .models import (
@@ -23,8 +24,48 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     except Exception:
         pass
 
+def _agregar_columnas_faltantes():
+    """
+    create_all no modifica tablas existentes: agrega como columnas nulables
+    (con su default si es un valor fijo) los campos nuevos de los modelos,
+    para no tener que borrar app.db en cada actualización.
+    Con varios procesos arrancando a la vez (uvicorn --workers N y el worker de
+    visión) otro puede agregar la columna primero: ese error se ignora.
+    """
+    insp = inspect(engine)
+    for tabla in SQLModel.metadata.sorted_tables:
+        if not insp.has_table(tabla.name):
+            continue
+        existentes = {c["name"] for c in insp.get_columns(tabla.name)}
+        for col in tabla.columns:
+            if col.name in existentes:
+                continue
+            ddl = f"ALTER TABLE {tabla.name} ADD COLUMN {col.name} {col.type.compile(dialect=engine.dialect)}"
+            default = col.default.arg if col.default is not None and col.default.is_scalar else None
+            if isinstance(default, bool):
+                ddl += f" DEFAULT {int(default)}"
+            elif isinstance(default, (int, float)):
+                ddl += f" DEFAULT {default}"
+            elif isinstance(default, str):
+                ddl += " DEFAULT '" + default.replace("'", "''") + "'"
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            except (OperationalError, ProgrammingError) as e:
+                if "duplicate column" not in str(e).lower() and "already exists" not in str(e).lower():
+                    raise
+                continue
+            print(f"Columna agregada: {tabla.name}.{col.name}")
+
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    try:
+        SQLModel.metadata.create_all(engine)
+    except OperationalError as e:
+        # Otro proceso creó la tabla entre la revisión y el CREATE: la segunda pasada ya la ve
+        if "already exists" not in str(e).lower():
+            raise
+        SQLModel.metadata.create_all(engine)
+    _agregar_columnas_faltantes()
 
 def get_session():
     with Session(engine) as session:
@@ -0,0 +1,52 @@
+# app/lecturas.py
+"""
+Persistencia de LecturaPlaca, compartida por la API y el worker de visión
+(modo continuo). Las rutas de imagen pueden llegar ya resueltas (str) o como
+Future del EscritorImagenes, que se completa cuando la escritura es durable.
+"""
+from concurrent.futures import Future
+from datetime import datetime
+from functools import partial
+
+from sqlmodel import Session
+
+from .db import engine
+from .models.lectura_placa import LecturaPlaca
+
+
+def _completar_ruta(lectura_id: int, campo: str, fut) -> None:
+    # Callback del EscritorImagenes: corre en su hilo cuando el archivo ya está en disco
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    with Session(engine) as session:
+        lectura = session.get(LecturaPlaca, lectura_id)
+        if lectura is None:
+            return
+        setattr(lectura, campo, fut.result())
+        session.add(lectura)
+        session.commit()
+
+def guardar_lectura(session: Session, camara_id: int, texto_placa: str, confianza: float,
+                     ruta_full=None, ruta_rec=None, nivel_procesamiento=None, calidad=None) -> LecturaPlaca:
+    """
+    Guarda la LecturaPlaca de inmediato. ruta_imagen/ruta_recorte pueden ser
+    Future del EscritorImagenes: en ese caso se completan cuando la escritura es durable.
+    """
+    rutas = {"ruta_imagen": ruta_full, "ruta_recorte": ruta_rec}
+    lectura = LecturaPlaca(
+        camara_id=camara_id,
+        placa_detectada=texto_placa,
+        ts=datetime.now(),
+        confianza=confianza,
+        nivel_procesamiento=nivel_procesamiento,
+        calidad=calidad,
+        **{campo: r for campo, r in rutas.items() if isinstance(r, str)},
+    )
+    session.add(lectura)
+    session.commit()
+    session.refresh(lectura)
+
+    for campo, fut in rutas.items():
+        if isinstance(fut, Future):
+            fut.add_done_callback(partial(_completar_ruta, lectura.id, campo))
+    return lectura
@@ -1,25 +1,27 @@
 # app/main.py
-from fastapi import FastAPI, status, Depends
+from fastapi import FastAPI, status, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
 from .config import get_settings, Settings
-from .routers import parqueadero, zonas, palancas, sensores, visitas, camaras, vehiculos
-from .db import create_db_and_tables
+from .routers import parqueadero, zonas, palancas, sensores, visitas, camaras, vehiculos, modelos
+from .db import create_db_and_tables, engine
 from contextlib import asynccontextmanager
-from app.vision.lector_placas import LectorPlacas
+from app.vision.cargador import LISTO, DESHABILITADO
+from app.vision.metricas import MetricasVision
+from app.vision.servicio import crear_servicio_vision
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()   # *** Inicialización de la BD ***
-    print("Cargando modelo de IA...")
-    app.state.lector = LectorPlacas(
-        guardar_img=True,
-        nivel_procesamiento=0.4,
-        use_gpu=False, 
-        model_path="app/vision/modelo/license_plate_detector.pt"
-    )
-    print("Modelo de Detección de Placas cargado en memoria (GPU/CPU).")
+    cfg = get_settings()
+    app.state.metricas = MetricasVision()
+    # Modelos, cámaras, índice de placas e inferencia: en este proceso o en el worker de visión (vision_modo)
+    app.state.vision = crear_servicio_vision(cfg, app.state.metricas)
+    app.state.vision.iniciar()
     yield
     print("Liberando recursos de IA...")
+    app.state.vision.cerrar()
 
 def create_app() -> FastAPI:
     cfg = get_settings()
@@ -41,7 +43,50 @@ def create_app() -> FastAPI:
     @app.get("/health", status_code=status.HTTP_200_OK)
     def health():
         return {"status": "ok"}
+
+    @app.get("/ready")
+    def ready(request: Request):
+        """Readiness: estado de la BD y de cada modelo de visión. 503 mientras algo no esté listo."""
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            db = "ok"
+        except Exception:
+            db = "error"
+
+        estados, error = request.app.state.vision.estado()
+        componentes = {"db": db, **estados}
+        listo = db == "ok" and all(e in (LISTO, DESHABILITADO) for e in estados.values())
+        cuerpo = {"status": "ready" if listo else "not_ready", "componentes": componentes}
+        if error:
+            cuerpo["error"] = error
+        return JSONResponse(
+            cuerpo,
+            status_code=status.HTTP_200_OK if listo else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
     
+    @app.get("/metricas")
+    def metricas(request: Request):
+        """
+        Histogramas de tiempo por cámara y etapa de la lectura de placas
+        (open_camera, grab_frame, queue, detect, ocr, persist, write, db, ...),
+        más la cache de OCR y la ocupación del ejecutor de inferencia.
+        """
+        vision = request.app.state.vision
+        datos = vision.metricas_vision()
+        if vision.remoto:
+            # El worker mide captura/IA; la API solo "db"
+            camaras = datos.setdefault("camaras", {})
+            for camara_id, etapas in request.app.state.metricas.resumen().items():
+                camaras.setdefault(camara_id, {}).update(etapas)
+        return datos
+
+    @app.delete("/metricas", status_code=status.HTTP_204_NO_CONTENT)
+    def reiniciar_metricas(request: Request):
+        request.app.state.metricas.reiniciar()
+        if request.app.state.vision.remoto:
+            request.app.state.vision.reiniciar_metricas()
+
     @app.get("/config")
     def show_config(setting:Settings = Depends(get_settings)):
         return {
@@ -58,6 +103,7 @@ def create_app() -> FastAPI:
     app.include_router(sensores.router)
     app.include_router(visitas.router)
     app.include_router(camaras.router)
+    app.include_router(modelos.router)
     return app
 
 
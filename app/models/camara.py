@@ -11,7 +11,23 @@ class Camara(SQLModel, table=True):
     device_index: Optional[int] = Field(
         default=None, description="Índice de dispositivo (ej. 0 o 1 en OpenCV)"
     )
+    fuente: Optional[str] = Field(
+        default=None, max_length=255,
+        description="URI de la fuente: 'usb:0', 'rtsp://...', 'http://.../video', 'archivo:video.mp4' o 'carpeta:fotos/'. Si falta se usa device_index"
+    )
     ubicacion: Optional[str] = Field(
         default=None, description="Etiqueta libre, p.ej. 'ENTRADA' o 'SALIDA'"
     )
     activo: bool = Field(default=True)
+
+    modo_continuo: bool = Field(
+        default=False, description="Detecta placas por su cuenta cuando hay movimiento"
+    )
+    roi_movimiento: Optional[str] = Field(
+        default=None, max_length=60,
+        description="Región 'x1,y1,x2,y2' (fracciones 0-1) donde se busca movimiento"
+    )
+    roi_deteccion: Optional[str] = Field(
+        default=None, max_length=60,
+        description="Región 'x1,y1,x2,y2' (fracciones 0-1) donde YOLO busca la placa (carril fijo)"
+    )
@@ -15,5 +15,11 @@ class LecturaPlaca(SQLModel, table=True):
     confianza: float = Field(ge=0.0, le=1.0)
     ruta_imagen: Optional[str] = Field(default=None, max_length=255)
     ruta_recorte: Optional[str] = Field(default=None, max_length=255)
+    nivel_procesamiento: Optional[float] = Field(
+        default=None, description="Nivel de la cascada de preprocesado que dio la lectura"
+    )
+    calidad: Optional[float] = Field(
+        default=None, description="Puntaje de calidad del recorte leído (nitidez, exposición, tamaño)"
+    )
     ts: datetime = Field(default_factory=datetime.now)
 
@@ -1,14 +1,23 @@
 # app/routers/camaras.py
-from datetime import datetime, timezone
+import time
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status, Request
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status, Request, Response
+from sqlmodel import Session, select, col, func
+from starlette.datastructures import UploadFile
 
+from ..config import get_settings
 from ..db import get_session
+from ..lecturas import guardar_lectura
 from ..models.camara import Camara
 from ..models.lectura_placa import LecturaPlaca  # <--- [NUEVO IMPORT]
-from ..schemas.camara import CamaraCreate, CamaraUpdate, CamaraRead
+from ..schemas.camara import (
+    CamaraCreate, CamaraUpdate, CamaraRead, LecturaCapturaRead, EvidenciaCamaraRead, CapturaPorteriaRead,
+)
+from ..vision.ejecutor import ColaLlena
+from ..vision.fuentes import uri_fuente
+from ..vision.metricas import server_timing
+from ..vision.servicio import VisionNoLista
 
 router = APIRouter(prefix="/camaras", tags=["camaras"])
 
@@ -18,13 +27,104 @@ def _get(session: Session, camara_id: int) -> Camara:
         raise HTTPException(status_code=404, detail="Cámara no encontrada")
     return c
 
+def _sincronizar_lector(request: Request, c: Camara) -> None:
+    # Mantiene el hilo de captura (y el modo continuo) de la cámara acorde a su estado en BD
+    request.app.state.vision.sincronizar_camara(c)
+
+async def _imagenes_subidas(request: Request, max_imagenes: int) -> List[bytes]:
+    """Lee las imágenes del cuerpo: JPEG crudo (image/jpeg) o multipart/form-data con uno o más archivos."""
+    cfg = get_settings()
+    # Tope del cuerpo completo antes de leerlo (margen para los encabezados de multipart)
+    limite = cfg.subida_max_bytes * max_imagenes + 64 * 1024
+    largo = request.headers.get("content-length")
+    if largo is not None and largo.isdigit() and int(largo) > limite:
+        raise HTTPException(status_code=413, detail=f"Cada imagen debe pesar máximo {cfg.subida_max_bytes} bytes")
+    tipo = request.headers.get("content-type", "")
+    if tipo.startswith("multipart/form-data"):
+        try:
+            form = await request.form(max_files=max_imagenes)
+        except AssertionError:
+            # Starlette exige python-multipart solo para parsear formularios
+            raise HTTPException(status_code=415, detail="Multipart no disponible: instala python-multipart o envía image/jpeg")
+        imagenes = [await v.read() for _, v in form.multi_items() if isinstance(v, UploadFile)]
+    else:
+        # Sin Content-Length (chunked) se corta apenas pasa el tope, sin cargarlo entero
+        cuerpo = bytearray()
+        async for parte in request.stream():
+            cuerpo += parte
+            if len(cuerpo) > cfg.subida_max_bytes:
+                raise HTTPException(status_code=413, detail=f"Cada imagen debe pesar máximo {cfg.subida_max_bytes} bytes")
+        imagenes = [bytes(cuerpo)] if cuerpo else []
+
+    if not imagenes:
+        raise HTTPException(status_code=400, detail="No se recibió ninguna imagen")
+    if len(imagenes) > max_imagenes:
+        raise HTTPException(status_code=400, detail=f"Máximo {max_imagenes} imágenes por solicitud")
+    if any(len(d) > cfg.subida_max_bytes for d in imagenes):
+        raise HTTPException(status_code=413, detail=f"Cada imagen debe pesar máximo {cfg.subida_max_bytes} bytes")
+    return imagenes
+
+async def _inferir(request: Request, lectura):
+    """Espera la lectura del servicio de visión; sin modelos o con la cola llena responde 503."""
+    try:
+        return await lectura
+    except VisionNoLista as e:
+        detalle = str(e)
+    except ColaLlena:
+        detalle = "Lector de placas ocupado, intenta de nuevo"
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detalle,
+        headers={"Retry-After": str(get_settings().inferencia_retry_after)},
+    )
+
+def _responder_lecturas(request: Request, response: Response, session: Session, camara_id: int,
+                        resultado: dict, tiempos: dict, incluir_tiempos: bool = False) -> List[LecturaCapturaRead]:
+    inicio = time.perf_counter()
+    respuesta = _guardar_o_fallar(session, camara_id, resultado)
+    tiempos["db"] = (time.perf_counter() - inicio) * 1000
+    request.app.state.metricas.observar(camara_id, "db", tiempos["db"])
+    if incluir_tiempos:
+        response.headers["Server-Timing"] = server_timing(tiempos)
+    return respuesta
+
+def _guardar_o_fallar(session: Session, camara_id: int, resultado: dict) -> List[LecturaCapturaRead]:
+    estado = resultado["estado"]
+    if estado == "ERR_CAM":
+        raise HTTPException(status_code=500, detail=f"No se pudo conectar a la cámara {camara_id}")
+    elif estado == "ERR_FRAME":
+        raise HTTPException(status_code=500, detail="La cámara no devolvió imagen")
+    elif estado == "ERR_IMAGEN":
+        raise HTTPException(status_code=422, detail="No se pudo decodificar la imagen (se espera JPEG o PNG)")
+    elif estado == "NO DETECTADO":
+        guardar_lectura(session, camara_id, estado, 0.0, resultado["ruta_imagen"])
+        raise HTTPException(status_code=500, detail="No se detectó una placa en la imagen o la placa detectada no contenía texto") 
+
+    return _guardar_lecturas(session, camara_id, resultado)
+
+def _guardar_lecturas(session: Session, camara_id: int, resultado: dict) -> List[LecturaCapturaRead]:
+    # Una fila por placa; todas comparten la imagen completa del frame.
+    # vehiculo_id lo resuelve el servicio de visión con su índice de placas
+    respuesta = []
+    for l in resultado["lecturas"]:
+        fila = guardar_lectura(session, camara_id, l["placa"], l["confianza"],
+                               resultado["ruta_imagen"], l["ruta_recorte"], l["nivel_procesamiento"], l["calidad"])
+        respuesta.append(LecturaCapturaRead(
+            id=fila.id, placa=l["placa"], confianza=l["confianza"],
+            confianza_deteccion=l["confianza_deteccion"], bbox=l["bbox"],
+            nivel_procesamiento=l["nivel_procesamiento"], calidad=l["calidad"],
+            vehiculo_id=l["vehiculo_id"],
+        ))
+    return respuesta
+
 # ---------------------- CRUD ----------------------
 @router.post("", response_model=CamaraRead, status_code=status.HTTP_201_CREATED)
-def crear_camara(payload: CamaraCreate, session: Session = Depends(get_session)):
+def crear_camara(payload: CamaraCreate, request: Request, session: Session = Depends(get_session)):
     nueva = Camara(**payload.model_dump())
     session.add(nueva)
     session.commit()
     session.refresh(nueva)
+    _sincronizar_lector(request, nueva)
     return CamaraRead.model_validate(nueva, from_attributes=True)
 
 
@@ -51,6 +151,12 @@ def listar_camaras(
     return [CamaraRead.model_validate(x, from_attributes=True) for x in filas]
 
 
+@router.get("/cache-ocr")
+def estadisticas_cache_ocr(request: Request):
+    """Contadores de la cache de lecturas OCR (aciertos, fallos, desalojos, tamaño)."""
+    return request.app.state.vision.estadisticas_cache_ocr()
+
+
 @router.get("/{camara_id}", response_model=CamaraRead)
 def detalle_camara(
     camara_id: int = Path(ge=1),
@@ -62,6 +168,7 @@ def detalle_camara(
 
 @router.patch("/{camara_id}", response_model=CamaraRead)
 def actualizar_camara(
+    request: Request,
     camara_id: int = Path(ge=1),
     payload: CamaraUpdate = ...,
     session: Session = Depends(get_session),
@@ -75,69 +182,184 @@ def actualizar_camara(
     session.add(c)
     session.commit()
     session.refresh(c)
+    _sincronizar_lector(request, c)
     return CamaraRead.model_validate(c, from_attributes=True)
 
 
 @router.delete("/{camara_id}", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_camara(
+    request: Request,
     camara_id: int = Path(ge=1),
     session: Session = Depends(get_session),
 ):
     c = _get(session, camara_id)
     session.delete(c)
     session.commit()
+    request.app.state.vision.detener_camara(camara_id)
     return
 
 
 # ---------------------- captura ----------------------
-@router.post("/{id_camara}/capturar")
+# Antes de /{id_camara}/... para que 'porteria' no se tome como id
+@router.post("/porteria/capturar", response_model=CapturaPorteriaRead)
+async def capturar_porteria(
+    request: Request,
+    response: Response,
+    camaras: Optional[List[int]] = Query(default=None, description="Ids de las cámaras de la portería"),
+    ubicacion: Optional[str] = Query(default=None, description="O todas las cámaras activas con esta ubicación (p.ej. ENTRADA)"),
+    antes_ms: Optional[int] = Query(
+        default=None, ge=0,
+        description="Usa el frame tomado este número de ms antes del disparo (si la cámara tiene buffer)"
+    ),
+    tiempos: bool = Query(default=False, description="Devuelve el tiempo de cada etapa en el header Server-Timing"),
+    session: Session = Depends(get_session),
+):
+    """
+    Un evento de portería con varias cámaras (p.ej. delantera y trasera del carril):
+    toma un frame de todas a la vez, las detecta en un solo lote y devuelve una
+    placa conciliada más lo que vio cada cámara. La latencia es la de la cámara
+    más lenta, no la suma. Se guarda una LecturaPlaca por placa y cámara como en /capturar.
+    """
+    t_disparo = time.monotonic()
+    stmt = select(Camara).where(Camara.activo == True)
+    if camaras:
+        stmt = stmt.where(col(Camara.id).in_(camaras))
+    elif ubicacion:
+        stmt = stmt.where(func.upper(Camara.ubicacion) == ubicacion.strip().upper())
+    else:
+        raise HTTPException(status_code=400, detail="Indica 'camaras' o 'ubicacion'")
+    encontradas = session.exec(stmt.order_by(Camara.id)).all()
+    if not encontradas:
+        raise HTTPException(status_code=404, detail="No hay cámaras activas para esa portería")
+
+    resultado, medidos = await _inferir(
+        request,
+        request.app.state.vision.capturar_porteria([(c.id, uri_fuente(c)) for c in encontradas], t_disparo, antes_ms),
+    )
+    if all(cam["estado"] == "ERR_FRAME" for cam in resultado["camaras"]):
+        raise HTTPException(status_code=500, detail="Ninguna cámara de la portería devolvió imagen")
+
+    inicio = time.perf_counter()
+    evidencia = []
+    for cam in resultado["camaras"]:
+        lecturas = []
+        if cam["estado"] == "NO DETECTADO":
+            guardar_lectura(session, cam["camara_id"], cam["estado"], 0.0, cam["ruta_imagen"])
+        elif cam["estado"] == "OK":
+            lecturas = _guardar_lecturas(session, cam["camara_id"], cam)
+        evidencia.append(EvidenciaCamaraRead(camara_id=cam["camara_id"], estado=cam["estado"], lecturas=lecturas))
+    medidos["db"] = (time.perf_counter() - inicio) * 1000
+    request.app.state.metricas.observar("porteria", "db", medidos["db"])
+    if tiempos:
+        response.headers["Server-Timing"] = server_timing(medidos)
+
+    return CapturaPorteriaRead(
+        placa=resultado["placa"],
+        confianza=resultado["confianza"],
+        vehiculo_id=resultado["vehiculo_id"],
+        camaras_coinciden=resultado["camaras_coinciden"],
+        camaras=evidencia,
+    )
+
+
+@router.post("/{id_camara}/capturar", response_model=List[LecturaCapturaRead])
 async def capturar_placa_camara(
     id_camara: int, 
     request: Request,                   # Necesario para acceder a la IA cargada en memoria
+    response: Response,
+    antes_ms: Optional[int] = Query(
+        default=None, ge=0,
+        description="Usa el frame tomado este número de ms antes del disparo (si la cámara tiene buffer)"
+    ),
+    frames: int = Query(
+        default=1, ge=1,
+        description="Frames de la ráfaga a leer y fusionar por votación (1 = lectura simple)"
+    ),
+    tiempos: bool = Query(default=False, description="Devuelve el tiempo de cada etapa en el header Server-Timing"),
     session: Session = Depends(get_session) # Necesario para guardar en la BD
 ):
     """
     Captura foto, detecta placa con IA, guarda el resultado en la BD y devuelve el resultado.
+    Si la cámara tiene un lector persistente se usa su buffer en vez de abrir el dispositivo.
+    La IA corre en el ejecutor de inferencia; si está saturado responde 503 con Retry-After.
+    Se guarda una LecturaPlaca por cada placa del frame y se devuelven todas con su caja.
+    Con frames > 1 se sigue la mejor placa de la ráfaga y se guarda una sola lectura con el texto fusionado.
     """
+    t_disparo = time.monotonic()
     print(f"Buscando cámara con id [{id_camara}] ...")
     c = _get(session, id_camara)
-    lector = request.app.state.lector
-    texto_placa, confianza, ruta_full, ruta_rec = lector.capturar_placa(c.device_index)
-    
-    if texto_placa == "ERR_CAM":
-        raise HTTPException(status_code=500, detail=f"No se pudo conectar a la cámara {id_camara}")
-    elif texto_placa == "ERR_FRAME":
-        raise HTTPException(status_code=500, detail="La cámara no devolvió imagen")
-    elif texto_placa == "NO DETECTADO":
-        lectura_mala = LecturaPlaca(
-        camara_id=id_camara,
-        placa_detectada=texto_placa,
-        ts=datetime.now(),
-        confianza=confianza,
-        ruta_imagen=ruta_full,        
-        ruta_recorte=ruta_rec         
-    )
-    
-        session.add(lectura_mala)
-        session.commit()
-        session.refresh(lectura_mala)
-        raise HTTPException(status_code=500, detail="No se detectó una placa en la imagen o la placa detectada no contenía texto") 
 
-    nueva_lectura = LecturaPlaca(
-        camara_id=id_camara,
-        placa_detectada=texto_placa,
-        ts=datetime.now(),
-        confianza=confianza,
-        ruta_imagen=ruta_full,        # Guardamos la ruta de la foto completa
-        ruta_recorte=ruta_rec         # Guardamos la ruta del recorte (opcional)
+    resultado, medidos = await _inferir(
+        request, request.app.state.vision.capturar(c.id, uri_fuente(c), t_disparo, antes_ms, frames)
     )
-    
-    session.add(nueva_lectura)
-    session.commit()
-    session.refresh(nueva_lectura)
-    
-    # 5. Responder al cliente
-    return texto_placa
+    return _responder_lecturas(request, response, session, id_camara, resultado, medidos, tiempos)
+
+
+# Documenta el cuerpo en /docs (se lee a mano para aceptar JPEG crudo o multipart)
+_CUERPO_IMAGEN = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+            "multipart/form-data": {
+                "schema": {"type": "object", "properties": {"imagen": {"type": "string", "format": "binary"}}}
+            },
+        },
+    }
+}
+
+_CUERPO_IMAGENES = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"imagenes": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            },
+        },
+    }
+}
+
+
+@router.post("/{id_camara}/imagen", response_model=List[LecturaCapturaRead], openapi_extra=_CUERPO_IMAGEN)
+async def subir_imagen_camara(
+    id_camara: int,
+    request: Request,
+    response: Response,
+    tiempos: bool = Query(default=False, description="Devuelve el tiempo de cada etapa en el header Server-Timing"),
+    session: Session = Depends(get_session),
+):
+    """
+    Para cámaras de red (ESP32-CAM) que no se pueden abrir con VideoCapture:
+    reciben la foto por POST (JPEG crudo o multipart), se decodifica en memoria
+    y pasa por la misma IA que /capturar. Guarda una LecturaPlaca por placa.
+    """
+    c = _get(session, id_camara)
+    imagenes = await _imagenes_subidas(request, max_imagenes=1)
+
+    resultado, medidos = await _inferir(request, request.app.state.vision.leer_imagenes(c.id, imagenes))
+    return _responder_lecturas(request, response, session, id_camara, resultado, medidos, tiempos)
+
+
+@router.post("/{id_camara}/imagenes", response_model=List[LecturaCapturaRead], openapi_extra=_CUERPO_IMAGENES)
+async def subir_rafaga_camara(
+    id_camara: int,
+    request: Request,
+    response: Response,
+    tiempos: bool = Query(default=False, description="Devuelve el tiempo de cada etapa en el header Server-Timing"),
+    session: Session = Depends(get_session),
+):
+    """
+    Variante por lotes: varios frames del mismo disparo en un solo multipart.
+    Se leen como ráfaga y se guarda una sola LecturaPlaca con el texto fusionado por votación.
+    """
+    c = _get(session, id_camara)
+    imagenes = await _imagenes_subidas(request, max_imagenes=get_settings().votacion_frames_max)
+
+    resultado, medidos = await _inferir(request, request.app.state.vision.leer_imagenes(c.id, imagenes))
+    return _responder_lecturas(request, response, session, id_camara, resultado, medidos, tiempos)
 
 #-----------    GET de LecturaPlaca     -----------
 
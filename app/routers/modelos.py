@@ -0,0 +1,46 @@
+# app/routers/modelos.py
+from fastapi import APIRouter, HTTPException, Request, status
+
+from ..config import get_settings
+from ..schemas.modelo import RecargaModelosCreate
+from ..vision.recarga import ConflictoRecarga, ModeloNoValido
+from ..vision.servicio import VisionNoLista
+
+router = APIRouter(prefix="/modelos", tags=["modelos"])
+
+def _recarga(operacion, *args, **kwargs) -> dict:
+    """Ejecuta una operación de recarga: 422 modelo no válido, 409 si choca con otra, 503 sin modelos o sin worker."""
+    try:
+        return operacion(*args, **kwargs)
+    except ModeloNoValido as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except ConflictoRecarga as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except VisionNoLista as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(get_settings().inferencia_retry_after)},
+        )
+
+@router.get("")
+def estado_modelos(request: Request):
+    """Modelos activos y estado de la última recarga (paridad y, si aplica, modo sombra)."""
+    return _recarga(request.app.state.vision.estado_recarga)
+
+@router.post("/recargar", status_code=status.HTTP_202_ACCEPTED)
+def recargar_modelos(body: RecargaModelosCreate, request: Request):
+    """
+    Carga el candidato en segundo plano, lo calienta, verifica paridad contra
+    capturas guardadas y cambia los modelos sin cortar las lecturas en curso.
+    Con `sombra` queda esperando POST /modelos/promover. Seguir con GET /modelos.
+    """
+    return _recarga(request.app.state.vision.recargar_modelos, **body.model_dump())
+
+@router.post("/promover")
+def promover_modelo(request: Request):
+    return _recarga(request.app.state.vision.promover_modelo)
+
+@router.delete("/candidato")
+def descartar_candidato(request: Request):
+    return _recarga(request.app.state.vision.descartar_candidato)
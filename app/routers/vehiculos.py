@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, status
 from sqlmodel import Session, select
 
+from ..config import get_settings
 from ..db import get_session
 from ..models.vehiculo import Vehiculo
-from ..schemas.vehiculo import VehiculoCreate, VehiculoRead, VehiculoUpdate
+from ..schemas.vehiculo import VehiculoCreate, VehiculoRead, VehiculoUpdate, VehiculoCoincidenciaRead
+from ..vision.servicio import VisionNoLista
 
 router = APIRouter(prefix="/vehiculos", tags=["vehiculos"])
 
@@ -12,6 +14,11 @@ def _normalize_placa(value: str) -> str:
     return value.strip().upper()
 
 
+def _sincronizar_indice(request: Request, vehiculo_id: int) -> None:
+    # El índice de placas vive en el servicio de visión (un solo índice aunque haya varios workers)
+    request.app.state.vision.sincronizar_vehiculo(vehiculo_id)
+
+
 def _get_vehiculo_or_404(session: Session, vehiculo_id: int) -> Vehiculo:
     veh = session.get(Vehiculo, vehiculo_id)
     if not veh:
@@ -20,7 +27,7 @@ def _get_vehiculo_or_404(session: Session, vehiculo_id: int) -> Vehiculo:
 
 
 @router.post("", response_model=VehiculoRead, status_code=status.HTTP_201_CREATED)
-def crear_vehiculo(body: VehiculoCreate, session: Session = Depends(get_session)):
+def crear_vehiculo(body: VehiculoCreate, request: Request, session: Session = Depends(get_session)):
     placa = _normalize_placa(body.placa)
     exists = session.exec(select(Vehiculo).where(Vehiculo.placa == placa)).first()
     if exists:
@@ -34,6 +41,7 @@ def crear_vehiculo(body: VehiculoCreate, session: Session = Depends(get_session)
     session.add(veh)
     session.commit()
     session.refresh(veh)
+    _sincronizar_indice(request, veh.id)
     return veh
 
 
@@ -56,6 +64,35 @@ def listar_vehiculos(
     return session.exec(stmt).all()
 
 
+@router.get("/buscar", response_model=VehiculoCoincidenciaRead)
+def buscar_por_placa(
+    request: Request,
+    placa: str = Query(min_length=1, description="Placa leída, con o sin formato (ej. 'ABC - 123')"),
+    cercanas: bool = Query(default=True, description="Acepta placas a un carácter de distancia"),
+    session: Session = Depends(get_session),
+):
+    """
+    Resuelve una lectura OCR al vehículo registrado usando el índice en memoria:
+    exacta, con confusiones típicas del OCR (O/0, I/1, S/5, ...) o a una edición.
+    """
+    try:
+        coincidencia = request.app.state.vision.buscar_placa(placa, cercanas=cercanas)
+    except VisionNoLista as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(get_settings().inferencia_retry_after)},
+        )
+    if coincidencia is None:
+        raise HTTPException(status_code=404, detail="Ningún vehículo coincide con la placa")
+    veh = _get_vehiculo_or_404(session, coincidencia["vehiculo_id"])
+    return VehiculoCoincidenciaRead(
+        vehiculo=VehiculoRead.model_validate(veh, from_attributes=True),
+        coincidencia=coincidencia["coincidencia"],
+        distancia=coincidencia["distancia"],
+    )
+
+
 @router.get("/{vehiculo_id}", response_model=VehiculoRead)
 def detalle_vehiculo(vehiculo_id: int = Path(ge=1), session: Session = Depends(get_session)):
     return _get_vehiculo_or_404(session, vehiculo_id)
@@ -65,6 +102,7 @@ def detalle_vehiculo(vehiculo_id: int = Path(ge=1), session: Session = Depends(g
 def actualizar_vehiculo(
     vehiculo_id: int,
     cambios: VehiculoUpdate,
+    request: Request,
     session: Session = Depends(get_session),
 ):
     veh = _get_vehiculo_or_404(session, vehiculo_id)
@@ -84,12 +122,14 @@ def actualizar_vehiculo(
     session.add(veh)
     session.commit()
     session.refresh(veh)
+    _sincronizar_indice(request, veh.id)
     return veh
 
 
 @router.delete("/{vehiculo_id}", response_model=VehiculoRead)
-def eliminar_vehiculo(vehiculo_id: int, session: Session = Depends(get_session)):
+def eliminar_vehiculo(vehiculo_id: int, request: Request, session: Session = Depends(get_session)):
     veh = _get_vehiculo_or_404(session, vehiculo_id)
     session.delete(veh)
     session.commit()
+    _sincronizar_indice(request, vehiculo_id)
     return veh
\ No newline at end of file
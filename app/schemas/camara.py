@@ -1,27 +1,111 @@
 # app/schemas/camara.py
-from pydantic import BaseModel, Field
-from typing import Optional
+import re
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List
 from .common import OrmRead
 
+# Ver app/vision/fuentes.py
+_FUENTE = re.compile(r"^(\d+|usb:\d+|(rtsps?|https?)://\S+|(archivo|carpeta):.+)$", re.IGNORECASE)
+
+
+def _validar_roi(v: Optional[str]) -> Optional[str]:
+    # 'x1,y1,x2,y2' en fracciones del frame, con x1 < x2 e y1 < y2
+    if v is None:
+        return v
+    try:
+        x1, y1, x2, y2 = (float(p) for p in v.split(","))
+    except ValueError:
+        raise ValueError("La ROI debe tener el formato 'x1,y1,x2,y2'")
+    if not (0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1):
+        raise ValueError("La ROI debe estar entre 0 y 1 con x1 < x2 e y1 < y2")
+    return f"{x1},{y1},{x2},{y2}"
+
+
+def _validar_fuente(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return v
+    v = v.strip()
+    if not _FUENTE.match(v):
+        raise ValueError("Fuente no válida: usa 'usb:0', 'rtsp://...', 'http(s)://...', 'archivo:<ruta>' o 'carpeta:<ruta>'")
+    return v
+
 
 class CamaraCreate(BaseModel):
     nombre: str = Field(min_length=1, max_length=100)
     device_index: Optional[int] = None        # ej. 0 o 1
+    fuente: Optional[str] = Field(default=None, max_length=255)   # ej. 'rtsp://10.0.0.5/stream'; tiene prioridad sobre device_index
     ubicacion: Optional[str] = None           # ej. 'ENTRADA' | 'SALIDA'
     activo: bool = True
+    modo_continuo: bool = False
+    roi_movimiento: Optional[str] = None      # ej. '0.2,0.5,0.8,1.0'
+    roi_deteccion: Optional[str] = None       # ej. '0.25,0.4,0.75,0.9'
+
+    @field_validator("roi_movimiento", "roi_deteccion")
+    @classmethod
+    def _roi_valida(cls, v):
+        return _validar_roi(v)
+
+    @field_validator("fuente")
+    @classmethod
+    def _fuente_valida(cls, v):
+        return _validar_fuente(v)
 
 
 class CamaraUpdate(BaseModel):
     nombre: Optional[str] = Field(default=None, min_length=1, max_length=100)
     device_index: Optional[int] = None
+    fuente: Optional[str] = Field(default=None, max_length=255)
     ubicacion: Optional[str] = None
     activo: Optional[bool] = None
+    modo_continuo: Optional[bool] = None
+    roi_movimiento: Optional[str] = None
+    roi_deteccion: Optional[str] = None
+
+    @field_validator("roi_movimiento", "roi_deteccion")
+    @classmethod
+    def _roi_valida(cls, v):
+        return _validar_roi(v)
+
+    @field_validator("fuente")
+    @classmethod
+    def _fuente_valida(cls, v):
+        return _validar_fuente(v)
 
 
 class CamaraRead(OrmRead):
     id: int
     nombre: str
     device_index: Optional[int] = None
+    fuente: Optional[str] = None
     ubicacion: Optional[str] = None
     activo: bool
+    modo_continuo: bool
+    roi_movimiento: Optional[str] = None
+    roi_deteccion: Optional[str] = None
+
+
+class LecturaCapturaRead(BaseModel):
+    # Una placa leída en la captura (puede haber varias por frame)
+    id: int
+    placa: str
+    confianza: float
+    confianza_deteccion: float
+    bbox: List[int]                           # x1, y1, x2, y2 en píxeles del frame
+    nivel_procesamiento: Optional[float] = None
+    calidad: Optional[float] = None           # puntaje de calidad del recorte (0-1)
+    vehiculo_id: Optional[int] = None         # vehículo registrado que coincide con la placa
+
+
+class EvidenciaCamaraRead(BaseModel):
+    # Lo que vio cada cámara en una captura de portería
+    camara_id: int
+    estado: str                               # OK | NO DETECTADO | ERR_FRAME
+    lecturas: List[LecturaCapturaRead] = []
+
 
+class CapturaPorteriaRead(BaseModel):
+    placa: Optional[str] = None               # conciliada entre cámaras; None si ninguna la leyó
+    confianza: float = 0.0
+    vehiculo_id: Optional[int] = None
+    camaras_coinciden: List[int] = []         # cámaras cuya lectura entró en la votación
+    camaras: List[EvidenciaCamaraRead]
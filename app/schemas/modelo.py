@@ -0,0 +1,31 @@
+# app/schemas/modelo.py
+import os
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, field_validator
+
+
+def _validar_modelo(v: Optional[str]) -> Optional[str]:
+    # Solo el nombre de un archivo copiado en la carpeta de DETECTOR_MODELO (ver recarga.ruta_modelo)
+    if v is None:
+        return v
+    v = v.strip()
+    if os.path.basename(v) != v or "/" in v or "\\" in v or v in ("", ".", ".."):
+        raise ValueError("El modelo debe ser un nombre de archivo de la carpeta de modelos, sin carpetas")
+    if not v.endswith((".pt", ".onnx")):
+        raise ValueError("El modelo debe ser un .pt o un .onnx")
+    return v
+
+
+class RecargaModelosCreate(BaseModel):
+    # Sin campos: recarga el mismo archivo del detector (p.ej. después de reemplazarlo)
+    detector_backend: Optional[Literal["torch", "onnx"]] = None
+    modelo: Optional[str] = Field(default=None, max_length=255, description="Nombre del .pt o .onnx en la carpeta de DETECTOR_MODELO (app/vision/modelo/)")
+    recargar_ocr: bool = False
+    sombra: bool = Field(default=False, description="Leer en paralelo una fracción de las lecturas antes de promover")
+    sombra_fraccion: Optional[float] = Field(default=None, gt=0, le=1)
+    forzar: bool = Field(default=False, description="Promover aunque la paridad no pase o no haya capturas")
+
+    @field_validator("modelo")
+    @classmethod
+    def _modelo_valido(cls, v):
+        return _validar_modelo(v)
@@ -29,4 +29,9 @@ class VehiculoRead(OrmRead):
     placa: str
     activo: bool
     en_lista_negra: bool
-    vehiculo_vip: bool
\ No newline at end of file
+    vehiculo_vip: bool
+
+class VehiculoCoincidenciaRead(BaseModel):
+    vehiculo: VehiculoRead
+    coincidencia: str          # 'exacta' | 'confusion' | 'cercana'
+    distancia: int             # Levenshtein entre la lectura y la placa registrada
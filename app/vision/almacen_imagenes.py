@@ -0,0 +1,288 @@
+"""
+Retención de las imágenes de capturas para que el disco del PC de portería no se llene.
+
+Las imágenes se guardan por día (<carpeta>/AAAA/MM/DD/...) y solo se conocen
+por las rutas de LecturaPlaca. Cada pasada de RetencionImagenes:
+    1. compacta las imágenes completas con más de `compactar_dias`: las reduce
+       a `compactar_ancho` px y las recodifica a JPEG `compactar_calidad`
+    2. borra los recortes con más de `recortes_dias`
+    3. borra las imágenes completas con más de `completas_dias` (0 = nunca)
+    4. si las carpetas pasan de `presupuesto_mb`, borra días enteros, del más viejo
+       al más nuevo (primero recortes, luego completas), hasta bajar al 90%
+En todos los casos la ruta de LecturaPlaca se actualiza o queda en NULL antes de
+borrar el archivo: una ruta nunca apunta a algo que ya no existe.
+"""
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+from sqlalchemy import update
+from sqlmodel import Session, col, select
+
+from app.models.lectura_placa import LecturaPlaca
+
+SUFIJO_COMPACTA = "_c.jpg"
+PANEL_ANCHO = 400      # panel con el recorte ampliado que se pega a la derecha del frame
+UMBRAL_NEGRO = 24      # el fondo del panel es negro; con JPEG queda algo por encima de 0
+
+
+def frame_de_captura(img, ruta: str):
+    """
+    Quita de una imagen completa guardada el panel del recorte (ver
+    LectorPlacas._crear_imagen_compuesta), para volver a leer el frame tal como
+    lo vio la cámara. Sin compactar el panel mide PANEL_ANCHO px; en las
+    compactadas quedó reducido en la misma escala que el frame (que no se
+    guarda), así que se ubica por sus franjas de arriba y abajo, siempre negras
+    porque el recorte va centrado.
+    """
+    h, w = img.shape[:2]
+    if not ruta.endswith(SUFIJO_COMPACTA):
+        return img[:, :w - PANEL_ANCHO] if w > PANEL_ANCHO else img
+    franja = max(1, h // 10)
+    gris = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    bordes = np.maximum(gris[:franja].max(axis=0), gris[-franja:].max(axis=0))
+    claras = np.flatnonzero(bordes > UMBRAL_NEGRO)
+    if claras.size == 0:
+        return img
+    corte = int(claras[-1]) + 1
+    return img[:, :corte] if w - corte >= 8 else img
+
+
+def _tamano(ruta: str) -> int:
+    """Bytes de un archivo o de una carpeta completa."""
+    if os.path.isfile(ruta):
+        return os.path.getsize(ruta)
+    total = 0
+    for raiz, _, archivos in os.walk(ruta):
+        for nombre in archivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nombre))
+            except OSError:
+                pass
+    return total
+
+
+def _dias(base: str) -> list[str]:
+    """Subcarpetas AAAA/MM/DD de `base`, de la más vieja a la más nueva."""
+    dias = []
+    for anio in sorted(os.listdir(base)) if os.path.isdir(base) else []:
+        ruta_anio = os.path.join(base, anio)
+        if not (anio.isdigit() and os.path.isdir(ruta_anio)):
+            continue
+        for mes in sorted(os.listdir(ruta_anio)):
+            ruta_mes = os.path.join(ruta_anio, mes)
+            if not (mes.isdigit() and os.path.isdir(ruta_mes)):
+                continue
+            dias.extend(os.path.join(anio, mes, dia) for dia in sorted(os.listdir(ruta_mes)) if dia.isdigit())
+    return dias
+
+
+def _borrar(ruta: str) -> int:
+    try:
+        tamano = os.path.getsize(ruta)
+        os.remove(ruta)
+        return tamano
+    except OSError:
+        return 0
+
+
+class RetencionImagenes:
+    def __init__(
+        self,
+        engine,
+        dir_completas: str,
+        dir_recortes: str,
+        intervalo_min: float = 60,
+        compactar_dias: int = 7,
+        compactar_ancho: int = 960,
+        compactar_calidad: int = 60,
+        recortes_dias: int = 30,
+        completas_dias: int = 0,
+        presupuesto_mb: int = 0,
+        lote: int = 500,
+    ) -> None:
+        self.engine = engine
+        self.dir_completas = dir_completas
+        self.dir_recortes = dir_recortes
+        self.intervalo_s = intervalo_min * 60
+        self.compactar_dias = compactar_dias
+        self.compactar_ancho = compactar_ancho
+        self.compactar_calidad = compactar_calidad
+        self.recortes_dias = recortes_dias
+        self.completas_dias = completas_dias
+        self.presupuesto = presupuesto_mb * 1024 * 1024
+        self.lote = lote
+
+        self.ultima_pasada: dict = {}
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="retencion-imagenes", daemon=True)
+
+    def iniciar(self) -> None:
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0) -> None:
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+
+    def _bucle(self) -> None:
+        espera = 30.0      # la primera pasada no compite con la carga de los modelos
+        while not self._detener.wait(espera):
+            try:
+                self.ejecutar()
+            except Exception as e:
+                print(f"Error en la retención de imágenes: {e}")
+            espera = self.intervalo_s
+
+    def ejecutar(self) -> dict:
+        """Una pasada completa. Devuelve (y guarda en ultima_pasada) lo que hizo."""
+        inicio = time.monotonic()
+        ahora = datetime.now()
+        resumen = {"compactadas": 0, "recortes_borrados": 0, "completas_borradas": 0,
+                   "dias_borrados": 0, "bytes_liberados": 0}
+        with Session(self.engine) as session:
+            if self.compactar_dias > 0:
+                self._compactar(session, ahora - timedelta(days=self.compactar_dias), resumen)
+            if self.recortes_dias > 0:
+                n, liberados = self._vaciar(session, LecturaPlaca.ruta_recorte, ahora - timedelta(days=self.recortes_dias))
+                resumen["recortes_borrados"] += n
+                resumen["bytes_liberados"] += liberados
+            if self.completas_dias > 0:
+                n, liberados = self._vaciar(session, LecturaPlaca.ruta_imagen, ahora - timedelta(days=self.completas_dias))
+                resumen["completas_borradas"] += n
+                resumen["bytes_liberados"] += liberados
+            if self.presupuesto > 0:
+                self._aplicar_presupuesto(session, resumen)
+        for base in (self.dir_completas, self.dir_recortes):
+            self._quitar_carpetas_vacias(base)
+
+        resumen["uso_mb"] = round(self.uso_bytes() / (1024 * 1024), 1)
+        resumen["duracion_s"] = round(time.monotonic() - inicio, 2)
+        resumen["fecha"] = ahora.isoformat(timespec="seconds")
+        self.ultima_pasada = resumen
+        return resumen
+
+    def uso_bytes(self) -> int:
+        return sum(_tamano(base) for base in (self.dir_completas, self.dir_recortes) if os.path.isdir(base))
+
+    # --- 1. compactar ---
+    def _compactar(self, session: Session, limite: datetime, resumen: dict) -> None:
+        # Se avanza por id: los archivos ilegibles se saltan y no vuelven a salir en el siguiente lote
+        ultimo_id, ilegibles = 0, set()
+        while not self._detener.is_set():
+            filas = session.exec(
+                select(LecturaPlaca.id, LecturaPlaca.ruta_imagen).where(
+                    LecturaPlaca.id > ultimo_id,
+                    LecturaPlaca.ts < limite,
+                    col(LecturaPlaca.ruta_imagen).is_not(None),
+                    col(LecturaPlaca.ruta_imagen).not_like(f"%{SUFIJO_COMPACTA}"),
+                ).order_by(LecturaPlaca.id).limit(self.lote)
+            ).all()
+            if not filas:
+                return
+            ultimo_id = filas[-1][0]
+
+            viejas = []
+            for ruta in dict.fromkeys(ruta for _, ruta in filas):    # varias lecturas comparten imagen
+                if ruta in ilegibles:
+                    continue
+                nueva = self._compactar_archivo(ruta)
+                if nueva == ruta:
+                    ilegibles.add(ruta)    # ilegible: se deja como está
+                    continue
+                session.exec(
+                    update(LecturaPlaca).where(LecturaPlaca.ruta_imagen == ruta).values(ruta_imagen=nueva)
+                )
+                if nueva is not None:
+                    viejas.append((ruta, nueva))
+            session.commit()
+
+            # El archivo original solo se borra cuando la BD ya apunta al compactado
+            for ruta, nueva in viejas:
+                try:
+                    tamano_nueva = os.path.getsize(nueva)
+                except OSError:
+                    tamano_nueva = 0
+                resumen["bytes_liberados"] += _borrar(ruta) - tamano_nueva
+                resumen["compactadas"] += 1
+
+    def _compactar_archivo(self, ruta: str) -> str | None:
+        """Escribe la versión reducida junto a la original y devuelve su ruta (None si ya no existe)."""
+        img = cv2.imread(ruta, cv2.IMREAD_COLOR)
+        if img is None:
+            return ruta if os.path.exists(ruta) else None
+        h, w = img.shape[:2]
+        if w > self.compactar_ancho:
+            img = cv2.resize(img, (self.compactar_ancho, int(h * self.compactar_ancho / w)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.compactar_calidad])
+        if not ok:
+            return ruta
+        nueva = os.path.splitext(ruta)[0] + SUFIJO_COMPACTA
+        temporal = nueva + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(buffer.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, nueva)
+        return nueva
+
+    # --- 2 y 3. borrar por antigüedad ---
+    def _vaciar(self, session: Session, campo, limite: datetime) -> tuple[int, int]:
+        borrados, liberados = 0, 0
+        while not self._detener.is_set():
+            rutas = session.exec(
+                select(campo).distinct().where(LecturaPlaca.ts < limite, col(campo).is_not(None)).limit(self.lote)
+            ).all()
+            if not rutas:
+                break
+            session.exec(update(LecturaPlaca).where(col(campo).in_(rutas)).values({campo.key: None}))
+            session.commit()
+            for ruta in rutas:
+                liberados += _borrar(ruta)
+                borrados += 1
+        return borrados, liberados
+
+    # --- 4. presupuesto de disco ---
+    def _aplicar_presupuesto(self, session: Session, resumen: dict) -> None:
+        uso = self.uso_bytes()
+        if uso <= self.presupuesto:
+            return
+        objetivo = self.presupuesto * 0.9
+        hoy = os.path.join(*time.strftime("%Y %m %d").split())
+        dias = sorted(set(_dias(self.dir_completas)) | set(_dias(self.dir_recortes)))
+        for dia in dias:
+            if dia == hoy:
+                break   # el día en curso no se toca
+            for base, campo in ((self.dir_recortes, LecturaPlaca.ruta_recorte), (self.dir_completas, LecturaPlaca.ruta_imagen)):
+                carpeta = os.path.join(base, dia)
+                if not os.path.isdir(carpeta):
+                    continue
+                session.exec(
+                    update(LecturaPlaca)
+                    .where(col(campo).startswith(carpeta + os.sep, autoescape=True))
+                    .values({campo.key: None})
+                )
+                session.commit()
+                tamano = _tamano(carpeta)
+                shutil.rmtree(carpeta, ignore_errors=True)
+                uso -= tamano
+                resumen["bytes_liberados"] += tamano
+                resumen["dias_borrados"] += 1
+                if uso <= objetivo:
+                    return
+        if uso > self.presupuesto:
+            print(f"[!] Imágenes por encima del presupuesto ({uso // (1024 * 1024)} MB) solo con el día en curso")
+
+    def _quitar_carpetas_vacias(self, base: str) -> None:
+        if not os.path.isdir(base):
+            return
+        for raiz, _, _ in os.walk(base, topdown=False):
+            if raiz != base and not os.listdir(raiz):
+                try:
+                    os.rmdir(raiz)
+                except OSError:
+                    pass
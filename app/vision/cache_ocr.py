@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def hash_perceptual(img) -> int:
+    """dHash de 64 bits: compara píxeles vecinos de la imagen reducida a 9x8 en gris."""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    reducida = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = reducida[:, 1:] > reducida[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class CacheOCR:
+    """
+    Cache LRU con TTL de lecturas OCR, por cámara y hash perceptual del recorte.
+    Un auto quieto frente a la talanquera produce recortes casi idénticos, así
+    que se acepta como acierto un hash a distancia de Hamming <= `distancia_max`.
+    """
+
+    def __init__(self, max_items: int = 256, ttl_s: float = 30.0, distancia_max: int = 4) -> None:
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self.distancia_max = distancia_max
+        self._items: OrderedDict = OrderedDict()   # (camara_id, hash) -> (ts, texto, confianza, nivel)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def _vigente(self, ts: float, ahora: float) -> bool:
+        return self.ttl_s <= 0 or ahora - ts <= self.ttl_s
+
+    def buscar(self, camara_id, hash_img: int):
+        """Devuelve (texto, confianza, nivel) si hay una lectura previa equivalente, o None."""
+        ahora = time.monotonic()
+        with self._lock:
+            clave = (camara_id, hash_img)
+            entrada = self._items.get(clave)
+            if entrada is None and self.distancia_max > 0:
+                for (cam, h), valor in reversed(self._items.items()):
+                    if cam == camara_id and bin(h ^ hash_img).count("1") <= self.distancia_max:
+                        clave, entrada = (cam, h), valor
+                        break
+
+            if entrada is not None and not self._vigente(entrada[0], ahora):
+                del self._items[clave]
+                entrada = None
+
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._items.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1], entrada[2], entrada[3]
+
+    def guardar(self, camara_id, hash_img: int, texto: str, confianza: float, nivel: float | None = None) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            clave = (camara_id, hash_img)
+            self._items[clave] = (time.monotonic(), texto, confianza, nivel)
+            self._items.move_to_end(clave)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.desalojos += 1
+
+    def vaciar(self) -> None:
+        """Olvida las lecturas guardadas (p.ej. al cambiar de motor OCR); conserva los contadores."""
+        with self._lock:
+            self._items.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "tamano": len(self._items),
+                "max_items": self.max_items,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
@@ -0,0 +1,48 @@
+"""
+Puntaje barato (~1 ms) de la calidad de un frame o de un recorte de placa, para
+no gastar YOLO/OCR en imágenes movidas o quemadas por los faros:
+
+    nitidez     varianza del Laplaciano en gris (reducido a ANCHO_MEDIDA), sobre NITIDEZ_REF
+    exposicion  castiga los píxeles saturados (<= 5 o >= 250) y un promedio lejos del gris medio
+    tamano      solo recortes: alto en píxeles sobre ALTO_MIN_PLACA (por debajo el OCR falla)
+
+Cada componente va de 0 a 1 y el puntaje es su producto: basta uno malo para descartar.
+"""
+import cv2
+import numpy as np
+
+from app.vision.roi import recortar_roi
+
+ANCHO_MEDIDA = 320
+NITIDEZ_REF = 100.0
+ALTO_MIN_PLACA = 20
+_NIVELES = np.arange(256)
+
+
+def componentes(img, ancho: int = ANCHO_MEDIDA) -> dict:
+    gris = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    if ancho and gris.shape[1] > ancho:
+        gris = cv2.resize(gris, (ancho, max(1, gris.shape[0] * ancho // gris.shape[1])), interpolation=cv2.INTER_AREA)
+    nitidez = min(1.0, cv2.Laplacian(gris, cv2.CV_64F).var() / NITIDEZ_REF)
+
+    hist = cv2.calcHist([gris], [0], None, [256], [0, 256]).ravel()
+    total = hist.sum() or 1.0
+    saturados = (hist[:6].sum() + hist[250:].sum()) / total
+    media = (hist * _NIVELES).sum() / total
+    exposicion = max(0.0, 1 - 2 * saturados) * (1 - abs(media - 128) / 256)
+    return {"nitidez": float(nitidez), "exposicion": float(exposicion)}
+
+
+def calidad_frame(frame, roi=None) -> float:
+    """Puntaje del frame completo o solo de la ROI donde se espera la placa."""
+    c = componentes(recortar_roi(frame, roi))
+    return round(c["nitidez"] * c["exposicion"], 4)
+
+
+def calidad_recorte(recorte) -> float:
+    """Puntaje del recorte de placa que va al OCR (a su tamaño real)."""
+    if recorte.size == 0:
+        return 0.0
+    c = componentes(recorte, ancho=0)
+    tamano = min(1.0, recorte.shape[0] / ALTO_MIN_PLACA)
+    return round(c["nitidez"] * c["exposicion"] * tamano, 4)
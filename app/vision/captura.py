@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from app.vision.fuentes import crear_fuente, uri_fuente
+
+
+def decodificar_imagen(datos: bytes):
+    """JPEG/PNG en memoria -> frame BGR, sin archivos temporales. None si no es una imagen válida."""
+    if not datos:
+        return None
+    return cv2.imdecode(np.frombuffer(datos, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class LectorCamara:
+    """
+    Mantiene una cámara abierta en un hilo propio y guarda los últimos frames
+    (con su timestamp de time.monotonic()) en un buffer circular.
+    Así la captura no paga el costo de abrir/cerrar el dispositivo, y la
+    decodificación (o la red, ver fuentes.py) no la espera la inferencia.
+    """
+
+    def __init__(
+        self,
+        camara_id: int,
+        fuente: str,
+        tam_buffer: int = 10,
+        espera_reconexion: float = 2.0,
+    ) -> None:
+        self.camara_id = camara_id
+        self.fuente = fuente
+        self.espera_reconexion = espera_reconexion
+
+        self._buffer = deque(maxlen=max(1, tam_buffer))
+        self._cond = threading.Condition()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(
+            target=self._bucle, name=f"camara-{camara_id}", daemon=True
+        )
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo.is_alive()
+
+    def iniciar(self) -> None:
+        self._hilo.start()
+
+    def detener(self, timeout: float = 2.0) -> None:
+        self._detener.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+
+    def _bucle(self) -> None:
+        try:
+            fuente = crear_fuente(self.fuente)
+        except ValueError as e:
+            print(f"Cámara {self.camara_id}: {e}")
+            return
+        abierta = False
+        while not self._detener.is_set():
+            if not abierta:
+                abierta = fuente.abrir()
+                if not abierta:
+                    print(f"Error cámara {self.camara_id} ({self.fuente}), reintentando...")
+                    self._detener.wait(self.espera_reconexion)
+                    continue
+
+            ret, frame = fuente.leer()
+            if not ret:
+                # Cámara desconectada o sin señal: cerramos y reintentamos
+                fuente.cerrar()
+                abierta = False
+                self._detener.wait(self.espera_reconexion)
+                continue
+
+            with self._cond:
+                self._buffer.append((time.monotonic(), frame))
+                self._cond.notify_all()
+
+        fuente.cerrar()
+
+    def ultimo_frame(self, desde: float | None = None, timeout: float = 1.0):
+        """
+        Devuelve (ts, frame) con el frame más reciente.
+        Si se indica `desde`, espera hasta `timeout` segundos a que llegue
+        un frame tomado después de ese instante. Devuelve None si no hay.
+        """
+        limite = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._buffer and (desde is None or self._buffer[-1][0] >= desde):
+                    return self._buffer[-1]
+                restante = limite - time.monotonic()
+                if restante <= 0 or self._detener.is_set():
+                    return None
+                self._cond.wait(restante)
+
+    def rafaga(self, cantidad: int, timeout: float = 1.0):
+        """Genera hasta `cantidad` frames: el más reciente y luego los siguientes que vayan llegando."""
+        desde = None
+        for _ in range(cantidad):
+            item = self.ultimo_frame(desde=desde, timeout=timeout)
+            if item is None:
+                return
+            ts, frame = item
+            desde = ts + 1e-6
+            yield frame
+
+    def frames_antes_de(self, instante: float, cantidad: int = 1):
+        """Devuelve hasta `cantidad` frames (ts, frame) tomados antes de `instante`, del más viejo al más nuevo."""
+        with self._cond:
+            previos = [item for item in self._buffer if item[0] <= instante]
+        return previos[-cantidad:] if cantidad > 0 else []
+
+
+class GestorCamaras:
+    """Registro de un LectorCamara por cada Camara activa."""
+
+    def __init__(self, tam_buffer: int = 10) -> None:
+        self.tam_buffer = tam_buffer
+        self._lectores: dict[int, LectorCamara] = {}
+        self._lock = threading.Lock()
+
+    def iniciar(self, camara_id: int, fuente: str) -> LectorCamara:
+        with self._lock:
+            actual = self._lectores.get(camara_id)
+            if actual is not None and actual.fuente == fuente and actual.activo:
+                return actual
+            nuevo = LectorCamara(camara_id, fuente, tam_buffer=self.tam_buffer)
+            self._lectores[camara_id] = nuevo
+        if actual is not None:
+            actual.detener()
+        nuevo.iniciar()
+        return nuevo
+
+    def detener(self, camara_id: int) -> None:
+        with self._lock:
+            lector = self._lectores.pop(camara_id, None)
+        if lector is not None:
+            lector.detener()
+
+    def sincronizar(self, camara) -> None:
+        """Arranca o detiene el lector según el estado actual de la Camara."""
+        fuente = uri_fuente(camara)
+        if camara.activo and fuente is not None:
+            self.iniciar(camara.id, fuente)
+        else:
+            self.detener(camara.id)
+
+    def obtener(self, camara_id: int) -> LectorCamara | None:
+        with self._lock:
+            return self._lectores.get(camara_id)
+
+    def detener_todos(self) -> None:
+        with self._lock:
+            lectores = list(self._lectores.values())
+            self._lectores.clear()
+        for lector in lectores:
+            lector.detener()
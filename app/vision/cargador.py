@@ -0,0 +1,68 @@
+import threading
+
+PENDIENTE = "pendiente"
+CARGANDO = "cargando"
+CALENTANDO = "calentando"
+LISTO = "listo"
+ERROR = "error"
+DESHABILITADO = "deshabilitado"
+
+
+class CargadorVision:
+    """
+    Carga LectorPlacas en un hilo de fondo para que la API acepte peticiones
+    de inmediato. Deja un estado por componente (detector, ocr) que usa el
+    endpoint de readiness; `lector` queda en None hasta que todo esté listo.
+    """
+
+    def __init__(self, fabrica, habilitado: bool = True) -> None:
+        self._fabrica = fabrica          # crea un LectorPlacas(cargar_modelos=False)
+        self.lector = None
+        self.error: str | None = None
+        estado_inicial = PENDIENTE if habilitado else DESHABILITADO
+        self.estados = {"detector": estado_inicial, "ocr": estado_inicial}
+        self.habilitado = habilitado
+        self._hilo = threading.Thread(target=self._cargar, name="carga-vision", daemon=True)
+        self._al_terminar = []
+
+    @property
+    def listo(self) -> bool:
+        return self.lector is not None
+
+    def al_terminar(self, callback) -> None:
+        """Registra callback(lector) a llamar cuando los modelos estén listos."""
+        self._al_terminar.append(callback)
+
+    def iniciar(self) -> None:
+        if self.habilitado:
+            self._hilo.start()
+
+    def _paso(self, componente: str, estado: str) -> None:
+        self.estados[componente] = estado
+        print(f"Visión [{componente}]: {estado}")
+
+    def _cargar(self) -> None:
+        componente = "ocr"
+        try:
+            lector = self._fabrica()
+
+            self._paso("ocr", CARGANDO)
+            lector.cargar_ocr()
+            self._paso("ocr", CALENTANDO)
+            lector.calentar_ocr()
+            self._paso("ocr", LISTO)
+
+            componente = "detector"
+            self._paso("detector", CARGANDO)
+            lector.cargar_detector()
+            self._paso("detector", CALENTANDO)
+            lector.calentar_detector()
+            self._paso("detector", LISTO)
+        except Exception as e:
+            self.error = f"{componente}: {e}"
+            self._paso(componente, ERROR)
+            return
+
+        self.lector = lector
+        for callback in self._al_terminar:
+            callback(lector)
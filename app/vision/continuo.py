@@ -0,0 +1,181 @@
+import threading
+import time
+
+import cv2
+
+from app.vision.ejecutor import ColaLlena
+from app.vision.roi import parsear_roi, recortar_roi
+from app.vision.votacion import distancia_edicion
+
+SIN_LECTURA = ("NO DETECTADO", "NO LEIDO", "ERR_CAM", "ERR_FRAME")
+
+
+class DetectorMovimiento:
+    """
+    Compuerta barata antes de YOLO: diferencia entre frames consecutivos,
+    reducidos a `ancho` píxeles y en gris, dentro de la región de interés.
+    """
+
+    def __init__(self, roi=None, umbral: float = 0.02, ancho: int = 160) -> None:
+        self.roi = roi
+        self.umbral = umbral
+        self.ancho = ancho
+        self._previo = None
+
+    def hay_movimiento(self, frame) -> bool:
+        zona = recortar_roi(frame, self.roi)
+        if zona.size == 0:
+            return False
+        alto = max(1, int(zona.shape[0] * self.ancho / zona.shape[1]))
+        pequeno = cv2.resize(zona, (self.ancho, alto), interpolation=cv2.INTER_AREA)
+        gris = cv2.GaussianBlur(cv2.cvtColor(pequeno, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        previo, self._previo = self._previo, gris
+        if previo is None or previo.shape != gris.shape:
+            return False
+        diff = cv2.absdiff(gris, previo)
+        _, mascara = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mascara) / mascara.size >= self.umbral
+
+
+class MonitorContinuo:
+    """
+    Hilo que vigila una cámara por su cuenta (sin esperar a la ESP32):
+    solo corre YOLO + OCR mientras hay movimiento en la ROI (y `post_movimiento_s`
+    después), y avisa con `al_leer` una sola vez por auto: las lecturas de una
+    placa igual o a un carácter de una ya aceptada se ignoran durante `debounce_s`.
+    Como puede haber varios autos en el frame, el debounce se lleva por placa.
+    """
+
+    def __init__(
+        self,
+        camara_id: int,
+        gestor_camaras,
+        obtener_lector,
+        ejecutor,
+        al_leer,
+        roi=None,
+        umbral_movimiento: float = 0.02,
+        intervalo_ms: float = 100,
+        post_movimiento_s: float = 2.0,
+        debounce_s: float = 10.0,
+        min_confianza: float = 0.5,
+    ) -> None:
+        self.camara_id = camara_id
+        self.gestor_camaras = gestor_camaras
+        self.obtener_lector = obtener_lector
+        self.ejecutor = ejecutor
+        self.al_leer = al_leer
+        self.movimiento = DetectorMovimiento(roi=roi, umbral=umbral_movimiento)
+        self.intervalo_s = intervalo_ms / 1000
+        self.post_movimiento_s = post_movimiento_s
+        self.debounce_s = debounce_s
+        self.min_confianza = min_confianza
+
+        self._recientes: dict[str, float] = {}     # placa aceptada -> última vez vista
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name=f"continuo-{camara_id}", daemon=True)
+
+    def iniciar(self) -> None:
+        self._hilo.start()
+
+    def detener(self, timeout: float = 2.0) -> None:
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+
+    def _bucle(self) -> None:
+        ts_previo = None
+        ultimo_movimiento = 0.0
+        while not self._detener.is_set():
+            lector_cam = self.gestor_camaras.obtener(self.camara_id)
+            if lector_cam is None:
+                self._detener.wait(1.0)
+                continue
+
+            desde = ts_previo + 1e-6 if ts_previo is not None else None
+            item = lector_cam.ultimo_frame(desde=desde, timeout=1.0)
+            if item is None:
+                continue
+            ts_previo, frame = item
+
+            ahora = time.monotonic()
+            if self.movimiento.hay_movimiento(frame):
+                ultimo_movimiento = ahora
+            if ahora - ultimo_movimiento <= self.post_movimiento_s:
+                self._procesar(frame)
+            self._detener.wait(self.intervalo_s)
+
+    def _aceptar(self, texto: str, confianza: float) -> bool:
+        """Debounce. Corre en el hilo de inferencia antes de guardar las imágenes."""
+        if texto in SIN_LECTURA or confianza < self.min_confianza:
+            return False
+        ahora = time.monotonic()
+        self._recientes = {p: ts for p, ts in self._recientes.items() if ahora - ts <= self.debounce_s}
+        for placa in self._recientes:
+            if distancia_edicion(texto, placa) <= 1:
+                self._recientes[placa] = ahora     # mientras el auto siga ahí se extiende la ventana
+                return False
+        self._recientes[texto] = ahora
+        return True
+
+    def _procesar(self, frame) -> None:
+        lector = self.obtener_lector()
+        if lector is None:
+            return
+        # Frame movido o quemado: se espera el siguiente en vez de ocupar YOLO/OCR
+        if lector.calidad_min > 0 and lector.puntuar_frame(frame, self.camara_id) < lector.calidad_min:
+            return
+        try:
+            fut = self.ejecutor.enviar(lector.leer_placas, frame, self.camara_id, self._aceptar)
+        except ColaLlena:
+            return   # las capturas bajo demanda tienen prioridad
+        try:
+            resultado = fut.result()
+        except Exception as e:
+            print(f"Error en modo continuo cámara {self.camara_id}: {e}")
+            return
+        # leer_placas solo devuelve las lecturas que pasaron _aceptar
+        for lectura in resultado["lecturas"]:
+            texto, confianza = lectura["placa"], lectura["confianza"]
+            print(f"Modo continuo cámara {self.camara_id}: {texto} ({confianza:.2f})")
+            self.al_leer(self.camara_id, texto, confianza, resultado["ruta_imagen"], lectura["ruta_recorte"],
+                         lectura["nivel_procesamiento"], lectura["calidad"])
+
+
+class GestorContinuo:
+    """Un MonitorContinuo por cada Camara con modo_continuo activo."""
+
+    def __init__(self, gestor_camaras, obtener_lector, ejecutor, al_leer, **opciones) -> None:
+        self.gestor_camaras = gestor_camaras
+        self.obtener_lector = obtener_lector
+        self.ejecutor = ejecutor
+        self.al_leer = al_leer
+        self.opciones = opciones
+        self._monitores: dict[int, MonitorContinuo] = {}
+        self._lock = threading.Lock()
+
+    def sincronizar(self, camara) -> None:
+        self.detener(camara.id)
+        if not (camara.activo and camara.modo_continuo):
+            return
+        monitor = MonitorContinuo(
+            camara.id, self.gestor_camaras, self.obtener_lector, self.ejecutor, self.al_leer,
+            roi=parsear_roi(camara.roi_movimiento), **self.opciones,
+        )
+        with self._lock:
+            self._monitores[camara.id] = monitor
+        monitor.iniciar()
+
+    def detener(self, camara_id: int) -> None:
+        with self._lock:
+            monitor = self._monitores.pop(camara_id, None)
+        if monitor is not None:
+            monitor.detener()
+
+    def detener_todos(self) -> None:
+        with self._lock:
+            monitores = list(self._monitores.values())
+            self._monitores.clear()
+        for monitor in monitores:
+            monitor.detener()
@@ -0,0 +1,178 @@
+"""
+Backends del detector de placas.
+
+Todos exponen la misma interfaz:
+    detectar_lote(frames) -> una lista por frame de cajas (x1, y1, x2, y2, conf)
+                             en píxeles del frame, ordenadas por confianza.
+    calentar()            -> inferencia sobre un frame negro.
+"""
+import cv2
+import numpy as np
+
+BACKENDS = ("torch", "onnx")
+
+
+class DetectorYOLO:
+    """Backend PyTorch de ultralytics (el comportamiento original)."""
+
+    nombre = "torch"
+
+    def __init__(self, model_path: str, conf: float = 0.4, imgsz: int = 640) -> None:
+        from ultralytics import YOLO
+        self.model_path = model_path
+        self.conf = conf
+        self.imgsz = imgsz
+        self.model = YOLO(model_path)
+
+    def detectar_lote(self, frames):
+        resultados = self.model.predict(list(frames), verbose=False, conf=self.conf, imgsz=self.imgsz)
+        cajas = []
+        for res in resultados:
+            xyxy = res.boxes.xyxy.cpu().numpy()
+            confs = res.boxes.conf.cpu().numpy()
+            orden = np.argsort(-confs)
+            cajas.append([(*xyxy[i].tolist(), float(confs[i])) for i in orden])
+        return cajas
+
+    def calentar(self) -> None:
+        self.detectar_lote([np.zeros((480, 640, 3), dtype=np.uint8)])
+
+
+class DetectorONNX:
+    """
+    Backend ONNX Runtime para los PC de la portería (solo CPU).
+    Usa el modelo exportado con tools/exportar_detector.py (opcionalmente INT8).
+    `proveedores` permite p.ej. ["OpenVINOExecutionProvider", "CPUExecutionProvider"].
+    """
+
+    nombre = "onnx"
+
+    def __init__(self, model_path: str, conf: float = 0.4, iou: float = 0.5,
+                 proveedores: list[str] | None = None, hilos: int = 0, imgsz: int = 640) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("El backend 'onnx' requiere instalar onnxruntime") from e
+
+        self.model_path = model_path
+        self.conf = conf
+        self.iou = iou
+        opciones = ort.SessionOptions()
+        if hilos > 0:
+            opciones.intra_op_num_threads = hilos
+        disponibles = ort.get_available_providers()
+        proveedores = [p for p in (proveedores or ["CPUExecutionProvider"]) if p in disponibles]
+        self.sesion = ort.InferenceSession(model_path, opciones, providers=proveedores or None)
+
+        entrada = self.sesion.get_inputs()[0]
+        self.nombre_entrada = entrada.name
+        forma = entrada.shape   # [N, 3, H, W]; simbólicos si se exportó con dynamic=True
+        self.imgsz = forma[2] if isinstance(forma[2], int) else imgsz
+        self.lote_dinamico = not isinstance(forma[0], int)
+
+    def _letterbox(self, frame):
+        """Redimensiona conservando proporción y rellena a imgsz x imgsz (como ultralytics)."""
+        h, w = frame.shape[:2]
+        escala = min(self.imgsz / h, self.imgsz / w)
+        nh, nw = int(round(h * escala)), int(round(w * escala))
+        arriba = (self.imgsz - nh) // 2
+        izquierda = (self.imgsz - nw) // 2
+        lienzo = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        lienzo[arriba:arriba + nh, izquierda:izquierda + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        tensor = cv2.cvtColor(lienzo, cv2.COLOR_BGR2RGB).transpose(2, 0, 1).astype(np.float32) / 255.0
+        return tensor, escala, izquierda, arriba
+
+    def _postprocesar(self, salida, escala, izquierda, arriba, h, w):
+        # Salida YOLOv8: (4 + clases, N) con cajas cx, cy, w, h en el espacio del letterbox
+        pred = salida.T
+        scores = pred[:, 4:].max(axis=1)
+        pred, scores = pred[scores >= self.conf], scores[scores >= self.conf]
+        if len(pred) == 0:
+            return []
+        cx, cy, bw, bh = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+        cajas_xywh = np.stack([cx - bw / 2, cy - bh / 2, bw, bh], axis=1)
+        indices = cv2.dnn.NMSBoxes(cajas_xywh.tolist(), scores.tolist(), self.conf, self.iou)
+        cajas = []
+        for i in np.array(indices).flatten():
+            x, y, bw_i, bh_i = cajas_xywh[i]
+            x1 = float(np.clip((x - izquierda) / escala, 0, w))
+            y1 = float(np.clip((y - arriba) / escala, 0, h))
+            x2 = float(np.clip((x + bw_i - izquierda) / escala, 0, w))
+            y2 = float(np.clip((y + bh_i - arriba) / escala, 0, h))
+            cajas.append((x1, y1, x2, y2, float(scores[i])))
+        cajas.sort(key=lambda c: -c[4])
+        return cajas
+
+    def detectar_lote(self, frames):
+        frames = list(frames)
+        prep = [self._letterbox(f) for f in frames]
+        if self.lote_dinamico:
+            entrada = np.stack([p[0] for p in prep])
+            salidas = self.sesion.run(None, {self.nombre_entrada: entrada})[0]
+        else:
+            salidas = [self.sesion.run(None, {self.nombre_entrada: p[0][None]})[0][0] for p in prep]
+        return [
+            self._postprocesar(salida, escala, izq, arr, f.shape[0], f.shape[1])
+            for salida, (_, escala, izq, arr), f in zip(salidas, prep, frames)
+        ]
+
+    def calentar(self) -> None:
+        self.detectar_lote([np.zeros((480, 640, 3), dtype=np.uint8)])
+
+
+def crear_detector(backend: str, model_path: str, conf: float = 0.4, **kwargs):
+    if backend == "torch":
+        return DetectorYOLO(model_path, conf=conf, **kwargs)
+    if backend == "onnx":
+        return DetectorONNX(model_path, conf=conf, **kwargs)
+    raise ValueError(f"Backend de detector desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+
+def iou(a, b) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def comparar_detectores(ref, candidato, frames, iou_min: float = 0.5) -> dict:
+    """
+    Paridad entre dos backends: empareja cada caja de `ref` con la caja de
+    `candidato` de mayor IoU en el mismo frame.
+    """
+    emparejadas, faltantes, sobrantes = 0, 0, 0
+    ious, difs_conf = [], []
+    for frame in frames:
+        cajas_ref = ref.detectar_lote([frame])[0]
+        cajas_cand = candidato.detectar_lote([frame])[0]
+        usadas = set()
+        for caja in cajas_ref:
+            mejor, mejor_iou = None, 0.0
+            for j, otra in enumerate(cajas_cand):
+                if j in usadas:
+                    continue
+                valor = iou(caja, otra)
+                if valor > mejor_iou:
+                    mejor, mejor_iou = j, valor
+            if mejor is not None and mejor_iou >= iou_min:
+                usadas.add(mejor)
+                emparejadas += 1
+                ious.append(mejor_iou)
+                difs_conf.append(abs(caja[4] - cajas_cand[mejor][4]))
+            else:
+                faltantes += 1
+        sobrantes += len(cajas_cand) - len(usadas)
+
+    total_ref = emparejadas + faltantes
+    return {
+        "frames": len(frames),
+        "cajas_ref": total_ref,
+        "emparejadas": emparejadas,
+        "faltantes": faltantes,
+        "sobrantes": sobrantes,
+        "recall": emparejadas / total_ref if total_ref else 1.0,
+        "iou_promedio": float(np.mean(ious)) if ious else 0.0,
+        "iou_minimo": float(np.min(ious)) if ious else 0.0,
+        "dif_conf_promedio": float(np.mean(difs_conf)) if difs_conf else 0.0,
+    }
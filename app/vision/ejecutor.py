@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ColaLlena(Exception):
+    """El ejecutor de inferencia no acepta más trabajos por ahora."""
+
+
+class EjecutorInferencia:
+    """
+    Pool de hilos dedicado a YOLO/OCR, separado del event loop de uvicorn.
+    Acepta como máximo `workers + cola_max` trabajos a la vez; el resto se
+    rechaza con ColaLlena para que la API pueda responder 503 de inmediato.
+    """
+
+    def __init__(self, workers: int = 1, cola_max: int = 4) -> None:
+        self.workers = max(1, workers)
+        self.cola_max = max(0, cola_max)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inferencia")
+        self._cupos = threading.BoundedSemaphore(self.workers + self.cola_max)
+        self._lock = threading.Lock()
+        self._en_curso = 0
+
+    @property
+    def en_curso(self) -> int:
+        """Trabajos ejecutándose o esperando en cola."""
+        return self._en_curso
+
+    def _liberar(self, _fut: Future) -> None:
+        with self._lock:
+            self._en_curso -= 1
+        self._cupos.release()
+
+    def enviar(self, fn, *args, **kwargs) -> Future:
+        if not self._cupos.acquire(blocking=False):
+            raise ColaLlena()
+        with self._lock:
+            self._en_curso += 1
+        try:
+            fut = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._liberar(None)
+            raise
+        fut.add_done_callback(self._liberar)
+        return fut
+
+    async def ejecutar(self, fn, *args, **kwargs):
+        """Versión awaitable de enviar(): no bloquea el event loop."""
+        return await asyncio.wrap_future(self.enviar(fn, *args, **kwargs))
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+import cv2
+
+FORMATOS = {"jpg", "webp", "png"}
+
+
+class EscritorImagenes:
+    """
+    Cola de escritura en segundo plano: codifica y guarda las imágenes fuera
+    del camino de la lectura. Cada encolado devuelve un Future que se resuelve
+    con la ruta cuando el archivo ya está en disco (fsync).
+    """
+
+    def __init__(self, formato: str = "jpg", calidad: int = 90, tam_cola: int = 64) -> None:
+        formato = formato.lower().lstrip(".")
+        if formato == "jpeg":
+            formato = "jpg"
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de imagen no soportado: {formato}")
+        self.formato = formato
+        self.calidad = max(1, min(100, calidad))
+
+        self._cola: queue.Queue = queue.Queue(maxsize=max(1, tam_cola))
+        self._carpetas: set[str] = set()    # ya creadas (solo las toca el hilo escritor)
+        self._hilo = threading.Thread(target=self._bucle, name="escritor-imagenes", daemon=True)
+        self._hilo.start()
+
+    @property
+    def extension(self) -> str:
+        return f".{self.formato}"
+
+    def _parametros(self) -> list[int]:
+        if self.formato == "jpg":
+            return [cv2.IMWRITE_JPEG_QUALITY, self.calidad]
+        if self.formato == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, self.calidad]
+        return [cv2.IMWRITE_PNG_COMPRESSION, 3]
+
+    def generar_nombre(self, prefijo: str = "img") -> str:
+        """Nombre único aunque haya varias lecturas en el mismo segundo (o varios procesos)."""
+        timestamp = datetime.now().strftime("%y%m%d_%H%M%S_%f")
+        return f"{prefijo}_{timestamp}_{uuid.uuid4().hex[:6]}{self.extension}"
+
+    def encolar(self, ruta: str, imagen) -> Future:
+        """
+        Encola la escritura de `imagen` en `ruta`. `imagen` puede ser un array
+        o una función sin argumentos que lo construye (se ejecuta en el hilo escritor).
+        """
+        fut: Future = Future()
+        self._cola.put((ruta, imagen, fut))
+        return fut
+
+    def cerrar(self, timeout: float = 10.0) -> None:
+        """Espera a que se vacíe la cola y detiene el hilo."""
+        self._cola.put(None)
+        self._hilo.join(timeout)
+
+    def _bucle(self) -> None:
+        while True:
+            item = self._cola.get()
+            if item is None:
+                return
+            ruta, imagen, fut = item
+            try:
+                if callable(imagen):
+                    imagen = imagen()
+                ok, buffer = cv2.imencode(self.extension, imagen, self._parametros())
+                if not ok:
+                    raise IOError(f"No se pudo codificar {ruta}")
+                carpeta = os.path.dirname(ruta)
+                if carpeta and carpeta not in self._carpetas:
+                    os.makedirs(carpeta, exist_ok=True)
+                    self._carpetas.add(carpeta)
+                with open(ruta, "wb") as f:
+                    f.write(buffer.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"Error guardando imagen {ruta}: {e}")
+                self._carpetas.discard(os.path.dirname(ruta))   # p.ej. la borró la retención
+                fut.set_exception(e)
+            else:
+                fut.set_result(ruta)
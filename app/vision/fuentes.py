@@ -0,0 +1,168 @@
+"""
+Fuentes de frames de una cámara, elegidas por Camara.fuente (o device_index si no tiene):
+
+    "0", "usb:0"                      -> dispositivo local (cv2.VideoCapture(0))
+    "rtsp://...", "http(s)://..."     -> stream de red (RTSP, MJPEG), con timeout de apertura/lectura
+    "archivo:ruta/video.mp4"          -> archivo de video, en bucle y al ritmo de su FPS
+    "carpeta:ruta/fotos"              -> imágenes de la carpeta en orden alfabético, en bucle
+
+Todas exponen abrir() -> bool, leer() -> (ok, frame) y cerrar(). Quien las lee
+en continuo es el hilo de LectorCamara, así la decodificación y los saltos de
+la red nunca bloquean la inferencia. Video y carpeta permiten probar toda la
+ruta de captura (y medir carga) en un PC sin cámaras.
+"""
+import os
+import time
+
+import cv2
+
+ESQUEMAS_RED = ("rtsp", "rtsps", "http", "https")
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+TIMEOUT_RED_MS = 5000
+
+
+def uri_fuente(camara) -> str | None:
+    """URI de la fuente de una Camara: `fuente` si la tiene, si no su device_index."""
+    if camara.fuente:
+        return camara.fuente
+    return str(camara.device_index) if camara.device_index is not None else None
+
+
+class _Ritmo:
+    """Entrega frames a `fps` como una cámara en vivo (0 = tan rápido como se lean)."""
+
+    def __init__(self, fps: float = 0.0) -> None:
+        self.intervalo = 1.0 / fps if fps > 0 else 0.0
+        self._proximo = 0.0
+
+    def esperar(self) -> None:
+        if not self.intervalo:
+            return
+        ahora = time.monotonic()
+        if self._proximo > ahora:
+            time.sleep(self._proximo - ahora)
+        self._proximo = max(ahora, self._proximo) + self.intervalo
+
+
+class FuenteVideo:
+    """cv2.VideoCapture: dispositivo USB, stream de red o archivo de video."""
+
+    def __init__(self, origen, red: bool = False, tiempo_real: bool = False, en_bucle: bool = False) -> None:
+        self.origen = origen
+        self.red = red
+        self.tiempo_real = tiempo_real
+        self.en_bucle = en_bucle
+        self._cap = None
+        self._ritmo = _Ritmo()
+
+    def abrir(self) -> bool:
+        if self.red:
+            # Sin timeout, un RTSP caído deja colgado el read() indefinidamente
+            params = []
+            for prop in ("CAP_PROP_OPEN_TIMEOUT_MSEC", "CAP_PROP_READ_TIMEOUT_MSEC"):
+                if hasattr(cv2, prop):
+                    params += [getattr(cv2, prop), TIMEOUT_RED_MS]
+            self._cap = cv2.VideoCapture(self.origen, cv2.CAP_FFMPEG, params)
+        else:
+            self._cap = cv2.VideoCapture(self.origen)
+        if not self._cap.isOpened():
+            self.cerrar()
+            return False
+        if self.tiempo_real:
+            self._ritmo = _Ritmo(self._cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        return True
+
+    def leer(self):
+        if self._cap is None:
+            return False, None
+        ok, frame = self._cap.read()
+        if not ok and self.en_bucle:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read()
+        if ok:
+            self._ritmo.esperar()
+        return ok, frame
+
+    def cerrar(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class FuenteCarpeta:
+    """Las imágenes de una carpeta como si fueran frames de video."""
+
+    def __init__(self, carpeta: str, fps: float = 10.0, en_bucle: bool = True) -> None:
+        self.carpeta = carpeta
+        self.en_bucle = en_bucle
+        self._ritmo = _Ritmo(fps)
+        self._archivos: list[str] = []
+        self._pos = 0
+
+    def abrir(self) -> bool:
+        if not os.path.isdir(self.carpeta):
+            return False
+        self._archivos = sorted(
+            os.path.join(self.carpeta, n) for n in os.listdir(self.carpeta) if n.lower().endswith(EXTENSIONES_IMAGEN)
+        )
+        self._pos = 0
+        return bool(self._archivos)
+
+    def leer(self):
+        for _ in range(len(self._archivos)):
+            if self._pos >= len(self._archivos):
+                if not self.en_bucle:
+                    break
+                self._pos = 0
+            ruta = self._archivos[self._pos]
+            self._pos += 1
+            frame = cv2.imread(ruta, cv2.IMREAD_COLOR)
+            if frame is not None:
+                self._ritmo.esperar()
+                return True, frame
+        return False, None
+
+    def cerrar(self) -> None:
+        self._archivos = []
+
+
+def crear_fuente(uri: str | None, tiempo_real: bool = True, fps_carpeta: float = 10.0):
+    """
+    Crea la fuente de un URI (ver el docstring del módulo); None si no hay URI.
+    Con tiempo_real=False los videos y carpetas se leen sin esperar entre frames
+    (captura puntual de capturar_placa).
+    """
+    if uri is None:
+        return None
+    uri = str(uri).strip()
+    if uri.isdigit():
+        return FuenteVideo(int(uri))
+    esquema, _, resto = uri.partition(":")
+    esquema = esquema.lower()
+    if esquema == "usb":
+        return FuenteVideo(int(resto))
+    if esquema in ESQUEMAS_RED:
+        return FuenteVideo(uri, red=True)
+    if esquema == "archivo":
+        return FuenteVideo(resto, tiempo_real=tiempo_real, en_bucle=True)
+    if esquema == "carpeta":
+        return FuenteCarpeta(resto, fps=fps_carpeta if tiempo_real else 0.0)
+    raise ValueError(f"Fuente desconocida: {uri!r} (usb:N, rtsp://, http://, archivo:, carpeta:)")
+
+
+def capturar_frame(uri: str | None, descartar: int = 5):
+    """Abre la fuente, descarta los primeros frames (exposición), lee uno y la cierra. None si falla."""
+    try:
+        fuente = crear_fuente(uri, tiempo_real=False)
+    except ValueError as e:
+        print(f"Error cámara {uri}: {e}")
+        return None
+    if fuente is None or not fuente.abrir():
+        return None
+    try:
+        for _ in range(descartar):
+            fuente.leer()
+        ok, frame = fuente.leer()
+        return frame if ok else None
+    finally:
+        fuente.cerrar()
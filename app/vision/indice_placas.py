@@ -0,0 +1,137 @@
+"""
+Índice en memoria de las placas registradas (tabla vehiculos) para resolver
+una lectura OCR a un vehículo sin consultar la BD.
+
+Tres niveles de búsqueda, de más a menos estricto:
+    exacta     -> mismo texto normalizado ("ABC - 123" == "ABC-123" == "abc123")
+    confusion  -> misma clave de confusión (O/0/D/Q, I/1/L/T, S/5, B/8, Z/2, G/6, A/4)
+    cercana    -> claves a una edición (un carácter sobrante, faltante o distinto)
+
+Las cercanas salen de un índice de borrados (cada clave se guarda también con
+cada uno de sus caracteres eliminado), así toda búsqueda son unas pocas
+consultas a diccionarios, sin recorrer las placas.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from app.vision.votacion import distancia_edicion
+
+CLASES_CONFUSION = ("O0DQ", "I1LT", "S5", "B8", "Z2", "G6", "A4")
+_A_CLASE = {c: grupo[0] for grupo in CLASES_CONFUSION for c in grupo}
+
+
+def normalizar_placa(texto: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]", "", texto).upper()
+
+
+def clave_confusion(placa: str) -> str:
+    """Reemplaza cada carácter por el representante de su clase de confusión."""
+    return "".join(_A_CLASE.get(c, c) for c in placa)
+
+
+def _borrados(clave: str) -> set[str]:
+    return {clave[:i] + clave[i + 1:] for i in range(len(clave))}
+
+
+class IndicePlacas:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._placas: dict[int, tuple[str, str]] = {}       # id -> (placa como está en BD, normalizada)
+        self._por_placa: dict[str, int] = {}                # normalizada -> id
+        self._por_clave: dict[str, set[int]] = defaultdict(set)
+        self._por_borrado: dict[str, set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._placas)
+
+    def cargar(self, vehiculos) -> None:
+        """Reconstruye el índice desde un iterable de (id, placa)."""
+        with self._lock:
+            self._placas.clear()
+            self._por_placa.clear()
+            self._por_clave.clear()
+            self._por_borrado.clear()
+            for vehiculo_id, placa in vehiculos:
+                self._agregar(vehiculo_id, placa)
+
+    def agregar(self, vehiculo_id: int, placa: str) -> None:
+        """Alta o cambio de placa de un vehículo."""
+        with self._lock:
+            self._quitar(vehiculo_id)
+            self._agregar(vehiculo_id, placa)
+
+    def quitar(self, vehiculo_id: int) -> None:
+        with self._lock:
+            self._quitar(vehiculo_id)
+
+    def _agregar(self, vehiculo_id: int, placa: str) -> None:
+        normalizada = normalizar_placa(placa)
+        clave = clave_confusion(normalizada)
+        self._placas[vehiculo_id] = (placa, normalizada)
+        self._por_placa[normalizada] = vehiculo_id
+        self._por_clave[clave].add(vehiculo_id)
+        for borrado in _borrados(clave):
+            self._por_borrado[borrado].add(vehiculo_id)
+
+    def _quitar(self, vehiculo_id: int) -> None:
+        anterior = self._placas.pop(vehiculo_id, None)
+        if anterior is None:
+            return
+        normalizada = anterior[1]
+        clave = clave_confusion(normalizada)
+        if self._por_placa.get(normalizada) == vehiculo_id:
+            del self._por_placa[normalizada]
+        for indice, k in [(self._por_clave, clave)] + [(self._por_borrado, b) for b in _borrados(clave)]:
+            ids = indice.get(k)
+            if ids is not None:
+                ids.discard(vehiculo_id)
+                if not ids:
+                    del indice[k]
+
+    def _candidatos_cercanos(self, clave: str) -> set[int]:
+        ids = set(self._por_borrado.get(clave, ()))        # a la placa le sobra un carácter
+        for borrado in _borrados(clave):
+            ids |= self._por_clave.get(borrado, set())      # a la lectura le sobra un carácter
+            ids |= self._por_borrado.get(borrado, set())    # un carácter distinto
+        return ids
+
+    def buscar(self, texto: str, cercanas: bool = True) -> dict | None:
+        """
+        Resuelve una lectura (con o sin formato) al vehículo registrado.
+        Devuelve {"vehiculo_id", "placa", "coincidencia", "distancia"} o None
+        si no hay candidato o si hay varios igual de cercanos (ambiguo).
+        """
+        normalizada = normalizar_placa(texto)
+        if not normalizada:
+            return None
+        clave = clave_confusion(normalizada)
+        with self._lock:
+            vehiculo_id = self._por_placa.get(normalizada)
+            if vehiculo_id is not None:
+                return self._resultado(vehiculo_id, "exacta", 0)
+
+            coincidencia = "confusion"
+            ids = self._por_clave.get(clave, set())
+            if not ids and cercanas:
+                coincidencia = "cercana"
+                ids = {
+                    i for i in self._candidatos_cercanos(clave)
+                    if distancia_edicion(clave, clave_confusion(self._placas[i][1])) <= 1
+                }
+            if not ids:
+                return None
+
+            distancias = sorted((distancia_edicion(normalizada, self._placas[i][1]), i) for i in ids)
+            if len(distancias) > 1 and distancias[0][0] == distancias[1][0]:
+                return None
+            distancia, vehiculo_id = distancias[0]
+            return self._resultado(vehiculo_id, coincidencia, distancia)
+
+    def _resultado(self, vehiculo_id: int, coincidencia: str, distancia: int) -> dict:
+        return {
+            "vehiculo_id": vehiculo_id,
+            "placa": self._placas[vehiculo_id][0],
+            "coincidencia": coincidencia,
+            "distancia": distancia,
+        }
@@ -1,10 +1,100 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
-import easyocr
-import re
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from app.vision.almacen_imagenes import PANEL_ANCHO
+from app.vision.cache_ocr import CacheOCR, hash_perceptual
+from app.vision.calidad import calidad_frame, calidad_recorte
+from app.vision.detectores import crear_detector
+from app.vision.escritor_imagenes import EscritorImagenes
+from app.vision.fuentes import crear_fuente
+from app.vision.metricas import cronometro_actual, etapa
+from app.vision.motores_ocr import crear_motor_ocr
+from app.vision.preprocesado import PreprocesadorPlaca
+from app.vision.roi import zona_roi
+from app.vision.votacion import FORMATO_PLACA, corregir_placa, formatear_placa, fusionar_lecturas
+
+
+class LoteadorYOLO:
+    """
+    Junta los frames que llegan de varias capturas concurrentes y los pasa al
+    detector en un solo lote. Espera como máximo `espera_ms` desde el primer
+    frame o hasta completar `lote_max` frames, lo que ocurra primero.
+    """
+
+    def __init__(self, detector, lote_max: int = 4, espera_ms: float = 5.0) -> None:
+        self.detector = detector
+        self.lote_max = max(1, lote_max)
+        self.espera_s = max(0.0, espera_ms) / 1000
+        self._cola: queue.Queue = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name="yolo-lotes", daemon=True)
+        self._hilo.start()
+
+    def detectar(self, frame):
+        """Bloquea hasta tener las cajas (x1, y1, x2, y2, conf) de este frame."""
+        return self.detectar_varios([frame])[0]
+
+    def detectar_varios(self, frames):
+        """Como detectar, para varios frames a la vez (p.ej. una portería): entran seguidos al lote."""
+        futs = []
+        for frame in frames:
+            fut: Future = Future()
+            self._cola.put((frame, fut))
+            futs.append(fut)
+        return [fut.result() for fut in futs]
+
+    def cerrar(self) -> None:
+        self._cola.put(None)
+        self._hilo.join(timeout=2.0)
+        # Frames que llegaron después del cierre (p.ej. al cambiar de modelo): se atienden aquí
+        while True:
+            try:
+                item = self._cola.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                continue
+            frame, fut = item
+            try:
+                fut.set_result(self.detector.detectar_lote([frame])[0])
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _bucle(self) -> None:
+        while True:
+            item = self._cola.get()
+            if item is None:
+                return
+            lote = [item]
+            limite = time.monotonic() + self.espera_s
+            while len(lote) < self.lote_max:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    sig = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if sig is None:
+                    self._cola.put(None)   # se atiende después de este lote
+                    break
+                lote.append(sig)
+
+            frames = [f for f, _ in lote]
+            try:
+                resultados = self.detector.detectar_lote(frames)
+            except Exception as e:
+                for _, fut in lote:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), res in zip(lote, resultados):
+                fut.set_result(res)
+
 
 class LectorPlacas:
     def __init__(
@@ -13,96 +103,162 @@ class LectorPlacas:
         use_gpu: bool = False,
         guardar_img: bool = True,
         nivel_procesamiento: float = 0.5, 
+        niveles_cascada: list[float] | None = None,
+        cascada_min_confianza: float = 0.6,
         dir_capturas: str = "app/vision/capturas/capturas_completas", 
         dir_procesadas: str = "app/vision/capturas/placas_procesadas",
-        model_path: str = "app/vision/modelo/license_plate_detector.pt"
+        model_path: str = "app/vision/modelo/license_plate_detector.pt",
+        detector_backend: str = "torch",
+        detector_opciones: dict | None = None,
+        ocr_backend: str = "easyocr",
+        ocr_opciones: dict | None = None,
+        lote_max: int = 1,
+        lote_espera_ms: float = 5.0,
+        formato_img: str = "jpg",
+        calidad_img: int = 90,
+        cache_max: int = 256,
+        cache_ttl_s: float = 30.0,
+        cache_distancia: int = 4,
+        rois: dict | None = None,
+        calidad_min: float = 0.0,
+        calidad_candidatos: int = 1,
+        cargar_modelos: bool = True,
     ) -> None:
         self.min_confidence_ocr = min_confidence_ocr
+        self.use_gpu = use_gpu
+        self.model_path = model_path
+        self.detector_backend = detector_backend
+        self.detector_opciones = detector_opciones or {}
+        self.ocr_backend = ocr_backend
+        self.ocr_opciones = ocr_opciones or {}
+        self.lote_max = lote_max
+        self.lote_espera_ms = lote_espera_ms
         self.guardar_img = guardar_img
         # Aseguramos que esté entre 0 y 1
         self.nivel_procesamiento = max(0.0, min(1.0, nivel_procesamiento))
+        self.preprocesador = PreprocesadorPlaca(self.nivel_procesamiento)
+        # Niveles a probar en orden (el más barato primero); sin cascada, solo nivel_procesamiento
+        self.niveles = [max(0.0, min(1.0, n)) for n in (niveles_cascada or [])] or [self.nivel_procesamiento]
+        self.cascada_min_confianza = cascada_min_confianza
+        self.cascada_conteos = Counter()     # nivel que dio la lectura -> veces
+        self._lock_conteos = threading.Lock()
         self.dir_capturas = dir_capturas
         self.dir_procesadas = dir_procesadas
+        # camara_id -> (x1, y1, x2, y2) en fracciones: zona del frame donde se busca la placa
+        self.rois = rois if rois is not None else {}
+        # Frames con puntaje de calidad.py bajo calidad_min no van a YOLO/OCR (0 = sin filtro);
+        # en una captura puntual se elige el mejor de los últimos calidad_candidatos frames
+        self.calidad_min = calidad_min
+        self.calidad_candidatos = max(1, calidad_candidatos)
         
+        self.escritor = None
         if self.guardar_img:
             os.makedirs(self.dir_capturas, exist_ok=True)
             os.makedirs(self.dir_procesadas, exist_ok=True)
+            self.escritor = EscritorImagenes(formato=formato_img, calidad=calidad_img)
         
-        print("Cargando modelo OCR...")
-        self.reader = easyocr.Reader(['en'], gpu=use_gpu)
-        
-        print(f"Cargando modelo YOLO: {model_path}...")
-        self.model = YOLO(model_path) 
+        self.ocr = None
+        self.detector = None
+        self.loteador = None
+        # Un predict a la vez sobre el modelo (YOLO no es seguro entre hilos) cuando no hay loteador
+        self._lock_detector = threading.Lock()
+        self.sombra = None      # modelo candidato que lee una fracción de las lecturas (ver recarga.Sombra)
+        if cargar_modelos:
+            self.cargar_ocr()
+            self.cargar_detector()
+
+        # Lecturas OCR recientes por hash del recorte (cache_max=0 la desactiva)
+        self.cache_ocr = None
+        if cache_max > 0:
+            self.cache_ocr = CacheOCR(max_items=cache_max, ttl_s=cache_ttl_s, distancia_max=cache_distancia)
+
+    def cargar_ocr(self) -> None:
+        # El motor importa sus dependencias al crearse (easyocr arrastra torch)
+        print(f"Cargando motor OCR [{self.ocr_backend}]...")
+        self.ocr = crear_motor_ocr(self.ocr_backend, use_gpu=self.use_gpu, **self.ocr_opciones)
 
-        # Diccionarios de corrección
-        self.dict_char_to_int = {'O': '0', 'I': '1', 'J': '3', 'A': '4', 'G': '6', 'S': '5'}
-        self.dict_int_to_char = {'0': 'O', '1': 'I', '3': 'J', '4': 'A', '6': 'G', '5': 'S'}
+    def cargar_detector(self) -> None:
+        print(f"Cargando detector [{self.detector_backend}]: {self.model_path}...")
+        self.detector = crear_detector(
+            self.detector_backend, self.model_path, conf=0.4, **self.detector_opciones
+        )
+
+        # Con lote_max > 1 las capturas concurrentes comparten un predict por lotes
+        if self.lote_max > 1:
+            self.loteador = LoteadorYOLO(self.detector, lote_max=self.lote_max, espera_ms=self.lote_espera_ms)
+
+    def adoptar_modelos(self, otro: "LectorPlacas", ocr: bool = True):
+        """
+        Pasa a usar el detector y (con `ocr`) el motor OCR, ya cargados y calentados, de `otro`.
+        Cada referencia cambia de una vez: las lecturas en curso terminan con los
+        modelos anteriores y las siguientes usan los nuevos. Devuelve el loteador
+        anterior (o None) para cerrarlo cuando ya no tenga frames pendientes.
+        """
+        loteador_previo = self.loteador
+        loteador = None
+        if self.lote_max > 1:
+            loteador = LoteadorYOLO(otro.detector, lote_max=self.lote_max, espera_ms=self.lote_espera_ms)
+        self.model_path = otro.model_path
+        self.detector_backend = otro.detector_backend
+        self.detector_opciones = otro.detector_opciones
+        self.detector, self.loteador = otro.detector, loteador
+        if ocr and otro.ocr is not self.ocr:
+            self.ocr_backend = otro.ocr_backend
+            self.ocr_opciones = otro.ocr_opciones
+            self.ocr = otro.ocr
+            # Las lecturas en cache son del motor anterior
+            if self.cache_ocr is not None:
+                self.cache_ocr.vaciar()
+        return loteador_previo
+
+    def calentar_detector(self) -> None:
+        """Primera inferencia sobre un frame negro para pagar la inicialización perezosa del backend."""
+        self.detector.calentar()
+
+    def calentar_ocr(self) -> None:
+        self.ocr.calentar()
+
+    def cerrar(self) -> None:
+        if self.loteador is not None:
+            self.loteador.cerrar()
+        if self.escritor is not None:
+            self.escritor.cerrar()
+
+    def _detectar(self, frame):
+        return self.detectar_lote([frame])[0]
+
+    def detectar_lote(self, frames):
+        """
+        Cajas (x1, y1, x2, y2, conf) de cada frame completo. Todo predict pasa por
+        el hilo del loteador o por el lock, nunca en paralelo: se puede llamar
+        desde cualquier hilo (p.ej. la paridad de recarga.py).
+        """
+        if self.loteador is not None:
+            return self.loteador.detectar_varios(frames)
+        with self._lock_detector:
+            return self.detector.detectar_lote(frames)
 
     def _generar_nombre_archivo(self):
-        timestamp = datetime.now().strftime("%y%m%d_%H%M%S")
-        return f"img_{timestamp}.png"
+        return self.escritor.generar_nombre()
 
     def _procesar_imagen_placa(self, img_placa):
         """
         Mezcla la imagen original con la procesada según self.nivel_procesamiento.
+        (ver PreprocesadorPlaca: reutiliza buffers en vez de crear arrays por llamada)
         """
-        # 1. Versión Suave (Base): Solo escala de grises
-        gray_base = cv2.cvtColor(img_placa, cv2.COLOR_BGR2GRAY)
-        
-        # Si el nivel es 0, no hacemos nada más (ahorramos proceso)
-        if self.nivel_procesamiento <= 0.05:
-            return gray_base
-
-        # 2. Versión Agresiva: Filtro Amarillo + Binarización Otsu
-        img_proc = img_placa.copy()
-        
-        # Amarillo -> Blanco
-        hsv = cv2.cvtColor(img_proc, cv2.COLOR_BGR2HSV)
-        lower_yellow = np.array([15, 80, 80]) 
-        upper_yellow = np.array([35, 255, 255])
-        mask = cv2.inRange(hsv, lower_yellow, upper_yellow)
-        img_proc[mask > 0] = [255, 255, 255]
-        
-        # Binarización fuerte
-        gray_proc = cv2.cvtColor(img_proc, cv2.COLOR_BGR2GRAY)
-        _, binary = cv2.threshold(gray_proc, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Si el nivel es 1.0 (o muy cercano), devolvemos la binaria pura
-        if self.nivel_procesamiento >= 0.95:
-            return binary
-            
-        # 3. Mezcla (Blending)
-        # Fórmula: Final = (Agresiva * alpha) + (Suave * beta)
-        # Esto restaura detalles perdidos por el binarizado fuerte
-        alpha = self.nivel_procesamiento
-        beta = 1.0 - alpha
-        
-        # addWeighted funde ambas imágenes
-        img_final = cv2.addWeighted(binary, alpha, gray_base, beta, 0)
-        
-        return img_final
-
-    def _formatear_texto(self, texto_raw):
-        limpio = re.sub(r'[^A-Za-z0-9]', '', texto_raw).upper()
-        if len(limpio) == 6:
-            letras_final = [self.dict_int_to_char.get(c, c) for c in limpio[:3]]
-            nums_final = [self.dict_char_to_int.get(c, c) for c in limpio[3:]]
-            return f"{''.join(letras_final)} - {''.join(nums_final)}"
-        if len(limpio) > 3:
-            return f"{limpio[:3]} - {limpio[3:]}"
-        return limpio
+        return self.preprocesador.procesar(img_placa)
 
     def _crear_imagen_compuesta(self, frame, recorte_placa, encontro_placa=True):
         h_frame = frame.shape[0]
         
         if not encontro_placa:
-            h_recorte, w_recorte = 150, 400
+            h_recorte, w_recorte = 150, PANEL_ANCHO
             recorte_placa = np.zeros((h_recorte, w_recorte, 3), dtype=np.uint8)
             cv2.putText(recorte_placa, "NO PLACA", (10, 80), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
         
         h_recorte, w_recorte = recorte_placa.shape[:2]
-        canvas_ancho = 400 
+        canvas_ancho = PANEL_ANCHO
         canvas_recorte = np.zeros((h_frame, canvas_ancho, 3), dtype=np.uint8)
         
         if w_recorte > canvas_ancho:
@@ -119,67 +275,415 @@ class LectorPlacas:
         
         return cv2.hconcat([frame, canvas_recorte])
 
-    def capturar_placa(self, camera_index: int):
-        cap = cv2.VideoCapture(camera_index)
-        if not cap.isOpened():
-            print(f"Error cámara {camera_index}")
-            return "ERR_CAM", 0.0, None, None
-        
-        for _ in range(5): cap.read()
-        ret, frame = cap.read()
-        cap.release()
-        
-        if not ret: return "ERR_FRAME", 0.0, None, None
+    def _sin_lecturas(self, estado: str, ruta_imagen=None) -> dict:
+        return {"estado": estado, "lecturas": [], "ruta_imagen": ruta_imagen}
 
-        # Predicción
-        results = self.model.predict(frame, verbose=False, conf=0.4)
-        
-        placa_recortada = None
-        conf_deteccion = 0.0
+    def capturar_placa(self, fuente, frames: int = 1, umbral_votacion: float = 0.8, camara_id=None):
+        """Abre la fuente (URI de fuentes.py o índice de dispositivo), lee y la cierra."""
+        with etapa("open_camera"):
+            try:
+                cap = crear_fuente(fuente, tiempo_real=False)
+            except ValueError as e:     # URI no soportado (p.ej. editado a mano en la BD)
+                print(f"Error cámara {fuente}: {e}")
+                return self._sin_lecturas("ERR_CAM")
+            abierta = cap is not None and cap.abrir()
+        if not abierta:
+            print(f"Error cámara {fuente}")
+            return self._sin_lecturas("ERR_CAM")
         
-        if len(results[0].boxes) > 0:
-            best_box = results[0].boxes[0]
-            coords = best_box.xyxy[0].cpu().numpy().astype(int)
-            conf_deteccion = float(best_box.conf[0])
-            x1, y1, x2, y2 = coords
-            y1, x1 = max(0, y1), max(0, x1)
-            y2, x2 = min(frame.shape[0], y2), min(frame.shape[1], x2)
-            placa_recortada = frame[y1:y2, x1:x2]
+        try:
+            with etapa("discard_frames"):
+                previos = [f for ok, f in (cap.leer() for _ in range(5)) if ok]
 
-        ruta_final_completa = None
-        ruta_final_procesada = None
+            if frames > 1:
+                return self.leer_placa_votacion(self._leer_rafaga(cap, frames), umbral_votacion, camara_id)
+
+            with etapa("grab_frame"):
+                ret, frame = cap.leer()
+        finally:
+            cap.cerrar()
         
-        if self.guardar_img:
-            nombre_archivo = self._generar_nombre_archivo()
-            img_compuesta = self._crear_imagen_compuesta(
-                frame, 
-                placa_recortada if placa_recortada is not None else np.array([]), 
-                encontro_placa=(placa_recortada is not None)
-            )
-            ruta_final_completa = os.path.join(self.dir_capturas, nombre_archivo)
-            cv2.imwrite(ruta_final_completa, img_compuesta)
-
-        if placa_recortada is None:
-            return "NO DETECTADO", 0.0, ruta_final_completa, None
+        if not ret: return self._sin_lecturas("ERR_FRAME")
 
-        # --- AQUI USAMOS EL NIVEL DE PROCESAMIENTO ---
-        placa_para_ocr = self._procesar_imagen_placa(placa_recortada)
+        # Los últimos frames descartados también son candidatos: sin lecturas extra de la cámara
+        candidatos = [frame]
+        if self.calidad_candidatos > 1:
+            candidatos = previos[-(self.calidad_candidatos - 1):] + candidatos
+        return self.leer_placas(self.mejor_frame(candidatos, camara_id), camara_id)
 
-        if self.guardar_img:
-            ruta_final_procesada = os.path.join(self.dir_procesadas, nombre_archivo)
-            cv2.imwrite(ruta_final_procesada, placa_para_ocr)
+    def _leer_rafaga(self, cap, cantidad: int):
+        for _ in range(cantidad):
+            with etapa("grab_frame"):
+                ret, frame = cap.leer()
+            if not ret:
+                return
+            yield frame
 
-        # OCR
-        ocr_results = self.reader.readtext(placa_para_ocr)
-        texto_final = "NO LEIDO"
-        confianza_ocr = 0.0
-        
+    def puntuar_frame(self, frame, camara_id=None) -> float:
+        """Puntaje de calidad (0-1) del frame, medido en la ROI de la cámara."""
+        with etapa("quality"):
+            return calidad_frame(frame, self.rois.get(camara_id))
+
+    def mejor_frame(self, frames, camara_id=None):
+        """El candidato de mejor puntaje (el único si hay uno, None si no hay)."""
+        if len(frames) <= 1:
+            return frames[0] if frames else None
+        return max(frames, key=lambda f: self.puntuar_frame(f, camara_id))
+
+    def _filtrar_calidad(self, frames, camara_id=None):
+        """
+        Salta los frames con puntaje bajo calidad_min. Si ninguno lo pasa, entrega
+        al final el menos malo: mejor intentar leerlo que no intentar nada.
+        """
+        if self.calidad_min <= 0:
+            yield from frames
+            return
+        respaldo = None       # (puntaje, frame)
+        paso_alguno = False
+        for frame in frames:
+            puntaje = self.puntuar_frame(frame, camara_id)
+            if puntaje >= self.calidad_min:
+                paso_alguno = True
+                yield frame
+            elif respaldo is None or puntaje > respaldo[0]:
+                respaldo = (puntaje, frame)
+        if not paso_alguno and respaldo is not None:
+            yield respaldo[1]
+
+    def _zona_deteccion(self, frame, roi=None):
+        """La ROI del frame reducida al imgsz del detector, con (escala, ox, oy) para deshacerlo."""
+        # Con una ROI de pocos píxeles para este frame (p.ej. 0,0,0.001,0.001) se usa el frame completo
+        zona, ox, oy = zona_roi(frame, roi)
+        # INTER_AREA una vez aquí en vez del resize lineal del letterbox sobre el frame grande
+        escala = min(1.0, self.detector.imgsz / max(zona.shape[:2]))
+        if escala < 1.0:
+            zona = cv2.resize(zona, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+        return zona, escala, ox, oy
+
+    @staticmethod
+    def _cajas_en_frame(cajas, escala: float, ox: int, oy: int):
+        return [
+            (x1 / escala + ox, y1 / escala + oy, x2 / escala + ox, y2 / escala + oy, conf)
+            for x1, y1, x2, y2, conf in cajas
+        ]
+
+    # --- etapas de leer_placas, públicas para tools/ (benchmark_vision) ---
+    def detectar_en_roi(self, frame, roi=None):
+        """
+        Detecta sobre la ROI reducida al imgsz del detector y devuelve las cajas
+        en píxeles del frame completo, para recortar la placa a resolución original.
+        """
+        zona, escala, ox, oy = self._zona_deteccion(frame, roi)
+        return self._cajas_en_frame(self._detectar(zona), escala, ox, oy)
+
+    def _detectar_placas(self, frame, max_placas: int | None = None, camara_id=None):
+        with etapa("detect"):
+            cajas = self.detectar_en_roi(frame, self.rois.get(camara_id))
+        with etapa("crop"):
+            return self.recortar_placas(frame, cajas, max_placas)
+
+    def recortar_placas(self, frame, cajas_detector, max_placas: int | None = None):
+        """
+        Todas las placas sobre el umbral del detector como (recorte, (x1, y1, x2, y2), confianza),
+        de la más prometedora a la menos: confianza ponderada por el tamaño de la caja
+        respecto a la mayor del frame (la placa grande es el auto más cercano y lee mejor).
+        """
+        h, w = frame.shape[:2]
+        cajas = []
+        for *coords, conf_deteccion in cajas_detector:
+            x1, y1, x2, y2 = (int(v) for v in coords)
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w, x2), min(h, y2)
+            if x2 > x1 and y2 > y1:
+                cajas.append(((x1, y1, x2, y2), float(conf_deteccion)))
+        if not cajas:
+            return []
+
+        area = lambda c: (c[2] - c[0]) * (c[3] - c[1])
+        area_max = max(area(c) for c, _ in cajas)
+        cajas.sort(key=lambda x: -x[1] * (area(x[0]) / area_max) ** 0.5)
+        if max_placas is not None:
+            cajas = cajas[:max_placas]
+        return [(frame[y1:y2, x1:x2], (x1, y1, x2, y2), conf) for (x1, y1, x2, y2), conf in cajas]
+
+    def _interpretar_ocr(self, ocr_results):
+        """Devuelve (texto sin formatear, confianza promedio) o (None, 0.0) si no hay lecturas válidas."""
         validos = [res for res in ocr_results if res[2] >= self.min_confidence_ocr]
-        
-        if validos:
-            texto_concat = "".join([res[1] for res in validos])
-            confianza_promedio = sum([res[2] for res in validos]) / len(validos)
-            texto_final = self._formatear_texto(texto_concat)
-            confianza_ocr = confianza_promedio
-        
-        return texto_final, confianza_ocr, ruta_final_completa, ruta_final_procesada
+        if not validos:
+            return None, 0.0
+        texto_concat = "".join([res[1] for res in validos])
+        confianza_promedio = sum([res[2] for res in validos]) / len(validos)
+        return texto_concat, confianza_promedio
+
+    def _lectura_aceptable(self, texto_raw, confianza) -> bool:
+        """Corta la cascada: confianza suficiente y formato AAA999 tras la corrección por posición."""
+        return (
+            texto_raw is not None
+            and confianza >= self.cascada_min_confianza
+            and FORMATO_PLACA.match(corregir_placa(texto_raw)) is not None
+        )
+
+    def leer_recortes(self, recortes, camara_id=None, registrar: bool = True):
+        """
+        Preprocesa y hace OCR de varios recortes en cascada: todos se leen
+        primero con el nivel más barato de self.niveles (una sola llamada a
+        leer_lote) y solo los que no dan una lectura aceptable se reprocesan
+        con el siguiente nivel. Si ningún nivel convence queda la mejor lectura
+        (formato válido primero, luego confianza). Los recortes casi idénticos
+        a uno reciente de la misma cámara salen de la cache sin pasar por el OCR.
+        Con registrar=False (lecturas de comparación) no se usa la cache ni se cuenta la cascada.
+        Devuelve una lista de (placa_para_ocr, texto_raw, confianza, nivel) por recorte.
+        """
+        resultados = [None] * len(recortes)
+        hashes = [None] * len(recortes)
+
+        pendientes = list(range(len(recortes)))
+        if self.cache_ocr is not None and registrar:
+            with etapa("ocr_cache"):
+                pendientes = []
+                for i, recorte in enumerate(recortes):
+                    hashes[i] = hash_perceptual(recorte)
+                    previa = self.cache_ocr.buscar(camara_id, hashes[i])
+                    if previa is None:
+                        pendientes.append(i)
+                        continue
+                    texto, confianza, nivel = previa
+                    nivel = self.niveles[0] if nivel is None else nivel
+                    # La imagen procesada hace falta igual para guardarla
+                    resultados[i] = (self.preprocesador.procesar(recorte, nivel), texto, confianza, nivel)
+
+        leidos = list(pendientes)
+        mejores = {}          # índice -> (puntaje, lectura) de los que aún no convencen
+        # --- AQUI USAMOS EL NIVEL DE PROCESAMIENTO ---
+        for nivel in self.niveles:
+            if not pendientes:
+                break
+            with etapa("preprocess"):
+                procesadas = self.preprocesador.procesar_lote([recortes[i] for i in pendientes], nivel)
+            with etapa("ocr"):
+                lecturas_ocr = self.ocr.leer_lote(procesadas)
+
+            siguientes = []
+            for i, procesada, ocr_results in zip(pendientes, procesadas, lecturas_ocr):
+                texto, confianza = self._interpretar_ocr(ocr_results)
+                if self._lectura_aceptable(texto, confianza):
+                    resultados[i] = (procesada, texto, confianza, nivel)
+                    continue
+                formato_ok = texto is not None and FORMATO_PLACA.match(corregir_placa(texto)) is not None
+                puntaje = (formato_ok, confianza)
+                if i not in mejores or puntaje > mejores[i][0]:
+                    mejores[i] = (puntaje, (procesada, texto, confianza, nivel))
+                siguientes.append(i)
+            pendientes = siguientes
+
+        for i in pendientes:
+            resultados[i] = mejores[i][1]
+
+        if not registrar:
+            return resultados
+        with self._lock_conteos:
+            for i in leidos:
+                self.cascada_conteos["ninguno" if i in pendientes else resultados[i][3]] += 1
+        for i in leidos:
+            _, texto, confianza, nivel = resultados[i]
+            if hashes[i] is not None and texto is not None:
+                self.cache_ocr.guardar(camara_id, hashes[i], texto, confianza, nivel)
+        return resultados
+
+    def estadisticas_cascada(self) -> dict:
+        """Veces que cada nivel de la cascada dio la lectura ('ninguno' = ningún nivel convenció)."""
+        with self._lock_conteos:
+            return {
+                "niveles": self.niveles,
+                "min_confianza": self.cascada_min_confianza,
+                "aciertos": {str(nivel): n for nivel, n in self.cascada_conteos.items()},
+            }
+
+    def _leer_recorte(self, placa_recortada, camara_id=None):
+        return self.leer_recortes([placa_recortada], camara_id)[0]
+
+    def guardar_imagenes(self, frame, recortes, procesadas):
+        """
+        Encola la imagen compuesta (con el primer recorte, el mejor) y cada
+        recorte procesado en el EscritorImagenes. Devuelve
+        (futuro_completa, [futuro_procesada, ...]): cada Future se resuelve con
+        la ruta cuando el archivo ya está en disco.
+        """
+        if not self.guardar_img:
+            return None, [None] * len(procesadas)
+
+        with etapa("persist"):
+            ruta_final_completa, rutas_procesadas = self._encolar_imagenes(frame, recortes, procesadas)
+
+        # La escritura termina después de responder: su tiempo (cola + codificar + fsync) va aparte
+        crono = cronometro_actual()
+        if crono is not None:
+            ruta_final_completa.add_done_callback(crono.diferida("write", time.perf_counter()))
+        return ruta_final_completa, rutas_procesadas
+
+    def _encolar_imagenes(self, frame, recortes, procesadas):
+        # Carpetas por día (AAAA/MM/DD): listados rápidos y la retención borra días enteros
+        dia = time.strftime("%Y %m %d").split()
+        nombre_archivo = self._generar_nombre_archivo()
+        placa_recortada = recortes[0] if recortes else None
+        # La composición también se arma en el hilo escritor
+        img_compuesta = lambda: self._crear_imagen_compuesta(
+            frame, 
+            placa_recortada if placa_recortada is not None else np.array([]), 
+            encontro_placa=(placa_recortada is not None)
+        )
+        ruta_final_completa = self.escritor.encolar(
+            os.path.join(self.dir_capturas, *dia, nombre_archivo), img_compuesta
+        )
+
+        base, extension = os.path.splitext(nombre_archivo)
+        rutas_procesadas = []
+        for i, placa_para_ocr in enumerate(procesadas):
+            nombre = nombre_archivo if i == 0 else f"{base}_{i}{extension}"
+            rutas_procesadas.append(self.escritor.encolar(
+                os.path.join(self.dir_procesadas, *dia, nombre), placa_para_ocr
+            ))
+        return ruta_final_completa, rutas_procesadas
+
+    def leer_placas(self, frame, camara_id=None, aceptar=None, max_placas: int | None = None):
+        """
+        Detecta y lee todas las placas de un frame ya capturado
+        (p.ej. el último frame del buffer de un LectorCamara).
+        Devuelve {"estado", "lecturas", "ruta_imagen"}; cada lectura es
+        {"placa", "confianza", "confianza_deteccion", "bbox", "nivel_procesamiento", "calidad", "ruta_recorte"}
+        (nivel_procesamiento: el de la cascada que dio la lectura; calidad: puntaje del recorte).
+        Las rutas de imagen se devuelven como Future (ver guardar_imagenes) o None.
+        Si se pasa `aceptar(texto, confianza)`, solo quedan (y se guardan) las lecturas para las que devuelve True.
+        """
+        inicio = time.perf_counter()
+        detecciones = self._detectar_placas(frame, max_placas, camara_id)
+        resultado = self._leer_detecciones(frame, detecciones, camara_id, aceptar)
+        # Con `aceptar` (modo continuo) faltan las lecturas descartadas: no sirve para comparar
+        sombra = self.sombra     # RecargaModelos la puede quitar desde otro hilo
+        if sombra is not None and aceptar is None:
+            sombra.observar(frame, camara_id, resultado, (time.perf_counter() - inicio) * 1000)
+        return resultado
+
+    def placas_leidas(self, frame, camara_id=None) -> set[str]:
+        """
+        Placas (normalizadas) que lee en el frame, sin guardar imágenes ni tocar
+        la cache, la cascada ni la sombra: para comparar modelos (ver recarga.py).
+        """
+        detecciones = self._detectar_placas(frame, camara_id=camara_id)
+        leidas = self.leer_recortes([d[0] for d in detecciones], camara_id, registrar=False)
+        return {corregir_placa(texto) for _, texto, _, _ in leidas if texto is not None}
+
+    def leer_placas_lote(self, frames, camara_ids, max_placas: int | None = None):
+        """
+        leer_placas para varios frames (p.ej. las cámaras de una portería) con un
+        solo predict de YOLO para todos. Devuelve un resultado por frame, en orden.
+        """
+        zonas = [self._zona_deteccion(f, self.rois.get(c)) for f, c in zip(frames, camara_ids)]
+        with etapa("detect"):
+            cajas_por_frame = self.detectar_lote([z[0] for z in zonas])
+        resultados = []
+        for frame, camara_id, (_, escala, ox, oy), cajas in zip(frames, camara_ids, zonas, cajas_por_frame):
+            with etapa("crop"):
+                detecciones = self.recortar_placas(frame, self._cajas_en_frame(cajas, escala, ox, oy), max_placas)
+            resultados.append(self._leer_detecciones(frame, detecciones, camara_id))
+        return resultados
+
+    def _leer_detecciones(self, frame, detecciones, camara_id=None, aceptar=None):
+        """OCR y guardado de las placas ya detectadas de un frame (ver leer_placas)."""
+        if not detecciones:
+            ruta_final_completa = None
+            if aceptar is None:
+                ruta_final_completa, _ = self.guardar_imagenes(frame, [], [])
+            return self._sin_lecturas("NO DETECTADO", ruta_final_completa)
+
+        leidas = self.leer_recortes([d[0] for d in detecciones], camara_id)
+        lecturas, recortes, procesadas = [], [], []
+        for (placa_recortada, bbox, conf_deteccion), (placa_para_ocr, texto_raw, confianza_ocr, nivel) in zip(detecciones, leidas):
+            if texto_raw is None:
+                texto_final, confianza_ocr = "NO LEIDO", 0.0
+            else:
+                with etapa("format"):
+                    texto_final = formatear_placa(texto_raw)
+            if aceptar is not None and not aceptar(texto_final, confianza_ocr):
+                continue
+            with etapa("quality"):
+                calidad = calidad_recorte(placa_recortada)
+            lecturas.append({
+                "placa": texto_final,
+                "confianza": confianza_ocr,
+                "confianza_deteccion": conf_deteccion,
+                "bbox": list(bbox),
+                "nivel_procesamiento": nivel,
+                "calidad": calidad,
+                "ruta_recorte": None,
+            })
+            recortes.append(placa_recortada)
+            procesadas.append(placa_para_ocr)
+
+        ruta_final_completa = None
+        if lecturas:
+            ruta_final_completa, rutas_procesadas = self.guardar_imagenes(frame, recortes, procesadas)
+            for lectura, ruta in zip(lecturas, rutas_procesadas):
+                lectura["ruta_recorte"] = ruta
+        return {"estado": "OK", "lecturas": lecturas, "ruta_imagen": ruta_final_completa}
+
+    def leer_placa_votacion(self, frames, umbral: float = 0.8, camara_id=None):
+        """
+        Lee la placa en varios frames de una ráfaga y fusiona los textos con un
+        voto por carácter ponderado por confianza (ver votacion.fusionar_lecturas).
+        Se detiene antes de agotar la ráfaga cuando hay al menos 2 lecturas y la
+        confianza fusionada supera `umbral`. Solo se sigue la mejor placa de cada
+        frame y solo se guardan las imágenes del frame con mejor lectura. Los
+        frames bajo calidad_min se saltan (ver _filtrar_calidad).
+        Devuelve el mismo formato que leer_placas, con una sola lectura.
+        """
+        lecturas = []
+        mejor = None          # (confianza, frame, recorte, procesada, bbox, conf_deteccion, nivel)
+        ultimo_frame = None
+
+        for frame in self._filtrar_calidad(frames, camara_id):
+            ultimo_frame = frame
+            placas = self._detectar_placas(frame, max_placas=1, camara_id=camara_id)
+            if not placas:
+                continue
+
+            placa_recortada, bbox, conf_deteccion = placas[0]
+            placa_para_ocr, texto_raw, confianza, nivel = self._leer_recorte(placa_recortada, camara_id)
+            if mejor is None or confianza > mejor[0]:
+                mejor = (confianza, frame, placa_recortada, placa_para_ocr, bbox, conf_deteccion, nivel)
+            if texto_raw is None:
+                continue
+
+            with etapa("vote"):
+                lecturas.append((corregir_placa(texto_raw), confianza))
+                _, conf_fusion = fusionar_lecturas(lecturas)
+            if len(lecturas) >= 2 and conf_fusion >= umbral:
+                break
+
+        if ultimo_frame is None:
+            return self._sin_lecturas("ERR_FRAME")
+
+        if mejor is None:
+            ruta_final_completa, _ = self.guardar_imagenes(ultimo_frame, [], [])
+            return self._sin_lecturas("NO DETECTADO", ruta_final_completa)
+
+        _, frame, placa_recortada, placa_para_ocr, bbox, conf_deteccion, nivel = mejor
+        ruta_final_completa, (ruta_final_procesada,) = self.guardar_imagenes(frame, [placa_recortada], [placa_para_ocr])
+
+        if lecturas:
+            texto_fusion, conf_fusion = fusionar_lecturas(lecturas)
+            print(f"Votación: {len(lecturas)} lecturas -> {texto_fusion} ({conf_fusion:.2f})")
+            texto_final = formatear_placa(texto_fusion)
+        else:
+            texto_final, conf_fusion = "NO LEIDO", 0.0
+
+        lectura = {
+            "placa": texto_final,
+            "confianza": conf_fusion,
+            "confianza_deteccion": conf_deteccion,
+            "bbox": list(bbox),
+            "nivel_procesamiento": nivel,
+            "calidad": calidad_recorte(placa_recortada),
+            "ruta_recorte": ruta_final_procesada,
+        }
+        return {"estado": "OK", "lecturas": [lectura], "ruta_imagen": ruta_final_completa}
@@ -0,0 +1,146 @@
+"""
+Tiempos por etapa de la IA de placas, agregados en histogramas por cámara.
+
+LectorPlacas marca sus etapas con `etapa("detect")`, que no hace nada salvo
+que el hilo esté dentro de `cronometrar(...)`: así el mismo código sirve para
+scripts y benchmarks sin medir nada.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# Límites superiores de los buckets, en ms (el último bucket es > 5000)
+LIMITES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_local = threading.local()
+
+
+class Histograma:
+    def __init__(self) -> None:
+        self.conteos = [0] * (len(LIMITES_MS) + 1)
+        self.n = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, ms: float) -> None:
+        self.conteos[bisect_left(LIMITES_MS, ms)] += 1
+        self.n += 1
+        self.suma += ms
+        self.maximo = max(self.maximo, ms)
+
+    def percentil(self, p: float) -> float:
+        """Estimado interpolando dentro del bucket (como histogram_quantile de Prometheus)."""
+        if self.n == 0:
+            return 0.0
+        objetivo = p / 100 * self.n
+        acumulado = 0
+        for i, conteo in enumerate(self.conteos):
+            if conteo and acumulado + conteo >= objetivo:
+                inferior = LIMITES_MS[i - 1] if i > 0 else 0.0
+                superior = LIMITES_MS[i] if i < len(LIMITES_MS) else self.maximo
+                return inferior + (superior - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+        return self.maximo
+
+    def resumen(self) -> dict:
+        return {
+            "n": self.n,
+            "promedio_ms": round(self.suma / self.n, 3) if self.n else 0.0,
+            "p50_ms": round(self.percentil(50), 3),
+            "p95_ms": round(self.percentil(95), 3),
+            "p99_ms": round(self.percentil(99), 3),
+            "max_ms": round(self.maximo, 3),
+            "buckets": {
+                **{f"le_{limite}": c for limite, c in zip(LIMITES_MS, self.conteos)},
+                "mas": self.conteos[-1],
+            },
+        }
+
+
+class MetricasVision:
+    """Histogramas por (cámara, etapa). Seguro entre hilos."""
+
+    def __init__(self) -> None:
+        self._histogramas: dict = {}
+        self._lock = threading.Lock()
+
+    def observar(self, camara_id, etapa: str, ms: float) -> None:
+        with self._lock:
+            por_etapa = self._histogramas.setdefault(camara_id, {})
+            por_etapa.setdefault(etapa, Histograma()).observar(ms)
+
+    def registrar(self, camara_id, tiempos: dict) -> None:
+        for etapa, ms in tiempos.items():
+            self.observar(camara_id, etapa, ms)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                str(camara_id): {etapa: h.resumen() for etapa, h in por_etapa.items()}
+                for camara_id, por_etapa in self._histogramas.items()
+            }
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+
+
+class Cronometro:
+    """Tiempos (ms) de una lectura. Una etapa que se repite (p.ej. en una ráfaga) se acumula."""
+
+    def __init__(self, metricas: MetricasVision | None = None, camara_id=None) -> None:
+        self.metricas = metricas
+        self.camara_id = camara_id
+        self.tiempos: dict[str, float] = {}
+
+    def sumar(self, nombre: str, ms: float) -> None:
+        self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + ms
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, (time.perf_counter() - inicio) * 1000)
+
+    def diferida(self, nombre: str, inicio: float):
+        """
+        Callback para un Future que termina después de la lectura (p.ej. la
+        escritura de imágenes): va directo al histograma, no a `tiempos`.
+        """
+        def _al_terminar(_fut) -> None:
+            if self.metricas is not None:
+                self.metricas.observar(self.camara_id, nombre, (time.perf_counter() - inicio) * 1000)
+        return _al_terminar
+
+
+@contextmanager
+def cronometrar(metricas: MetricasVision | None = None, camara_id=None):
+    """Activa el cronómetro en este hilo; al salir registra los tiempos en `metricas`."""
+    crono = Cronometro(metricas, camara_id)
+    previo = getattr(_local, "crono", None)
+    _local.crono = crono
+    try:
+        yield crono
+    finally:
+        _local.crono = previo
+        if metricas is not None:
+            metricas.registrar(camara_id, crono.tiempos)
+
+
+def cronometro_actual() -> Cronometro | None:
+    return getattr(_local, "crono", None)
+
+
+def etapa(nombre: str):
+    crono = getattr(_local, "crono", None)
+    if crono is None:
+        return nullcontext()
+    return crono.etapa(nombre)
+
+
+def server_timing(tiempos: dict) -> str:
+    """Valor del header Server-Timing (lo muestran las devtools del navegador)."""
+    return ", ".join(f"{nombre};dur={ms:.1f}" for nombre, ms in tiempos.items())
@@ -0,0 +1,157 @@
+"""
+Motores OCR intercambiables para LectorPlacas.
+
+Todos exponen:
+    leer(img)        -> lista de (bbox, texto, confianza), igual que easyocr.readtext
+    leer_lote(imgs)  -> una lista como la de leer() por imagen, en una sola invocación
+    calentar() -> primera lectura sobre una imagen en blanco
+"""
+import string
+
+import cv2
+import numpy as np
+
+BACKENDS = ("easyocr", "segmentacion")
+LETRAS = string.ascii_uppercase
+DIGITOS = string.digits
+CHARSET_PLACA = LETRAS + DIGITOS
+
+# Tamaño normalizado de cada carácter para el clasificador
+ANCHO_CHAR, ALTO_CHAR = 20, 32
+
+
+class MotorEasyOCR:
+    """EasyOCR genérico; con `solo_placa` (opcional) limita el alfabeto a A-Z0-9."""
+
+    nombre = "easyocr"
+
+    def __init__(self, use_gpu: bool = False, solo_placa: bool = False) -> None:
+        import easyocr
+        self.reader = easyocr.Reader(['en'], gpu=use_gpu)
+        self.allowlist = CHARSET_PLACA if solo_placa else None
+
+    def leer(self, img):
+        return self.reader.readtext(img, allowlist=self.allowlist)
+
+    def leer_lote(self, imgs):
+        """
+        readtext_batched necesita un tamaño común: se escalan todos los recortes
+        a 64 px de alto con la proporción mediana (las placas casi no varían).
+        """
+        imgs = list(imgs)
+        if len(imgs) <= 1:
+            return [self.leer(img) for img in imgs]
+        proporcion = float(np.median([img.shape[1] / max(1, img.shape[0]) for img in imgs]))
+        return self.reader.readtext_batched(
+            imgs,
+            n_width=max(1, int(round(64 * proporcion))),
+            n_height=64,
+            batch_size=len(imgs),
+            allowlist=self.allowlist,
+        )
+
+    def calentar(self) -> None:
+        self.leer(np.full((60, 200), 255, dtype=np.uint8))
+
+
+def segmentar_caracteres(img, max_chars: int = 6):
+    """
+    Separa los caracteres de un recorte de placa. Devuelve una lista de
+    (x, glifo) ordenada de izquierda a derecha, con cada glifo binarizado
+    (carácter en blanco) y redimensionado a ANCHO_CHAR x ALTO_CHAR.
+    """
+    gris = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, binaria = cv2.threshold(gris, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    h_img = binaria.shape[0]
+
+    contornos, _ = cv2.findContours(binaria, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    candidatos = []
+    for c in contornos:
+        x, y, w, h = cv2.boundingRect(c)
+        # Los caracteres ocupan buena parte del alto y son más altos que anchos
+        if 0.35 * h_img <= h <= 0.95 * h_img and 0.1 <= w / h <= 1.0:
+            candidatos.append((x, y, w, h))
+
+    # Si sobran (tornillos, bordes, texto de la ciudad) nos quedamos con los más altos
+    candidatos = sorted(candidatos, key=lambda r: -r[3])[:max_chars]
+    glifos = []
+    for x, y, w, h in sorted(candidatos):
+        glifo = cv2.resize(binaria[y:y + h, x:x + w], (ANCHO_CHAR, ALTO_CHAR), interpolation=cv2.INTER_AREA)
+        glifos.append((x, glifo))
+    return glifos
+
+
+def _vectorizar(glifos) -> np.ndarray:
+    if not glifos:
+        return np.zeros((0, ANCHO_CHAR * ALTO_CHAR), dtype=np.float32)
+    X = np.stack([g.reshape(-1) for g in glifos]).astype(np.float32)
+    X -= X.mean(axis=1, keepdims=True)
+    X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-6
+    return X
+
+
+def construir_plantillas(muestras, destino: str) -> int:
+    """
+    Crea el archivo de plantillas a partir de recortes etiquetados.
+    `muestras` es un iterable de (imagen, "ABC123"). Solo se usan los recortes
+    donde la segmentación encuentra tantos caracteres como tiene la etiqueta.
+    """
+    X, y = [], []
+    for img, etiqueta in muestras:
+        glifos = segmentar_caracteres(img, max_chars=len(etiqueta))
+        if len(glifos) != len(etiqueta):
+            continue
+        X.append(_vectorizar([g for _, g in glifos]))
+        y.extend(etiqueta)
+    if not X:
+        raise ValueError("Ninguna muestra se pudo segmentar")
+    np.savez_compressed(destino, X=np.concatenate(X), y=np.array(y))
+    return len(y)
+
+
+class MotorSegmentacion:
+    """
+    OCR liviano para el formato colombiano AAA-999: segmenta los caracteres y
+    los clasifica por vecino más cercano (similitud coseno) contra plantillas.
+    Con 6 caracteres las tres primeras posiciones solo pueden ser letras y las
+    tres últimas solo dígitos.
+    """
+
+    nombre = "segmentacion"
+
+    def __init__(self, plantillas_path: str = "app/vision/modelo/caracteres.npz") -> None:
+        datos = np.load(plantillas_path)
+        self.X = datos["X"].astype(np.float32)
+        self.y = np.array([str(c) for c in datos["y"]])
+        self._es_letra = np.isin(self.y, list(LETRAS))
+
+    def leer(self, img):
+        glifos = segmentar_caracteres(img)
+        if len(glifos) < 4:
+            return []
+
+        sim = _vectorizar([g for _, g in glifos]) @ self.X.T     # (chars, plantillas)
+        if len(glifos) == 6:
+            sim[:3, ~self._es_letra] = -1.0
+            sim[3:, self._es_letra] = -1.0
+        mejores = sim.argmax(axis=1)
+        confianzas = np.clip(sim[np.arange(len(glifos)), mejores], 0.0, 1.0)
+
+        texto = "".join(self.y[mejores])
+        h, w = img.shape[:2]
+        bbox = [[0, 0], [w, 0], [w, h], [0, h]]
+        return [(bbox, texto, float(confianzas.mean()))]
+
+    def leer_lote(self, imgs):
+        return [self.leer(img) for img in imgs]
+
+    def calentar(self) -> None:
+        self.leer(np.full((60, 200), 255, dtype=np.uint8))
+
+
+def crear_motor_ocr(backend: str, use_gpu: bool = False, **kwargs):
+    if backend == "easyocr":
+        return MotorEasyOCR(use_gpu=use_gpu, **kwargs)
+    if backend == "segmentacion":
+        return MotorSegmentacion(**kwargs)
+    raise ValueError(f"Motor OCR desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
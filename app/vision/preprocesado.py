@@ -0,0 +1,98 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Rango HSV del fondo amarillo de las placas colombianas
+AMARILLO_BAJO = np.array([15, 80, 80], dtype=np.uint8)
+AMARILLO_ALTO = np.array([35, 255, 255], dtype=np.uint8)
+
+
+class _Buffers:
+    """Buffers de trabajo que solo crecen; cada recorte usa una vista [:h, :w]."""
+
+    def __init__(self) -> None:
+        self.alto = 0
+        self.ancho = 0
+
+    def asegurar(self, alto: int, ancho: int) -> None:
+        if alto <= self.alto and ancho <= self.ancho:
+            return
+        self.alto, self.ancho = max(alto, self.alto), max(ancho, self.ancho)
+        self.gris = np.empty((self.alto, self.ancho), dtype=np.uint8)
+        self.hsv = np.empty((self.alto, self.ancho, 3), dtype=np.uint8)
+        self.mascara = np.empty((self.alto, self.ancho), dtype=np.uint8)
+        self.gris_proc = np.empty((self.alto, self.ancho), dtype=np.uint8)
+        self.binaria = np.empty((self.alto, self.ancho), dtype=np.uint8)
+
+    def vistas(self, alto: int, ancho: int):
+        return (
+            self.gris[:alto, :ancho],
+            self.hsv[:alto, :ancho],
+            self.mascara[:alto, :ancho],
+            self.gris_proc[:alto, :ancho],
+            self.binaria[:alto, :ancho],
+        )
+
+
+class PreprocesadorPlaca:
+    """
+    Mismo resultado que el preprocesado original de LectorPlacas (gris, filtro
+    amarillo + Otsu, mezcla según `nivel`) pero sin arrays temporales por
+    llamada: las constantes se crean una vez y los intermedios se escriben con
+    `dst=` en buffers por hilo. Solo se asigna la imagen de salida, que queda
+    en manos del llamador (va al OCR y a la cola de escritura).
+
+    Nota: pintar de blanco el amarillo y pasar a gris equivale a
+    max(gris, máscara), así que no hace falta copiar el recorte ni una
+    segunda conversión a gris.
+    """
+
+    def __init__(self, nivel: float = 0.5) -> None:
+        self.nivel = max(0.0, min(1.0, nivel))
+        self._local = threading.local()
+
+    def _buffers(self) -> _Buffers:
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = _Buffers()
+        return buffers
+
+    def _procesar_en(self, img_placa, vistas, nivel: float):
+        gris, hsv, mascara, gris_proc, binaria = vistas
+
+        # 1. Versión Suave (Base): Solo escala de grises
+        gris = cv2.cvtColor(img_placa, cv2.COLOR_BGR2GRAY, dst=gris)
+        if nivel <= 0.05:
+            return gris.copy()
+
+        # 2. Versión Agresiva: Amarillo -> Blanco + Binarización Otsu
+        hsv = cv2.cvtColor(img_placa, cv2.COLOR_BGR2HSV, dst=hsv)
+        mascara = cv2.inRange(hsv, AMARILLO_BAJO, AMARILLO_ALTO, dst=mascara)
+        gris_proc = cv2.max(gris, mascara, dst=gris_proc)
+        _, binaria = cv2.threshold(gris_proc, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=binaria)
+        if nivel >= 0.95:
+            return binaria.copy()
+
+        # 3. Mezcla: Final = (Agresiva * alpha) + (Suave * beta)
+        salida = np.empty(gris.shape, dtype=np.uint8)
+        return cv2.addWeighted(binaria, nivel, gris, 1.0 - nivel, 0, dst=salida)
+
+    def procesar(self, img_placa, nivel: float | None = None):
+        nivel = self.nivel if nivel is None else nivel
+        alto, ancho = img_placa.shape[:2]
+        buffers = self._buffers()
+        buffers.asegurar(alto, ancho)
+        return self._procesar_en(img_placa, buffers.vistas(alto, ancho), nivel)
+
+    def procesar_lote(self, recortes, nivel: float | None = None):
+        """Procesa varios recortes (p.ej. varias placas de un frame) dimensionando los buffers una sola vez."""
+        if not recortes:
+            return []
+        nivel = self.nivel if nivel is None else nivel
+        buffers = self._buffers()
+        buffers.asegurar(max(r.shape[0] for r in recortes), max(r.shape[1] for r in recortes))
+        return [
+            self._procesar_en(r, buffers.vistas(r.shape[0], r.shape[1]), nivel)
+            for r in recortes
+        ]
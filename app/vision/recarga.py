@@ -0,0 +1,467 @@
+"""
+Recarga en caliente de los modelos de visión (detector YOLO y, opcionalmente,
+el motor OCR) sin reiniciar la API ni cortar las capturas en curso:
+
+    1. carga el candidato en un hilo aparte y lo calienta
+    2. paridad: lo compara con el modelo actual sobre capturas guardadas
+       (cajas con comparar_detectores y placas leídas vs la placa en BD)
+    3. si no empeora, el LectorPlacas activo adopta sus modelos de una vez
+
+Ni YOLO ni EasyOCR se pueden usar desde varios hilos a la vez: el candidato
+tiene su propio detector y su propio motor OCR (aunque al promoverse solo se
+adopte el OCR si se pidió recargar_ocr), y las lecturas del modelo actual
+para la paridad corren en el EjecutorInferencia, como una captura más.
+
+Con sombra=True el paso 3 espera: el candidato lee en paralelo una fracción de
+las lecturas reales y se promueve a mano (POST /modelos/promover) después de
+revisar su latencia y coincidencia. VigilanteModelos dispara la recarga cuando
+cambia el archivo del modelo (p.ej. al copiar encima un best.pt reentrenado).
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from sqlmodel import Session, col, select
+
+from app.db import engine
+from app.models.lectura_placa import LecturaPlaca
+from app.vision.almacen_imagenes import frame_de_captura
+from app.vision.cargador import CALENTANDO, CARGANDO, ERROR
+from app.vision.detectores import comparar_detectores
+from app.vision.ejecutor import ColaLlena
+from app.vision.indice_placas import normalizar_placa
+
+INACTIVO = "inactivo"
+VERIFICANDO = "verificando"
+SOMBRA = "sombra"
+PROMOVIDO = "promovido"
+RECHAZADO = "rechazado"
+
+SIN_TEXTO = ("NO DETECTADO", "NO LEIDO")
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+EXTENSIONES_MODELO = {"torch": ".pt", "onnx": ".onnx"}
+GRACIA_CIERRE_S = 5.0      # el loteador anterior se cierra cuando ya no le llegan frames
+
+
+class ConflictoRecarga(Exception):
+    """Ya hay una recarga en curso (o un candidato en sombra), o no hay candidato que promover."""
+
+
+class ModeloNoValido(ValueError):
+    """El modelo pedido no es un archivo .pt/.onnx de la carpeta de modelos."""
+
+
+# ---------------------- paridad ----------------------
+def dir_modelos(cfg, backend: str) -> str:
+    """La carpeta del modelo configurado para `backend` (relativa a la raíz del proyecto)."""
+    configurado = cfg.detector_onnx_modelo if backend == "onnx" else cfg.detector_modelo
+    return os.path.join(RAIZ, os.path.dirname(configurado))
+
+
+def ruta_modelo(nombre: str, backend: str, directorio: str) -> str:
+    """
+    Ruta de un modelo pedido por la API. Solo nombres de archivo dentro de
+    `directorio` (ver dir_modelos): cargar un .pt es deserializar con pickle,
+    así que nunca una ruta arbitraria del disco.
+    """
+    if os.path.basename(nombre) != nombre or "/" in nombre or "\\" in nombre or nombre in ("", ".", ".."):
+        raise ModeloNoValido(f"El modelo debe ser un nombre de archivo dentro de {directorio}")
+    if not nombre.endswith(EXTENSIONES_MODELO[backend]):
+        raise ModeloNoValido(f"Un modelo {backend} debe terminar en {EXTENSIONES_MODELO[backend]}")
+    ruta = os.path.join(directorio, nombre)
+    if not os.path.isfile(ruta):
+        raise ModeloNoValido(f"No existe {ruta}")
+    return ruta
+
+
+def muestras_guardadas(cantidad: int) -> list:
+    """
+    (frame, camara_id, placa guardada) de las capturas legibles más recientes que
+    siguen en disco, sin el panel del recorte (ver frame_de_captura).
+    """
+    stmt = (
+        select(LecturaPlaca.ruta_imagen, LecturaPlaca.camara_id, LecturaPlaca.placa_detectada)
+        .where(col(LecturaPlaca.ruta_imagen).is_not(None), col(LecturaPlaca.placa_detectada).not_in(SIN_TEXTO))
+        .order_by(col(LecturaPlaca.id).desc())
+        .limit(cantidad * 3)      # varias filas pueden compartir imagen, y algunas ya no existen
+    )
+    with Session(engine) as session:
+        filas = session.exec(stmt).all()
+    muestras, vistas = [], set()
+    for ruta, camara_id, placa in filas:
+        if ruta in vistas:
+            continue
+        vistas.add(ruta)
+        img = cv2.imread(ruta, cv2.IMREAD_COLOR)
+        if img is not None:
+            muestras.append((frame_de_captura(img, ruta), camara_id, normalizar_placa(placa)))
+            if len(muestras) >= cantidad:
+                break
+    return muestras
+
+
+def _placas(resultado: dict) -> set[str]:
+    return {normalizar_placa(l["placa"]) for l in resultado["lecturas"] if l["placa"] not in SIN_TEXTO}
+
+
+def _cronometrado(fn, *args):
+    inicio = time.perf_counter()
+    resultado = fn(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def _en_ejecutor(ejecutor, fn, *args):
+    """Corre fn en el EjecutorInferencia como una captura más; con la cola llena espera su turno."""
+    while True:
+        try:
+            return ejecutor.enviar(fn, *args).result()
+        except ColaLlena:
+            time.sleep(0.2)
+
+
+def verificar_paridad(actual, candidato, muestras, ejecutor, recall_min: float, tolerancia: float) -> dict:
+    """
+    Compara el LectorPlacas activo con el candidato sobre las muestras (sin
+    guardar imágenes ni tocar la cache). `actual` detecta por su loteador/lock
+    (LectorPlacas.detectar_lote) y lee en el `ejecutor`, nunca en paralelo a
+    las capturas sobre los mismos modelos.
+    aprobado: el candidato encuentra las cajas del actual (recall >= recall_min)
+    y no acierta la placa guardada menos veces que el actual (con `tolerancia`).
+    """
+    detector = comparar_detectores(actual, candidato, [frame for frame, _, _ in muestras])
+    coinciden, aciertos_actual, aciertos_candidato = 0, 0, 0
+    ms_actual, ms_candidato = 0.0, 0.0
+    for frame, camara_id, placa in muestras:
+        ref, ms = _en_ejecutor(ejecutor, _cronometrado, actual.placas_leidas, frame, camara_id)
+        cand, ms_cand = _cronometrado(candidato.placas_leidas, frame, camara_id)
+        ms_actual += ms
+        ms_candidato += ms_cand
+        coinciden += ref == cand
+        aciertos_actual += placa in ref
+        aciertos_candidato += placa in cand
+
+    n = len(muestras)
+    acierto_actual, acierto_candidato = aciertos_actual / n, aciertos_candidato / n
+    return {
+        "muestras": n,
+        "detector": detector,
+        "coincidencia": round(coinciden / n, 4),
+        "acierto_actual": round(acierto_actual, 4),
+        "acierto_candidato": round(acierto_candidato, 4),
+        "ms_actual": round(ms_actual / n, 1),
+        "ms_candidato": round(ms_candidato / n, 1),
+        "aprobado": detector["recall"] >= recall_min and acierto_candidato >= acierto_actual - tolerancia,
+    }
+
+
+# ---------------------- sombra ----------------------
+class Sombra:
+    """
+    Corre el candidato sobre una `fraccion` de las lecturas reales, en su propio
+    hilo y de a una: si la anterior no terminó, la muestra se descarta (nunca
+    frena ni encola trabajo detrás de las capturas).
+    """
+
+    def __init__(self, candidato, fraccion: float) -> None:
+        self.candidato = candidato
+        self.fraccion = fraccion
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sombra")
+        self._lock = threading.Lock()
+        self._ocupada = False
+        self._cerrada = False
+        self.muestras = 0
+        self.coinciden = 0
+        self.descartadas = 0
+        self.errores = 0
+        self._ms_actual = 0.0
+        self._ms_candidato = 0.0
+
+    def observar(self, frame, camara_id, resultado: dict, ms_actual: float) -> None:
+        if random.random() >= self.fraccion:
+            return
+        with self._lock:
+            if self._cerrada:
+                return      # una captura que tomó la sombra justo antes de quitarla
+            if self._ocupada:
+                self.descartadas += 1
+                return
+            self._ocupada = True
+            self._pool.submit(self._comparar, frame, camara_id, _placas(resultado), ms_actual)
+
+    def _comparar(self, frame, camara_id, placas_actual: set, ms_actual: float) -> None:
+        try:
+            inicio = time.perf_counter()
+            placas = self.candidato.placas_leidas(frame, camara_id)
+            ms = (time.perf_counter() - inicio) * 1000
+            with self._lock:
+                self.muestras += 1
+                self.coinciden += placas == placas_actual
+                self._ms_actual += ms_actual
+                self._ms_candidato += ms
+        except Exception as e:
+            print(f"Error en modo sombra: {e}")
+            with self._lock:
+                self.errores += 1
+        finally:
+            with self._lock:
+                self._ocupada = False
+
+    def resumen(self) -> dict:
+        with self._lock:
+            n = self.muestras
+            return {
+                "fraccion": self.fraccion,
+                "muestras": n,
+                "coincidencia": round(self.coinciden / n, 4) if n else None,
+                "ms_actual": round(self._ms_actual / n, 1) if n else None,
+                "ms_candidato": round(self._ms_candidato / n, 1) if n else None,
+                "descartadas": self.descartadas,
+                "errores": self.errores,
+            }
+
+    def cerrar(self) -> None:
+        """Espera la comparación en curso: al volver, el candidato ya no se usa desde el hilo de la sombra."""
+        with self._lock:
+            self._cerrada = True
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ---------------------- recarga ----------------------
+class RecargaModelos:
+    """
+    Una recarga a la vez. `fabrica(cfg)` crea un LectorPlacas sin modelos, sin
+    guardar imágenes ni cache; `obtener_lector()` devuelve el lector activo y
+    `ejecutor` es el EjecutorInferencia de las capturas.
+    """
+
+    def __init__(self, cfg, obtener_lector, fabrica, ejecutor) -> None:
+        self.cfg = cfg                   # configuración de los modelos activos
+        self._obtener_lector = obtener_lector
+        self._fabrica = fabrica
+        self._ejecutor = ejecutor
+        self._lock = threading.Lock()
+        self._hilo: threading.Thread | None = None
+        self._candidato = None           # (cfg, LectorPlacas, recargar_ocr) esperando promoción en sombra
+        self._retirando = False          # se espera a la sombra antes de promover o descartar
+        self.sombra: Sombra | None = None
+        self.estado = INACTIVO
+        self.candidato: dict | None = None
+        self.paridad: dict | None = None
+        self.ultima_sombra: dict | None = None
+        self.error: str | None = None
+
+    def _paso(self, estado: str) -> None:
+        self.estado = estado
+        print(f"Recarga de modelos: {estado}")
+
+    def _ocupada(self) -> bool:
+        return (self._hilo is not None and self._hilo.is_alive()) or self._candidato is not None or self._retirando
+
+    def solicitar(self, detector_backend: str | None = None, modelo: str | None = None,
+                  recargar_ocr: bool = False, sombra: bool = False, sombra_fraccion: float | None = None,
+                  forzar: bool = False) -> dict:
+        """
+        Empieza a cargar el candidato en segundo plano (sin argumentos: el mismo
+        archivo de modelo, p.ej. después de reemplazarlo). Devuelve el resumen.
+        Lanza ModeloNoValido si `modelo` no es un archivo de la carpeta de modelos.
+        """
+        ajustes = {}
+        if detector_backend:
+            ajustes["detector_backend"] = detector_backend
+        if modelo:
+            backend = detector_backend or self.cfg.detector_backend
+            ruta = ruta_modelo(modelo, backend, dir_modelos(self.cfg, backend))
+            ajustes["detector_onnx_modelo" if backend == "onnx" else "detector_modelo"] = ruta
+            ajustes["detector_int8"] = False
+        cfg = self.cfg.model_copy(update=ajustes)
+        fraccion = sombra_fraccion if sombra_fraccion is not None else cfg.recarga_sombra_fraccion
+
+        with self._lock:
+            if self._obtener_lector() is None:
+                raise ConflictoRecarga("Los modelos aún se están cargando (ver /ready)")
+            if self._ocupada():
+                raise ConflictoRecarga(f"Ya hay una recarga en estado '{self.estado}'")
+            self.candidato = {
+                "detector_backend": cfg.detector_backend,
+                "modelo": cfg.ruta_detector(),
+                "recargar_ocr": recargar_ocr,
+                "sombra": sombra,
+            }
+            self.paridad = None
+            self.error = None
+            self._paso(CARGANDO)
+            self._hilo = threading.Thread(
+                target=self._recargar, args=(cfg, recargar_ocr, sombra, fraccion, forzar),
+                name="recarga-modelos", daemon=True,
+            )
+            self._hilo.start()
+        return self.resumen()
+
+    def _recargar(self, cfg, recargar_ocr: bool, sombra: bool, fraccion: float, forzar: bool) -> None:
+        actual = self._obtener_lector()
+        try:
+            # OCR propio siempre: el del lector activo no se puede usar desde este hilo
+            candidato = self._fabrica(cfg)
+            candidato.cargar_detector()
+            candidato.cargar_ocr()
+            self._paso(CALENTANDO)
+            candidato.calentar_detector()
+            candidato.calentar_ocr()
+
+            self._paso(VERIFICANDO)
+            muestras = muestras_guardadas(cfg.recarga_muestras)
+            if muestras:
+                self.paridad = verificar_paridad(
+                    actual, candidato, muestras, self._ejecutor, cfg.recarga_recall_min, cfg.recarga_tolerancia,
+                )
+                print(f"Paridad del candidato: {self.paridad}")
+            if not forzar and not (self.paridad and self.paridad["aprobado"]):
+                self.error = "Paridad insuficiente" if muestras else "Sin capturas guardadas para verificar (usa forzar)"
+                self._paso(RECHAZADO)
+                return
+        except Exception as e:
+            self.error = str(e)
+            self._paso(ERROR)
+            return
+
+        if sombra:
+            with self._lock:
+                self._candidato = (cfg, candidato, recargar_ocr)
+                self.sombra = Sombra(candidato, fraccion)
+                actual.sombra = self.sombra
+            self._paso(SOMBRA)
+        else:
+            self._promover(cfg, candidato, recargar_ocr)
+
+    def _promover(self, cfg, candidato, recargar_ocr: bool) -> None:
+        loteador_previo = self._obtener_lector().adoptar_modelos(candidato, ocr=recargar_ocr)
+        self.cfg = cfg
+        self._paso(PROMOVIDO)
+        print(f"Modelo activo: {cfg.ruta_detector()} [{cfg.detector_backend}]")
+        if loteador_previo is not None:
+            threading.Timer(GRACIA_CIERRE_S, loteador_previo.cerrar).start()
+
+    def _quitar_sombra(self):
+        """
+        Con self._lock tomado: desconecta la sombra del lector activo y devuelve
+        (candidato, sombra). La sombra se cierra después con _cerrar_sombra,
+        fuera del lock, y hasta entonces no se acepta otra recarga.
+        """
+        candidato, self._candidato = self._candidato, None
+        sombra, self.sombra = self.sombra, None
+        if sombra is not None:
+            self._obtener_lector().sombra = None
+            self.ultima_sombra = sombra.resumen()
+        self._retirando = True
+        return candidato, sombra
+
+    def _cerrar_sombra(self, sombra) -> None:
+        if sombra is not None:
+            sombra.cerrar()
+            self.ultima_sombra = sombra.resumen()
+
+    def _tomar_candidato(self, accion: str):
+        with self._lock:
+            if self._candidato is None:
+                raise ConflictoRecarga(f"No hay un candidato en sombra para {accion}")
+            return self._quitar_sombra()
+
+    def promover(self) -> dict:
+        """Promueve el candidato que está en sombra."""
+        (cfg, candidato, recargar_ocr), sombra = self._tomar_candidato("promover")
+        try:
+            # La comparación en curso usa los modelos del candidato: termina antes de que el lector los adopte
+            self._cerrar_sombra(sombra)
+            self._promover(cfg, candidato, recargar_ocr)
+        finally:
+            self._retirando = False
+        return self.resumen()
+
+    def descartar(self) -> dict:
+        _, sombra = self._tomar_candidato("descartar")
+        try:
+            self._cerrar_sombra(sombra)
+            self.error = "Descartado"
+            self._paso(RECHAZADO)
+        finally:
+            self._retirando = False
+        return self.resumen()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._candidato is None:
+                return
+            _, sombra = self._quitar_sombra()
+        self._cerrar_sombra(sombra)
+
+    def resumen(self) -> dict:
+        return {
+            "estado": self.estado,
+            "activo": {
+                "detector_backend": self.cfg.detector_backend,
+                "modelo": self.cfg.ruta_detector(),
+                "ocr_backend": self.cfg.ocr_backend,
+            },
+            "candidato": self.candidato,
+            "paridad": self.paridad,
+            "sombra": self.sombra.resumen() if self.sombra is not None else self.ultima_sombra,
+            "error": self.error,
+        }
+
+
+# ---------------------- vigilante de archivos ----------------------
+def _firma(ruta: str):
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class VigilanteModelos:
+    """
+    Revisa cada `intervalo_s` el archivo del detector activo y pide la recarga
+    cuando cambia. Espera a que la firma (mtime, tamaño) se repita en dos
+    revisiones seguidas para no cargar un archivo a medio copiar.
+    """
+
+    def __init__(self, recarga: RecargaModelos, intervalo_s: float = 10.0) -> None:
+        self.recarga = recarga
+        self.intervalo_s = intervalo_s
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="vigilante-modelos", daemon=True)
+
+    def iniciar(self) -> None:
+        if self.intervalo_s > 0:
+            self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout=2.0)
+
+    def _bucle(self) -> None:
+        ruta = self.recarga.cfg.ruta_detector()
+        vista, pendiente = _firma(ruta), None
+        while not self._detener.wait(self.intervalo_s):
+            activa = self.recarga.cfg.ruta_detector()
+            if activa != ruta:
+                # Se promovió otro archivo: desde ahora se vigila ese
+                ruta, vista, pendiente = activa, _firma(activa), None
+                continue
+            firma = _firma(ruta)
+            if firma is None or firma == vista:
+                pendiente = None
+                continue
+            if firma != pendiente:
+                pendiente = firma     # aún puede estar copiándose
+                continue
+            print(f"[i] Cambió {ruta}: recargando el detector")
+            try:
+                self.recarga.solicitar()
+                vista, pendiente = firma, None
+            except ConflictoRecarga as e:
+                print(f"[!] Recarga pospuesta: {e}")
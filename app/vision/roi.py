@@ -0,0 +1,32 @@
+"""
+Regiones de interés de las cámaras: 'x1,y1,x2,y2' en fracciones del frame (0-1).
+Las usan la detección (Camara.roi_deteccion), la compuerta de movimiento del
+modo continuo (Camara.roi_movimiento) y el puntaje de calidad.
+"""
+
+ROI_MIN_PX = 32     # una ROI más chica (o vacía) en el frame real no sirve: se usa el frame completo
+
+
+def parsear_roi(texto: str | None):
+    """'x1,y1,x2,y2' en fracciones del frame (0-1) -> tupla de floats, o None."""
+    if not texto:
+        return None
+    x1, y1, x2, y2 = (float(v) for v in texto.split(","))
+    return x1, y1, x2, y2
+
+
+def zona_roi(frame, roi):
+    """(zona, ox, oy): la ROI del frame y su esquina en píxeles, o el frame completo."""
+    if roi is None:
+        return frame, 0, 0
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = roi
+    ox, oy = int(x1 * w), int(y1 * h)
+    zona = frame[oy:int(y2 * h), ox:int(x2 * w)]
+    if min(zona.shape[:2]) < ROI_MIN_PX:
+        return frame, 0, 0
+    return zona, ox, oy
+
+
+def recortar_roi(frame, roi):
+    return zona_roi(frame, roi)[0]
@@ -0,0 +1,518 @@
+"""
+Servicio de visión: dueño de los modelos (LectorPlacas), las cámaras, el
+ejecutor de inferencia y la retención de imágenes.
+
+    ServicioVisionLocal -> todo dentro del proceso (modo "local", y lo que corre el worker)
+    ClienteVision       -> misma interfaz, pero cada operación viaja por IPC local
+                           al worker de visión (python -m app.vision.worker)
+
+Con el modo "remoto" la API no carga YOLO/OCR ni abre cámaras, así se puede
+escalar con `uvicorn --workers N` mientras una sola copia de los modelos
+atiende todas las capturas. El índice de placas también vive aquí: cada
+lectura sale con su vehiculo_id y el CRUD de vehículos avisa los cambios, así
+ningún worker de la API resuelve contra una copia desactualizada.
+"""
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from multiprocessing.connection import Client
+
+from sqlmodel import Session, select
+
+from app.config import Settings, get_settings
+from app.db import engine
+from app.lecturas import guardar_lectura
+from app.models.camara import Camara
+from app.models.vehiculo import Vehiculo
+from app.vision.almacen_imagenes import RetencionImagenes
+from app.vision.captura import GestorCamaras, decodificar_imagen
+from app.vision.cargador import CargadorVision
+from app.vision.continuo import GestorContinuo
+from app.vision.ejecutor import ColaLlena, EjecutorInferencia
+from app.vision.fuentes import capturar_frame
+from app.vision.indice_placas import IndicePlacas, normalizar_placa
+from app.vision.lector_placas import LectorPlacas
+from app.vision.metricas import cronometrar, etapa
+from app.vision.recarga import ConflictoRecarga, ModeloNoValido, RecargaModelos, VigilanteModelos
+from app.vision.roi import parsear_roi
+from app.vision.votacion import distancia_edicion, formatear_placa, fusionar_lecturas
+
+SIN_CONEXION = "sin_conexion"
+
+
+class VisionNoLista(Exception):
+    """Los modelos aún no están listos o el worker de visión no responde."""
+
+
+def crear_lector(cfg: Settings, rois: dict | None = None, **ajustes) -> LectorPlacas:
+    # Solo configura; los modelos los carga CargadorVision (o RecargaModelos) en segundo plano
+    opciones = dict(
+        guardar_img=True,
+        nivel_procesamiento=0.4,
+        niveles_cascada=cfg.procesamiento_niveles,
+        cascada_min_confianza=cfg.procesamiento_min_confianza,
+        use_gpu=False,
+        dir_capturas=cfg.imagenes_dir_completas,
+        dir_procesadas=cfg.imagenes_dir_recortes,
+        model_path=cfg.ruta_detector(),
+        detector_backend=cfg.detector_backend,
+        detector_opciones=cfg.opciones_detector(),
+        ocr_backend=cfg.ocr_backend,
+        ocr_opciones=cfg.opciones_ocr(),
+        lote_max=cfg.yolo_lote_max if cfg.inferencia_workers > 1 else 1,
+        lote_espera_ms=cfg.yolo_lote_espera_ms,
+        formato_img=cfg.imagenes_formato,
+        calidad_img=cfg.imagenes_calidad,
+        cache_max=cfg.ocr_cache_max,
+        cache_ttl_s=cfg.ocr_cache_ttl_s,
+        cache_distancia=cfg.ocr_cache_distancia,
+        rois=rois,
+        calidad_min=cfg.calidad_min,
+        calidad_candidatos=cfg.calidad_candidatos,
+        cargar_modelos=False,
+    )
+    return LectorPlacas(**{**opciones, **ajustes})
+
+def registrar_lectura_continua(camara_id, texto, confianza, ruta_full, ruta_rec, nivel, calidad=None):
+    with Session(engine) as session:
+        guardar_lectura(session, camara_id, texto, confianza, ruta_full, ruta_rec, nivel, calidad)
+
+
+# ---------------------- trabajos del ejecutor ----------------------
+def leer_camara(lector, camara_id: int, lector_cam, fuente, t_disparo: float, antes_ms: int | None, frames: int = 1):
+    """Captura + IA. Es bloqueante: se ejecuta en el EjecutorInferencia, nunca en el event loop."""
+    umbral = get_settings().votacion_umbral
+    if lector_cam is None:
+        return lector.capturar_placa(fuente, frames=frames, umbral_votacion=umbral, camara_id=camara_id)
+
+    if frames > 1:
+        if antes_ms is not None:
+            previos = lector_cam.frames_antes_de(t_disparo - antes_ms / 1000, cantidad=frames)
+            rafaga = (frame for _, frame in reversed(previos))   # del más cercano al disparo hacia atrás
+        else:
+            rafaga = lector_cam.rafaga(frames)
+        return lector.leer_placa_votacion(rafaga, umbral, camara_id)
+
+    with etapa("grab_frame"):
+        candidatos = _frames_del_buffer(lector_cam, t_disparo, antes_ms, lector.calidad_candidatos)
+    if not candidatos:
+        return {"estado": "ERR_FRAME", "lecturas": [], "ruta_imagen": None}
+    return lector.leer_placas(lector.mejor_frame(candidatos, camara_id), camara_id)
+
+def _frames_del_buffer(lector_cam, t_disparo: float, antes_ms: int | None, cantidad: int = 1):
+    """Los últimos `cantidad` frames antes del disparo (o los más recientes), candidatos a leerse."""
+    if antes_ms is not None:
+        return [f for _, f in lector_cam.frames_antes_de(t_disparo - antes_ms / 1000, cantidad=cantidad)]
+    recientes = lector_cam.frames_antes_de(time.monotonic(), cantidad=cantidad)
+    if recientes:
+        return [f for _, f in recientes]
+    item = lector_cam.ultimo_frame()     # buffer aún vacío: espera el primero
+    return [item[1]] if item is not None else []
+
+def leer_porteria(lector, camaras, t_disparo: float, antes_ms: int | None, pool: ThreadPoolExecutor):
+    """
+    Captura de portería: un frame de cada cámara [(camara_id, fuente, lector_cam)],
+    tomados a la vez (las que no tienen buffer abren su fuente en `pool`, el del
+    servicio), un solo predict de YOLO para todos y una placa conciliada entre cámaras.
+    """
+    with etapa("grab_frame"):
+        sin_buffer = [c for c in camaras if c[2] is None]
+        abiertos = dict(zip((c[0] for c in sin_buffer), pool.map(capturar_frame, (c[1] for c in sin_buffer))))
+        candidatos = [
+            [abiertos[camara_id]] if lector_cam is None
+            else _frames_del_buffer(lector_cam, t_disparo, antes_ms, lector.calidad_candidatos)
+            for camara_id, _, lector_cam in camaras
+        ]
+    # En este hilo, así el puntaje de calidad queda en el cronómetro de la captura
+    frames = [lector.mejor_frame(c, camara[0]) for camara, c in zip(camaras, candidatos)]
+
+    con_frame = [(c[0], f) for c, f in zip(camaras, frames) if f is not None]
+    leidos = {}
+    if con_frame:
+        ids, validos = zip(*con_frame)
+        leidos = dict(zip(ids, lector.leer_placas_lote(validos, ids)))
+    por_camara = [
+        {"camara_id": camara_id, **leidos.get(camara_id, {"estado": "ERR_FRAME", "lecturas": [], "ruta_imagen": None})}
+        for camara_id, _, _ in camaras
+    ]
+    placa, confianza, coinciden = conciliar_placa(por_camara)
+    return {"placa": placa, "confianza": confianza, "camaras_coinciden": coinciden, "camaras": por_camara}
+
+def conciliar_placa(por_camara: list[dict], distancia_max: int = 2):
+    """
+    Placa de la portería a partir de la mejor lectura de cada cámara: la más
+    confiable es la referencia, se descartan las que difieren en más de
+    `distancia_max` caracteres (otro vehículo en cuadro) y el resto se fusiona
+    por votación. Devuelve (placa, confianza, [camara_id que coinciden]).
+    """
+    candidatas = []
+    for cam in por_camara:
+        legibles = [l for l in cam["lecturas"] if l["placa"] != "NO LEIDO"]
+        if legibles:
+            # Vienen ordenadas de la más prometedora a la menos
+            candidatas.append((cam["camara_id"], normalizar_placa(legibles[0]["placa"]), legibles[0]["confianza"]))
+    if not candidatas:
+        return None, 0.0, []
+
+    referencia = max(candidatas, key=lambda c: c[2])[1]
+    coinciden = [c for c in candidatas if distancia_edicion(c[1], referencia) <= distancia_max]
+    with etapa("vote"):
+        texto, confianza = fusionar_lecturas([(texto, conf) for _, texto, conf in coinciden])
+    return formatear_placa(texto), confianza, [c[0] for c in coinciden]
+
+def _decodificar(datos: bytes):
+    with etapa("decode"):
+        return decodificar_imagen(datos)
+
+def leer_imagenes(lector, camara_id: int, imagenes: list[bytes]):
+    """
+    Decodifica en memoria las imágenes subidas e IA. Con una sola imagen se leen
+    todas sus placas; con varias se tratan como ráfaga y se fusionan por votación
+    (se decodifican a medida que se leen, así el corte temprano también ahorra decodificar).
+    """
+    if len(imagenes) == 1:
+        frame = _decodificar(imagenes[0])
+        if frame is None:
+            return {"estado": "ERR_IMAGEN", "lecturas": [], "ruta_imagen": None}
+        return lector.leer_placas(frame, camara_id)
+
+    frames = (f for f in map(_decodificar, imagenes) if f is not None)
+    resultado = lector.leer_placa_votacion(frames, get_settings().votacion_umbral, camara_id)
+    if resultado["estado"] == "ERR_FRAME":
+        resultado["estado"] = "ERR_IMAGEN"
+    return resultado
+
+def cronometrado(metricas, camara_id: int, t_envio: float, fn, *args):
+    """Corre `fn` en el hilo de inferencia con el cronómetro activo. Devuelve (resultado, tiempos)."""
+    with cronometrar(metricas, camara_id) as crono:
+        crono.sumar("queue", (time.perf_counter() - t_envio) * 1000)
+        resultado = fn(*args)
+    return resultado, crono.tiempos
+
+
+# ---------------------- en el proceso ----------------------
+class ServicioVisionLocal:
+    remoto = False
+
+    def __init__(self, cfg: Settings, metricas) -> None:
+        self.cfg = cfg
+        self.metricas = metricas
+        # Los modelos cargan en segundo plano: mientras tanto las lecturas
+        # lanzan VisionNoLista (503 en la API, ver /ready)
+        self.lector = None
+        self.rois = {}      # camara_id -> ROI de detección; el lector comparte el dict
+        self.cargador = CargadorVision(partial(crear_lector, cfg, self.rois), habilitado=cfg.vision_habilitada)
+        self.cargador.al_terminar(self._lector_listo)
+        self.ejecutor = EjecutorInferencia(
+            workers=cfg.inferencia_workers,
+            cola_max=cfg.inferencia_cola_max,
+        )
+        # Fuentes sin buffer de las porterías: un pool acotado para todas las capturas
+        self.pool_porteria = ThreadPoolExecutor(max_workers=cfg.porteria_hilos, thread_name_prefix="porteria")
+        self.retencion = RetencionImagenes(
+            engine,
+            cfg.imagenes_dir_completas,
+            cfg.imagenes_dir_recortes,
+            intervalo_min=cfg.imagenes_retencion_intervalo_min,
+            compactar_dias=cfg.imagenes_compactar_dias,
+            compactar_ancho=cfg.imagenes_compactar_ancho,
+            compactar_calidad=cfg.imagenes_compactar_calidad,
+            recortes_dias=cfg.imagenes_recortes_dias,
+            completas_dias=cfg.imagenes_completas_dias,
+            presupuesto_mb=cfg.imagenes_presupuesto_mb,
+        )
+        # Candidatos de la recarga: sin guardar imágenes ni cache, y sin loteador propio
+        self.recarga = RecargaModelos(
+            cfg, lambda: self.lector,
+            lambda c: crear_lector(c, self.rois, guardar_img=False, cache_max=0, lote_max=1),
+            self.ejecutor,
+        )
+        self.vigilante = VigilanteModelos(self.recarga, cfg.recarga_vigilar_s)
+        self.indice = IndicePlacas()
+        self.camaras = GestorCamaras(tam_buffer=cfg.camaras_buffer_frames)
+        self.continuo = GestorContinuo(
+            self.camaras,
+            lambda: self.lector,
+            self.ejecutor,
+            registrar_lectura_continua,
+            umbral_movimiento=cfg.continuo_umbral_movimiento,
+            intervalo_ms=cfg.continuo_intervalo_ms,
+            post_movimiento_s=cfg.continuo_post_movimiento_s,
+            debounce_s=cfg.continuo_debounce_s,
+            min_confianza=cfg.continuo_min_confianza,
+        )
+
+    def _lector_listo(self, lector) -> None:
+        self.lector = lector
+        print("Modelo de Detección de Placas cargado en memoria (GPU/CPU).")
+
+    def iniciar(self) -> None:
+        self.cargador.iniciar()
+        if self.cfg.vision_habilitada:
+            self.vigilante.iniciar()
+        if self.cfg.imagenes_retencion:
+            self.retencion.iniciar()
+        with Session(engine) as session:
+            self.indice.cargar((v.id, v.placa) for v in session.exec(select(Vehiculo)))
+            print(f"Índice de placas: {len(self.indice)} vehículos")
+            activas = session.exec(select(Camara).where(Camara.activo == True)).all()
+            for c in activas:
+                self.sincronizar_camara(c)
+        if self.cfg.camaras_persistentes:
+            print(f"Lectores de cámara iniciados: {len(activas)}")
+
+    def cerrar(self) -> None:
+        self.vigilante.detener()
+        self.recarga.cerrar()
+        self.continuo.detener_todos()
+        self.retencion.detener()
+        self.camaras.detener_todos()
+        self.ejecutor.cerrar()
+        self.pool_porteria.shutdown(wait=False, cancel_futures=True)
+        if self.lector is not None:
+            self.lector.cerrar()
+
+    def estado(self) -> tuple[dict, str | None]:
+        """(estado de cada modelo, error de carga) para /ready."""
+        return dict(self.cargador.estados), self.cargador.error
+
+    # --- lecturas ---
+    def _obtener_lector(self):
+        if self.lector is None:
+            raise VisionNoLista("Los modelos de visión aún no están listos (ver /ready)")
+        return self.lector
+
+    def _enviar(self, camara_id: int, fn, *args) -> Future:
+        # Tiempos por etapa -> histogramas de /metricas (ver app/vision/metricas.py)
+        return self.ejecutor.enviar(
+            cronometrado, self.metricas, camara_id, time.perf_counter(), self._leer_y_resolver, fn, *args,
+        )
+
+    def _leer_y_resolver(self, fn, *args) -> dict:
+        resultado = fn(*args)
+        if "camaras" in resultado:       # portería: cada cámara y la placa conciliada
+            for por_camara in resultado["camaras"]:
+                self._resolver_vehiculos(por_camara)
+            coincidencia = self.indice.buscar(resultado["placa"]) if resultado["placa"] else None
+            resultado["vehiculo_id"] = coincidencia["vehiculo_id"] if coincidencia else None
+        else:
+            self._resolver_vehiculos(resultado)
+        return resultado
+
+    def _resolver_vehiculos(self, resultado: dict) -> None:
+        # Vehículo registrado al que corresponde cada lectura (tolera errores típicos del OCR)
+        for l in resultado["lecturas"]:
+            coincidencia = self.indice.buscar(l["placa"]) if l["placa"] != "NO LEIDO" else None
+            l["vehiculo_id"] = coincidencia["vehiculo_id"] if coincidencia else None
+
+    def enviar_captura(self, camara_id: int, fuente, t_disparo: float,
+                       antes_ms: int | None = None, frames: int = 1) -> Future:
+        """Future de (resultado, tiempos). Lanza VisionNoLista o ColaLlena de inmediato."""
+        lector = self._obtener_lector()
+        lector_cam = self.camaras.obtener(camara_id)
+        frames = min(frames, self.cfg.votacion_frames_max)
+        return self._enviar(camara_id, leer_camara, lector, camara_id, lector_cam, fuente, t_disparo, antes_ms, frames)
+
+    def enviar_imagenes(self, camara_id: int, imagenes: list[bytes]) -> Future:
+        return self._enviar(camara_id, leer_imagenes, self._obtener_lector(), camara_id, imagenes)
+
+    async def capturar(self, camara_id: int, fuente, t_disparo: float,
+                       antes_ms: int | None = None, frames: int = 1):
+        return await asyncio.wrap_future(self.enviar_captura(camara_id, fuente, t_disparo, antes_ms, frames))
+
+    async def leer_imagenes(self, camara_id: int, imagenes: list[bytes]):
+        return await asyncio.wrap_future(self.enviar_imagenes(camara_id, imagenes))
+
+    def enviar_porteria(self, camaras: list[tuple[int, str | None]], t_disparo: float,
+                        antes_ms: int | None = None) -> Future:
+        """Future de (resultado, tiempos) de leer_porteria; los tiempos van a /metricas como 'porteria'."""
+        lector = self._obtener_lector()
+        con_buffer = [(camara_id, fuente, self.camaras.obtener(camara_id)) for camara_id, fuente in camaras]
+        return self._enviar("porteria", leer_porteria, lector, con_buffer, t_disparo, antes_ms, self.pool_porteria)
+
+    async def capturar_porteria(self, camaras: list[tuple[int, str | None]], t_disparo: float,
+                                antes_ms: int | None = None):
+        return await asyncio.wrap_future(self.enviar_porteria(camaras, t_disparo, antes_ms))
+
+    # --- cámaras ---
+    def sincronizar_camara(self, camara: Camara) -> None:
+        # Mantiene la ROI, el hilo de captura y el modo continuo de la cámara acorde a su estado en BD
+        self.rois[camara.id] = parsear_roi(camara.roi_deteccion)
+        if self.cfg.camaras_persistentes:
+            self.camaras.sincronizar(camara)
+            self.continuo.sincronizar(camara)
+
+    def detener_camara(self, camara_id: int) -> None:
+        self.rois.pop(camara_id, None)
+        self.continuo.detener(camara_id)
+        self.camaras.detener(camara_id)
+
+    # --- vehículos ---
+    def sincronizar_vehiculo(self, vehiculo_id: int) -> None:
+        """Relee el vehículo desde la BD: alta o cambio de placa, o baja si ya no existe."""
+        with Session(engine) as session:
+            veh = session.get(Vehiculo, vehiculo_id)
+        if veh is None:
+            self.indice.quitar(vehiculo_id)
+        else:
+            self.indice.agregar(veh.id, veh.placa)
+
+    def buscar_placa(self, placa: str, cercanas: bool = True) -> dict | None:
+        return self.indice.buscar(placa, cercanas=cercanas)
+
+    # --- modelos ---
+    def estado_recarga(self) -> dict:
+        return self.recarga.resumen()
+
+    def recargar_modelos(self, **opciones) -> dict:
+        """Ver RecargaModelos.solicitar. Lanza VisionNoLista o ConflictoRecarga."""
+        self._obtener_lector()
+        return self.recarga.solicitar(**opciones)
+
+    def promover_modelo(self) -> dict:
+        return self.recarga.promover()
+
+    def descartar_candidato(self) -> dict:
+        return self.recarga.descartar()
+
+    # --- métricas ---
+    def estadisticas_cache_ocr(self) -> dict:
+        cache = self.lector.cache_ocr if self.lector is not None else None
+        if cache is None:
+            return {"activa": False}
+        return {"activa": True, **cache.estadisticas()}
+
+    def metricas_vision(self) -> dict:
+        return {
+            "camaras": self.metricas.resumen(),
+            "cache_ocr": self.estadisticas_cache_ocr(),
+            "cascada": self.lector.estadisticas_cascada() if self.lector is not None else None,
+            "inferencia": {"en_curso": self.ejecutor.en_curso},
+            "retencion_imagenes": self.retencion.ultima_pasada,
+        }
+
+    def reiniciar_metricas(self) -> None:
+        self.metricas.reiniciar()
+
+
+# ---------------------- en otro proceso (worker de visión) ----------------------
+class ClienteVision:
+    """
+    Habla con el worker de visión por un socket Unix (o named pipe en Windows).
+    Una conexión por operación: (operacion, kwargs) -> (estado, valor).
+    Las rutas de imagen llegan ya escritas en disco (un Future no cruza procesos).
+    """
+
+    remoto = True
+
+    def __init__(self, direccion: str, clave: str, timeout_s: float = 30.0) -> None:
+        self.direccion = direccion
+        self.clave = clave.encode()
+        self.timeout_s = timeout_s
+
+    def iniciar(self) -> None:
+        print(f"Visión remota: worker en {self.direccion}")
+
+    def cerrar(self) -> None:
+        pass
+
+    def _llamar(self, operacion: str, **kwargs):
+        try:
+            conn = Client(self.direccion, authkey=self.clave)
+        except OSError as e:
+            raise VisionNoLista(f"Worker de visión sin conexión en {self.direccion} ({e})")
+        with conn:
+            conn.send((operacion, kwargs))
+            if not conn.poll(self.timeout_s):
+                raise VisionNoLista(f"El worker de visión no respondió en {self.timeout_s:g} s")
+            estado, valor = conn.recv()
+        if estado == "ok":
+            return valor
+        if estado == "cola_llena":
+            raise ColaLlena()
+        if estado == "no_lista":
+            raise VisionNoLista(valor)
+        if estado == "conflicto":
+            raise ConflictoRecarga(valor)
+        if estado == "invalido":
+            raise ModeloNoValido(valor)
+        raise RuntimeError(f"Worker de visión: {valor}")
+
+    def _notificar(self, operacion: str, **kwargs) -> None:
+        # Para avisos del CRUD: si el worker no está, el cambio lo toma al arrancar desde la BD
+        try:
+            self._llamar(operacion, **kwargs)
+        except (VisionNoLista, RuntimeError) as e:
+            print(f"[!] {operacion}: {e}")
+
+    def estado(self) -> tuple[dict, str | None]:
+        try:
+            return self._llamar("estado")
+        except (VisionNoLista, RuntimeError) as e:
+            return {"worker": SIN_CONEXION}, str(e)
+
+    async def capturar(self, camara_id: int, fuente, t_disparo: float,
+                       antes_ms: int | None = None, frames: int = 1):
+        # time.monotonic() es del sistema, así que t_disparo vale igual en el worker
+        return await asyncio.to_thread(
+            self._llamar, "capturar", camara_id=camara_id, fuente=fuente,
+            t_disparo=t_disparo, antes_ms=antes_ms, frames=frames,
+        )
+
+    async def leer_imagenes(self, camara_id: int, imagenes: list[bytes]):
+        return await asyncio.to_thread(self._llamar, "imagenes", camara_id=camara_id, imagenes=imagenes)
+
+    async def capturar_porteria(self, camaras: list[tuple[int, str | None]], t_disparo: float,
+                                antes_ms: int | None = None):
+        return await asyncio.to_thread(
+            self._llamar, "porteria", camaras=camaras, t_disparo=t_disparo, antes_ms=antes_ms,
+        )
+
+    def sincronizar_camara(self, camara: Camara) -> None:
+        # El worker relee la cámara desde la BD
+        self._notificar("sincronizar_camara", camara_id=camara.id)
+
+    def detener_camara(self, camara_id: int) -> None:
+        self._notificar("detener_camara", camara_id=camara_id)
+
+    def sincronizar_vehiculo(self, vehiculo_id: int) -> None:
+        self._notificar("sincronizar_vehiculo", vehiculo_id=vehiculo_id)
+
+    def buscar_placa(self, placa: str, cercanas: bool = True) -> dict | None:
+        return self._llamar("buscar_placa", placa=placa, cercanas=cercanas)
+
+    def estado_recarga(self) -> dict:
+        return self._llamar("estado_recarga")
+
+    def recargar_modelos(self, **opciones) -> dict:
+        return self._llamar("recargar_modelos", **opciones)
+
+    def promover_modelo(self) -> dict:
+        return self._llamar("promover_modelo")
+
+    def descartar_candidato(self) -> dict:
+        return self._llamar("descartar_candidato")
+
+    def estadisticas_cache_ocr(self) -> dict:
+        try:
+            return self._llamar("cache_ocr")
+        except (VisionNoLista, RuntimeError) as e:
+            return {"activa": False, "error": str(e)}
+
+    def metricas_vision(self) -> dict:
+        try:
+            return self._llamar("metricas")
+        except (VisionNoLista, RuntimeError) as e:
+            return {"error": str(e)}
+
+    def reiniciar_metricas(self) -> None:
+        self._notificar("reiniciar_metricas")
+
+
+def crear_servicio_vision(cfg: Settings, metricas):
+    if cfg.vision_modo == "remoto":
+        return ClienteVision(cfg.vision_ipc, cfg.vision_ipc_clave, cfg.vision_ipc_timeout_s)
+    if cfg.vision_modo != "local":
+        raise ValueError(f"vision_modo desconocido: {cfg.vision_modo!r} (local | remoto)")
+    return ServicioVisionLocal(cfg, metricas)
@@ -1,5 +1,5 @@
-# usar_camara.py
-from lector_placas import LectorPlacas
+# usar_camara.py  (ejecutar desde la raíz: python -m app.vision.test_ia)
+from app.vision.lector_placas import LectorPlacas
 
 
 def main() -> None:
@@ -8,11 +8,14 @@ def main() -> None:
         nivel_procesamiento=0.2 
     )
     
-    placa, conf, ruta_full, ruta_rec = lector.capturar_placa(0)
+    resultado = lector.capturar_placa(0)
     
-    print(f"\n>>> PLACA: {placa}")
-    print(f">>> CONFIANZA: {conf:.2f}")
-    print(f">>> Imagen guardada en: {ruta_full}")
+    print(f"\n>>> ESTADO: {resultado['estado']}")
+    for lectura in resultado["lecturas"]:
+        print(f">>> PLACA: {lectura['placa']}  CONFIANZA: {lectura['confianza']:.2f}  CAJA: {lectura['bbox']}")
+    ruta_full = resultado["ruta_imagen"]
+    print(f">>> Imagen guardada en: {ruta_full.result() if ruta_full else None}")
+    lector.cerrar()
 
 
 if __name__ == "__main__":
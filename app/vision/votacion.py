@@ -0,0 +1,101 @@
+import re
+from collections import Counter, defaultdict
+
+FORMATO_PLACA = re.compile(r"^[A-Z]{3}\d{3}$")
+
+# Confusiones típicas del OCR, corregidas según la posición (AAA999)
+LETRA_A_DIGITO = {'O': '0', 'I': '1', 'J': '3', 'A': '4', 'G': '6', 'S': '5'}
+DIGITO_A_LETRA = {'0': 'O', '1': 'I', '3': 'J', '4': 'A', '6': 'G', '5': 'S'}
+
+
+def corregir_placa(texto_raw: str) -> str:
+    """Deja solo alfanuméricos y corrige letras/números según la posición (AAA999)."""
+    limpio = re.sub(r'[^A-Za-z0-9]', '', texto_raw).upper()
+    if len(limpio) == 6:
+        letras_final = [DIGITO_A_LETRA.get(c, c) for c in limpio[:3]]
+        nums_final = [LETRA_A_DIGITO.get(c, c) for c in limpio[3:]]
+        return ''.join(letras_final) + ''.join(nums_final)
+    return limpio
+
+
+def formatear_placa(texto_raw: str) -> str:
+    """Texto corregido con el formato que se guarda en la BD: 'AAA - 999'."""
+    limpio = corregir_placa(texto_raw)
+    if len(limpio) > 3:
+        return f"{limpio[:3]} - {limpio[3:]}"
+    return limpio
+
+
+def distancia_edicion(a: str, b: str) -> int:
+    """Distancia de Levenshtein entre dos textos."""
+    previa = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + (ca != cb)))
+        previa = actual
+    return previa[-1]
+
+
+def _alinear(ref: str, texto: str) -> list[str | None]:
+    """
+    Alinea `texto` contra `ref` (Levenshtein) y devuelve, para cada posición
+    de `ref`, el carácter de `texto` que le corresponde (None si se perdió).
+    """
+    n, m = len(ref), len(texto)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dp[i][0] = i
+    for j in range(m + 1):
+        dp[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            costo = 0 if ref[i - 1] == texto[j - 1] else 1
+            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + costo)
+
+    alineado: list[str | None] = [None] * n
+    i, j = n, m
+    while i > 0 and j > 0:
+        costo = 0 if ref[i - 1] == texto[j - 1] else 1
+        if dp[i][j] == dp[i - 1][j - 1] + costo:
+            alineado[i - 1] = texto[j - 1]
+            i, j = i - 1, j - 1
+        elif dp[i][j] == dp[i - 1][j] + 1:
+            i -= 1
+        else:
+            j -= 1
+    return alineado
+
+
+def fusionar_lecturas(lecturas: list[tuple[str, float]]) -> tuple[str, float]:
+    """
+    Fusiona varias lecturas OCR (texto, confianza) de la misma placa.
+    Se toma la longitud más votada, se alinea cada lectura contra la de mayor
+    confianza y se vota cada posición ponderando por la confianza.
+    La confianza fusionada es el promedio, por posición, del peso del carácter
+    ganador dividido entre el número de lecturas.
+    """
+    lecturas = [(t, c) for t, c in lecturas if t]
+    if not lecturas:
+        return "", 0.0
+
+    peso_longitud: Counter = Counter()
+    for texto, conf in lecturas:
+        peso_longitud[len(texto)] += conf
+    longitud = peso_longitud.most_common(1)[0][0]
+
+    ref = max((x for x in lecturas if len(x[0]) == longitud), key=lambda x: x[1])[0]
+    votos = [defaultdict(float) for _ in range(longitud)]
+    for texto, conf in lecturas:
+        alineado = list(texto) if len(texto) == longitud else _alinear(ref, texto)
+        for pos, ch in enumerate(alineado):
+            if ch is not None:
+                votos[pos][ch] += conf
+
+    caracteres = []
+    puntajes = []
+    for pos in range(longitud):
+        ch, peso = max(votos[pos].items(), key=lambda x: x[1])
+        caracteres.append(ch)
+        puntajes.append(peso / len(lecturas))
+    return "".join(caracteres), sum(puntajes) / longitud
@@ -0,0 +1,156 @@
+"""
+Worker de visión: un proceso aparte, dueño de las cámaras y de una sola copia
+de los modelos, al que le hablan todos los workers de la API por IPC local
+(socket Unix, o named pipe en Windows; ver ClienteVision en servicio.py).
+
+Uso:
+    python -m app.vision.worker
+
+y en el .env de la API:
+    VISION_MODO=remoto
+    uvicorn app.main:app --workers 4
+
+Ambos procesos leen la misma configuración (VISION_IPC, VISION_IPC_CLAVE, BD,
+carpetas de imágenes). El worker también corre el modo continuo y la retención
+de imágenes; la API solo guarda las lecturas de /capturar e /imagen(es).
+"""
+import os
+import threading
+from multiprocessing.connection import Listener
+from multiprocessing import AuthenticationError
+
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.db import create_db_and_tables, engine
+from app.models.camara import Camara
+from app.vision.ejecutor import ColaLlena
+from app.vision.metricas import MetricasVision
+from app.vision.recarga import ConflictoRecarga, ModeloNoValido
+from app.vision.servicio import ServicioVisionLocal, VisionNoLista
+
+
+def _ruta(fut, timeout: float):
+    if fut is None or isinstance(fut, str):
+        return fut
+    try:
+        return fut.result(timeout)
+    except Exception:
+        return None     # la imagen no llegó a disco: la lectura queda sin ruta
+
+def resolver_rutas(resultado: dict, timeout: float = 10.0) -> dict:
+    """Cambia los Future del EscritorImagenes por la ruta ya escrita (un Future no cruza procesos)."""
+    resultado["ruta_imagen"] = _ruta(resultado.get("ruta_imagen"), timeout)
+    for l in resultado["lecturas"]:
+        l["ruta_recorte"] = _ruta(l.get("ruta_recorte"), timeout)
+    return resultado
+
+
+class ServidorVision:
+    def __init__(self, servicio: ServicioVisionLocal, direccion: str, clave: str) -> None:
+        self.servicio = servicio
+        self.direccion = direccion
+        self.clave = clave.encode()
+
+    def _sincronizar_camara(self, camara_id: int) -> None:
+        with Session(engine) as session:
+            c = session.get(Camara, camara_id)
+            if c is None:
+                self.servicio.detener_camara(camara_id)
+            else:
+                self.servicio.sincronizar_camara(c)
+
+    def _ejecutar(self, operacion: str, kwargs: dict):
+        s = self.servicio
+        if operacion == "capturar":
+            resultado, tiempos = s.enviar_captura(**kwargs).result()
+            return resolver_rutas(resultado), tiempos
+        if operacion == "imagenes":
+            resultado, tiempos = s.enviar_imagenes(**kwargs).result()
+            return resolver_rutas(resultado), tiempos
+        if operacion == "porteria":
+            resultado, tiempos = s.enviar_porteria(**kwargs).result()
+            for por_camara in resultado["camaras"]:
+                resolver_rutas(por_camara)
+            return resultado, tiempos
+        if operacion == "estado":
+            return s.estado()
+        if operacion == "sincronizar_camara":
+            return self._sincronizar_camara(**kwargs)
+        if operacion == "detener_camara":
+            return s.detener_camara(**kwargs)
+        if operacion == "sincronizar_vehiculo":
+            return s.sincronizar_vehiculo(**kwargs)
+        if operacion == "buscar_placa":
+            return s.buscar_placa(**kwargs)
+        if operacion == "cache_ocr":
+            return s.estadisticas_cache_ocr()
+        if operacion == "metricas":
+            return s.metricas_vision()
+        if operacion == "reiniciar_metricas":
+            return s.reiniciar_metricas()
+        if operacion == "estado_recarga":
+            return s.estado_recarga()
+        if operacion == "recargar_modelos":
+            return s.recargar_modelos(**kwargs)
+        if operacion == "promover_modelo":
+            return s.promover_modelo()
+        if operacion == "descartar_candidato":
+            return s.descartar_candidato()
+        raise ValueError(f"Operación desconocida: {operacion}")
+
+    def _atender(self, conn) -> None:
+        # Un hilo por conexión; la inferencia misma la ordena el EjecutorInferencia
+        with conn:
+            try:
+                operacion, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                respuesta = ("ok", self._ejecutar(operacion, kwargs))
+            except ColaLlena:
+                respuesta = ("cola_llena", None)
+            except VisionNoLista as e:
+                respuesta = ("no_lista", str(e))
+            except ConflictoRecarga as e:
+                respuesta = ("conflicto", str(e))
+            except ModeloNoValido as e:
+                respuesta = ("invalido", str(e))
+            except Exception as e:
+                print(f"Error en '{operacion}': {e}")
+                respuesta = ("error", str(e))
+            try:
+                conn.send(respuesta)
+            except OSError:
+                pass    # la API ya cerró (timeout)
+
+    def servir(self) -> None:
+        if os.name != "nt" and os.path.exists(self.direccion):
+            os.remove(self.direccion)     # socket de una ejecución anterior
+        with Listener(self.direccion, authkey=self.clave) as listener:
+            print(f"Worker de visión escuchando en {self.direccion}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except AuthenticationError:
+                    print("[!] Conexión rechazada: VISION_IPC_CLAVE no coincide")
+                    continue
+                threading.Thread(target=self._atender, args=(conn,), daemon=True).start()
+
+
+def main() -> None:
+    cfg = get_settings()
+    create_db_and_tables()
+    servicio = ServicioVisionLocal(cfg, MetricasVision())
+    servicio.iniciar()
+    try:
+        ServidorVision(servicio, cfg.vision_ipc, cfg.vision_ipc_clave).servir()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Liberando recursos de IA...")
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Compara motores OCR (latencia y exactitud) sobre recortes de placa guardados.
+
+Las etiquetas salen de un CSV (archivo,placa) o de la BD: lecturas con
+ruta_recorte y placa_detectada en formato AAA - 999 por encima de una confianza.
+Las de la BD son lecturas pasadas de EasyOCR, no verdad de terreno: sirven para
+entrenar plantillas, pero una comparación con ellas favorece a EasyOCR y el
+reporte lo marca.
+
+Uso (desde la raíz del proyecto):
+    # 1) crear plantillas para el motor "segmentacion"
+    python -m tools.benchmark_ocr entrenar --desde-bd --conf-min 0.8
+    # 2) comparar motores
+    python -m tools.benchmark_ocr comparar --etiquetas etiquetas.csv --motores easyocr segmentacion
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import time
+
+import cv2
+import numpy as np
+
+from app.vision.motores_ocr import construir_plantillas, crear_motor_ocr
+from app.vision.votacion import FORMATO_PLACA, corregir_placa, distancia_edicion
+
+PLANTILLAS = "app/vision/modelo/caracteres.npz"
+
+
+def _limpiar(placa: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]", "", placa).upper()
+
+
+def etiquetas_csv(ruta_csv: str):
+    base = os.path.dirname(ruta_csv)
+    with open(ruta_csv, newline="", encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            yield os.path.join(base, fila["archivo"]), _limpiar(fila["placa"])
+
+
+def etiquetas_bd(conf_min: float):
+    from sqlmodel import Session, select
+    from app.db import engine
+    from app.models.lectura_placa import LecturaPlaca
+
+    with Session(engine) as session:
+        stmt = select(LecturaPlaca).where(
+            LecturaPlaca.ruta_recorte != None,   # noqa: E711
+            LecturaPlaca.confianza >= conf_min,
+        )
+        for lectura in session.exec(stmt):
+            placa = _limpiar(lectura.placa_detectada)
+            if FORMATO_PLACA.match(placa):
+                yield lectura.ruta_recorte, placa
+
+
+def cargar_muestras(args):
+    fuente = etiquetas_csv(args.etiquetas) if args.etiquetas else etiquetas_bd(args.conf_min)
+    muestras = []
+    for ruta, placa in fuente:
+        img = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+        if img is not None:
+            muestras.append((img, placa))
+    return muestras
+
+
+def evaluar(motor, muestras) -> dict:
+    tiempos, exactas, dist_total, chars_total = [], 0, 0, 0
+    for img, placa in muestras:
+        inicio = time.perf_counter()
+        resultados = motor.leer(img)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        texto = corregir_placa("".join(r[1] for r in resultados))
+        exactas += texto == placa
+        dist_total += distancia_edicion(texto, placa)
+        chars_total += len(placa)
+
+    tiempos = np.array(tiempos)
+    return {
+        "muestras": len(muestras),
+        "latencia_ms_p50": float(np.percentile(tiempos, 50)),
+        "latencia_ms_p95": float(np.percentile(tiempos, 95)),
+        "latencia_ms_promedio": float(tiempos.mean()),
+        "exactitud_placa": exactas / len(muestras),
+        "exactitud_caracter": max(0.0, 1 - dist_total / chars_total),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores OCR sobre recortes guardados")
+    parser.add_argument("accion", choices=["entrenar", "comparar"])
+    parser.add_argument("--etiquetas", help="CSV con columnas archivo,placa (rutas relativas al CSV)")
+    parser.add_argument("--desde-bd", action="store_true", help="Toma las etiquetas de lecturas_placa")
+    parser.add_argument("--conf-min", type=float, default=0.8)
+    parser.add_argument("--plantillas", default=PLANTILLAS)
+    parser.add_argument("--motores", nargs="+", default=["easyocr", "segmentacion"])
+    parser.add_argument("--prueba", type=float, default=0.3,
+                        help="Fracción reservada para evaluar (no se usa al entrenar)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.etiquetas and not args.desde_bd:
+        parser.error("Indica --etiquetas o --desde-bd")
+
+    muestras = cargar_muestras(args)
+    if not muestras:
+        print("[!] No hay recortes etiquetados")
+        return
+    random.Random(args.semilla).shuffle(muestras)
+    corte = int(len(muestras) * (1 - args.prueba))
+    entrenamiento, prueba = muestras[:corte], muestras[corte:]
+
+    if args.accion == "entrenar":
+        n = construir_plantillas(entrenamiento, args.plantillas)
+        print(f"[+] {n} plantillas de caracteres guardadas en {args.plantillas}")
+        return
+
+    reporte = {}
+    if not args.etiquetas:
+        print("[!] Etiquetas tomadas de lecturas de EasyOCR: la exactitud no es contra verdad de terreno")
+        reporte["etiquetas"] = {"origen": "lecturas_placa", "verdad_terreno": False, "conf_min": args.conf_min}
+    for nombre in args.motores:
+        opciones = {"plantillas_path": args.plantillas} if nombre == "segmentacion" else {}
+        motor = crear_motor_ocr(nombre, **opciones)
+        motor.calentar()
+        reporte[nombre] = evaluar(motor, prueba)
+    print(json.dumps(reporte, indent=2))
+
+
+if __name__ == "__main__":
+    main()
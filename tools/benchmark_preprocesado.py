@@ -0,0 +1,116 @@
+"""
+Micro-benchmark del preprocesado de recortes de placa: versión original
+(arrays nuevos en cada llamada) contra PreprocesadorPlaca (buffers reutilizados).
+Reporta latencia y asignaciones de memoria (tracemalloc ve los arrays de numpy)
+y verifica que ambas versiones den exactamente la misma imagen.
+
+Uso (desde la raíz del proyecto):
+    python -m tools.benchmark_preprocesado
+    python -m tools.benchmark_preprocesado --recortes app/vision/capturas/placas_procesadas --nivel 0.4
+"""
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from app.vision.preprocesado import PreprocesadorPlaca
+
+
+def procesar_original(img_placa, nivel):
+    # Copia del _procesar_imagen_placa original, como línea base
+    gray_base = cv2.cvtColor(img_placa, cv2.COLOR_BGR2GRAY)
+    if nivel <= 0.05:
+        return gray_base
+    img_proc = img_placa.copy()
+    hsv = cv2.cvtColor(img_proc, cv2.COLOR_BGR2HSV)
+    lower_yellow = np.array([15, 80, 80])
+    upper_yellow = np.array([35, 255, 255])
+    mask = cv2.inRange(hsv, lower_yellow, upper_yellow)
+    img_proc[mask > 0] = [255, 255, 255]
+    gray_proc = cv2.cvtColor(img_proc, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray_proc, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if nivel >= 0.95:
+        return binary
+    return cv2.addWeighted(binary, nivel, gray_base, 1.0 - nivel, 0)
+
+
+def recortes_sinteticos(n: int, semilla: int = 0):
+    """Placas amarillas con texto negro, de tamaños parecidos a los de YOLO."""
+    rng = np.random.default_rng(semilla)
+    recortes = []
+    for _ in range(n):
+        w = int(rng.integers(140, 260))
+        h = int(w * rng.uniform(0.3, 0.45))
+        img = np.full((h, w, 3), (40, 200, 230), dtype=np.uint8)
+        cv2.putText(img, "ABC 123", (5, int(h * 0.75)), cv2.FONT_HERSHEY_SIMPLEX, w / 180, (20, 20, 20), 2)
+        ruido = rng.integers(0, 30, img.shape, dtype=np.uint8)
+        recortes.append(cv2.add(img, ruido))
+    return recortes
+
+
+def cargar_recortes(carpeta: str):
+    rutas = sorted(glob.glob(os.path.join(carpeta, "*")))
+    imagenes = [cv2.imread(r, cv2.IMREAD_COLOR) for r in rutas]
+    return [img for img in imagenes if img is not None]
+
+
+def medir(fn, recortes, repeticiones: int):
+    for r in recortes[:10]:
+        fn(r)   # calentamiento (y buffers ya dimensionados)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for r in recortes:
+            fn(r)
+    latencia_us = (time.perf_counter() - inicio) * 1e6 / (repeticiones * len(recortes))
+
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    salidas = [fn(r) for r in recortes]
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = despues.compare_to(antes, "traceback")
+    bloques = sum(max(0, s.count_diff) for s in stats)
+    del salidas
+    return latencia_us, bloques / len(recortes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark del preprocesado de placas")
+    parser.add_argument("--recortes", help="Carpeta con recortes (por defecto se generan sintéticos)")
+    parser.add_argument("--n", type=int, default=200, help="Recortes sintéticos")
+    parser.add_argument("--nivel", type=float, default=0.4)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    recortes = cargar_recortes(args.recortes) if args.recortes else recortes_sinteticos(args.n)
+    if not recortes:
+        print("[!] No hay recortes")
+        return
+
+    pre = PreprocesadorPlaca(args.nivel)
+    iguales = all(np.array_equal(procesar_original(r, args.nivel), pre.procesar(r)) for r in recortes)
+    print(f"Recortes: {len(recortes)}  nivel: {args.nivel}  salida idéntica: {iguales}")
+
+    filas = [
+        ("original", lambda r: procesar_original(r, args.nivel)),
+        ("buffers", pre.procesar),
+    ]
+    print(f"{'versión':<10} {'latencia (us)':>14} {'asignaciones/llamada':>22}")
+    for nombre, fn in filas:
+        latencia, asignaciones = medir(fn, recortes, args.repeticiones)
+        print(f"{nombre:<10} {latencia:>14.1f} {asignaciones:>22.1f}")
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        pre.procesar_lote(recortes)
+    lote_us = (time.perf_counter() - inicio) * 1e6 / (args.repeticiones * len(recortes))
+    print(f"{'lote':<10} {lote_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Benchmark offline de la IA de placas (sin cámara) sobre una carpeta de fotos etiquetadas.
+
+Corre el mismo pipeline que /capturar, etapa por etapa, y mide:
+    - latencia p50/p95/p99 de decode, detect, crop, preprocess, ocr, format y persist
+    - rendimiento: imágenes/s de reloj e imágenes por segundo de CPU (por núcleo)
+    - exactitud por placa (texto idéntico) y por carácter (1 - Levenshtein / largo)
+    - cuántas lecturas resolvió cada nivel de la cascada de preprocesado
+
+Las etiquetas salen de <carpeta>/etiquetas.csv (archivo,placa) o, si no existe,
+del nombre del archivo (ABC123.jpg, ABC-123_2.jpg, ...).
+El reporte es un JSON con claves ordenadas para poder comparar corridas.
+
+Uso (desde la raíz del proyecto):
+    python -m tools.benchmark_vision medir --imagenes datos/portería --salida base.json
+    python -m tools.benchmark_vision medir --imagenes datos/portería --detector onnx --salida onnx.json
+    python -m tools.benchmark_vision comparar base.json onnx.json
+    python -m tools.benchmark_vision imgsz --imagenes datos/portería --tamanos 320 416 512 640 --roi 0.25,0.4,0.75,0.9
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.config import get_settings
+from app.vision.captura import decodificar_imagen
+from app.vision.lector_placas import LectorPlacas
+from app.vision.metricas import cronometrar
+from app.vision.roi import parsear_roi
+from app.vision.votacion import distancia_edicion, formatear_placa
+from tools.benchmark_ocr import etiquetas_csv
+
+ETAPAS = ("decode", "detect", "crop", "preprocess", "ocr", "format", "persist")
+EXTENSIONES = (".jpg", ".jpeg", ".png", ".webp")
+PLACA_EN_NOMBRE = re.compile(r"^([A-Za-z]{3})[-_ ]?(\d{3})")
+
+
+def cargar_etiquetas(carpeta: str):
+    """Lista de (ruta, placa) de la carpeta."""
+    ruta_csv = os.path.join(carpeta, "etiquetas.csv")
+    if os.path.exists(ruta_csv):
+        return list(etiquetas_csv(ruta_csv))
+
+    muestras = []
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "*"))):
+        if not ruta.lower().endswith(EXTENSIONES):
+            continue
+        m = PLACA_EN_NOMBRE.match(os.path.basename(ruta))
+        if m:
+            muestras.append((ruta, (m.group(1) + m.group(2)).upper()))
+    return muestras
+
+
+class Persistencia:
+    """BD SQLite y carpetas temporales: mide guardar la lectura sin tocar app.db."""
+
+    def __init__(self) -> None:
+        from sqlmodel import SQLModel, Session, create_engine
+        from app.models.camara import Camara
+        from app.models.lectura_placa import LecturaPlaca
+
+        self._Session = Session
+        self._LecturaPlaca = LecturaPlaca
+        self.dir = tempfile.mkdtemp(prefix="benchmark_vision_")
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.dir, 'bench.db')}")
+        SQLModel.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            camara = Camara(nombre="benchmark")
+            session.add(camara)
+            session.commit()
+            self.camara_id = camara.id
+
+    def guardar(self, lector, frame, lecturas, recortes, procesadas) -> None:
+        ruta_full, rutas_rec = lector.guardar_imagenes(frame, recortes, procesadas)
+        with self._Session(self.engine) as session:
+            for (texto, conf), fut in zip(lecturas, rutas_rec):
+                session.add(self._LecturaPlaca(
+                    camara_id=self.camara_id,
+                    placa_detectada=texto,
+                    confianza=conf,
+                    ruta_imagen=ruta_full.result() if ruta_full else None,
+                    ruta_recorte=fut.result() if fut else None,
+                ))
+            session.commit()
+
+    def cerrar(self) -> None:
+        self.engine.dispose()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def crear_lector(args, dir_salida: str) -> LectorPlacas:
+    cfg = get_settings()
+    if args.detector:
+        cfg = cfg.model_copy(update={"detector_backend": args.detector})
+    if args.ocr:
+        cfg = cfg.model_copy(update={"ocr_backend": args.ocr})
+    if args.imgsz:
+        cfg = cfg.model_copy(update={"detector_imgsz": args.imgsz})
+    lector = LectorPlacas(
+        guardar_img=args.persistir,
+        nivel_procesamiento=0.4,
+        niveles_cascada=args.niveles if args.niveles else cfg.procesamiento_niveles,
+        cascada_min_confianza=cfg.procesamiento_min_confianza,
+        dir_capturas=os.path.join(dir_salida, "capturas"),
+        dir_procesadas=os.path.join(dir_salida, "procesadas"),
+        model_path=cfg.ruta_detector(),
+        detector_backend=cfg.detector_backend,
+        detector_opciones=cfg.opciones_detector(),
+        ocr_backend=cfg.ocr_backend,
+        ocr_opciones=cfg.opciones_ocr(),
+        formato_img=cfg.imagenes_formato,
+        calidad_img=cfg.imagenes_calidad,
+        cache_max=cfg.ocr_cache_max if args.cache else 0,
+    )
+    lector.calentar_detector()
+    lector.calentar_ocr()
+    return lector
+
+
+def medir_imagen(lector, datos: bytes, persistencia, roi=None):
+    """Una pasada del pipeline. Devuelve ({etapa: ms}, [(texto, conf), ...])."""
+    tiempos = {}
+    t = time.perf_counter()
+
+    def marcar(etapa):
+        nonlocal t
+        ahora = time.perf_counter()
+        tiempos[etapa] = (ahora - t) * 1000
+        t = ahora
+
+    frame = decodificar_imagen(datos)
+    marcar("decode")
+    if frame is None:
+        return tiempos, None
+
+    cajas = lector.detectar_en_roi(frame, roi)
+    marcar("detect")
+    detecciones = lector.recortar_placas(frame, cajas)
+    marcar("crop")
+    if not detecciones:
+        return tiempos, []
+
+    recortes = [d[0] for d in detecciones]
+    # La cascada alterna preprocesado y OCR: se separan con el cronómetro del lector
+    with cronometrar() as crono:
+        leidas = lector.leer_recortes(recortes)
+    tiempos["preprocess"] = crono.tiempos.get("preprocess", 0.0)
+    tiempos["ocr"] = crono.tiempos.get("ocr", 0.0) + crono.tiempos.get("ocr_cache", 0.0)
+    t = time.perf_counter()
+    procesadas = [l[0] for l in leidas]
+    lecturas = [
+        (formatear_placa(texto), conf) if texto is not None else ("NO LEIDO", 0.0)
+        for _, texto, conf, _ in leidas
+    ]
+    marcar("format")
+    if persistencia is not None:
+        persistencia.guardar(lector, frame, lecturas, recortes, procesadas)
+        marcar("persist")
+    return tiempos, lecturas
+
+
+def _percentiles(valores) -> dict:
+    if not valores:
+        return {"n": 0}
+    v = np.array(valores)
+    return {
+        "n": int(v.size),
+        "p50": round(float(np.percentile(v, 50)), 3),
+        "p95": round(float(np.percentile(v, 95)), 3),
+        "p99": round(float(np.percentile(v, 99)), 3),
+        "promedio": round(float(v.mean()), 3),
+    }
+
+
+def medir(args) -> dict:
+    muestras = cargar_etiquetas(args.imagenes)
+    if args.limite:
+        muestras = muestras[:args.limite]
+    if not muestras:
+        raise SystemExit(f"[!] No hay imágenes etiquetadas en {args.imagenes}")
+    # Se lee de disco antes de medir: decode parte de los bytes, como en /imagen
+    datos = []
+    for ruta, placa in muestras:
+        with open(ruta, "rb") as f:
+            datos.append((os.path.basename(ruta), f.read(), placa))
+
+    persistencia = Persistencia() if args.persistir else None
+    dir_salida = persistencia.dir if persistencia else tempfile.gettempdir()
+    lector = crear_lector(args, dir_salida)
+    roi = parsear_roi(args.roi)
+
+    por_etapa = {etapa: [] for etapa in ETAPAS}
+    totales = []
+    exactas, detectadas, dist_total, chars_total = 0, 0, 0, 0
+    errores = []
+    try:
+        inicio_reloj, inicio_cpu = time.perf_counter(), time.process_time()
+        for repeticion in range(args.repeticiones):
+            for nombre, contenido, placa in datos:
+                tiempos, lecturas = medir_imagen(lector, contenido, persistencia, roi)
+                for etapa, ms in tiempos.items():
+                    por_etapa[etapa].append(ms)
+                totales.append(sum(tiempos.values()))
+                if repeticion > 0:
+                    continue   # la exactitud no cambia entre repeticiones
+
+                leida = ""
+                if lecturas:
+                    detectadas += 1
+                    leida = re.sub(r"[^A-Z0-9]", "", lecturas[0][0])   # la mejor placa del frame
+                exactas += leida == placa
+                dist_total += distancia_edicion(leida, placa)
+                chars_total += len(placa)
+                if leida != placa:
+                    errores.append({"archivo": nombre, "esperada": placa, "leida": leida or None})
+        reloj = time.perf_counter() - inicio_reloj
+        cpu = time.process_time() - inicio_cpu
+    finally:
+        lector.cerrar()
+        if persistencia is not None:
+            persistencia.cerrar()
+
+    procesadas = len(totales)
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "imagenes": len(datos),
+            "repeticiones": args.repeticiones,
+            "detector": lector.detector_backend,
+            "modelo": lector.model_path,
+            "imgsz": lector.detector.imgsz,
+            "roi": args.roi,
+            "ocr": lector.ocr_backend,
+            "niveles_cascada": lector.niveles,
+            "cache_ocr": bool(args.cache),
+            "persistir": bool(args.persistir),
+            "cpu": platform.processor() or platform.machine(),
+            "nucleos": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "latencia_ms": {**{e: _percentiles(por_etapa[e]) for e in ETAPAS}, "total": _percentiles(totales)},
+        "rendimiento": {
+            "imagenes_por_s": round(procesadas / reloj, 3) if reloj else 0.0,
+            # Segundos de CPU de todos los hilos: normaliza por núcleos usados
+            "imagenes_por_s_cpu": round(procesadas / cpu, 3) if cpu else 0.0,
+        },
+        "exactitud": {
+            "deteccion": round(detectadas / len(datos), 4),
+            "placa": round(exactas / len(datos), 4),
+            "caracter": round(max(0.0, 1 - dist_total / chars_total), 4) if chars_total else 0.0,
+        },
+        "cascada": lector.estadisticas_cascada()["aciertos"],
+        "errores": errores,
+    }
+
+
+def _aplanar(d: dict, prefijo: str = "") -> dict:
+    plano = {}
+    for k, v in d.items():
+        clave = f"{prefijo}{k}"
+        if isinstance(v, dict):
+            plano.update(_aplanar(v, clave + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            plano[clave] = v
+    return plano
+
+
+def comparar(base: dict, nuevo: dict) -> None:
+    """Imprime cada métrica numérica con su diferencia (la latencia baja es mejor, la exactitud alta)."""
+    a, b = _aplanar(base), _aplanar(nuevo)
+    print(f"{'métrica':<32}{'base':>12}{'nuevo':>12}{'cambio':>10}")
+    for clave in sorted(a.keys() & b.keys()):
+        if clave.startswith("meta.") or clave.endswith(".n"):
+            continue
+        va, vb = a[clave], b[clave]
+        cambio = f"{(vb - va) / va * 100:+.1f}%" if va else "-"
+        print(f"{clave:<32}{va:>12.3f}{vb:>12.3f}{cambio:>10}")
+    for campo in ("detector", "ocr", "niveles_cascada", "imagenes"):
+        if base["meta"].get(campo) != nuevo["meta"].get(campo):
+            print(f"[!] meta.{campo} distinto: {base['meta'].get(campo)} -> {nuevo['meta'].get(campo)}")
+
+
+def barrido_imgsz(args) -> dict:
+    """Un medir() por tamaño de entrada del detector: latencia de detect contra exactitud."""
+    filas = {}
+    for tamano in args.tamanos:
+        args.imgsz = tamano
+        reporte = medir(args)
+        filas[str(tamano)] = {
+            "detect_ms": reporte["latencia_ms"]["detect"],
+            "total_ms": reporte["latencia_ms"]["total"],
+            "exactitud": reporte["exactitud"],
+        }
+    print(f"{'imgsz':>6}{'detect p50':>12}{'detect p95':>12}{'total p50':>12}{'deteccion':>11}{'placa':>8}{'caracter':>10}")
+    for tamano, f in filas.items():
+        d, t, e = f["detect_ms"], f["total_ms"], f["exactitud"]
+        print(f"{tamano:>6}{d.get('p50', 0):>12.2f}{d.get('p95', 0):>12.2f}{t.get('p50', 0):>12.2f}"
+              f"{e['deteccion']:>11.3f}{e['placa']:>8.3f}{e['caracter']:>10.3f}")
+    return {"roi": args.roi, "detector": args.detector or get_settings().detector_backend, "imgsz": filas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline del pipeline de placas")
+    sub = parser.add_subparsers(dest="accion", required=True)
+
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("--imagenes", required=True, help="Carpeta con las fotos (y opcionalmente etiquetas.csv)")
+    comunes.add_argument("--salida", help="Archivo JSON del reporte (si no, se imprime)")
+    comunes.add_argument("--detector", choices=["torch", "onnx"], help="Por defecto el de la configuración")
+    comunes.add_argument("--ocr", choices=["easyocr", "segmentacion"], help="Por defecto el de la configuración")
+    comunes.add_argument("--niveles", type=float, nargs="+",
+                         help="Cascada de niveles a probar en orden (p.ej. 0 0.4 1); un solo valor = nivel fijo")
+    comunes.add_argument("--roi", help="Zona 'x1,y1,x2,y2' (fracciones) donde detectar, como Camara.roi_deteccion")
+    comunes.add_argument("--repeticiones", type=int, default=3)
+    comunes.add_argument("--limite", type=int, default=0, help="Usa solo las primeras N imágenes")
+    comunes.add_argument("--cache", action="store_true", help="Deja activa la cache de OCR")
+    comunes.add_argument("--sin-persistir", dest="persistir", action="store_false",
+                         help="No mide la escritura de imágenes ni la BD")
+
+    p_medir = sub.add_parser("medir", parents=[comunes], help="Corre el pipeline sobre una carpeta etiquetada")
+    p_medir.add_argument("--imgsz", type=int, help="Lado de entrada del detector (por defecto DETECTOR_IMGSZ)")
+
+    p_imgsz = sub.add_parser("imgsz", parents=[comunes], help="Latencia del detector contra exactitud por imgsz")
+    p_imgsz.add_argument("--tamanos", type=int, nargs="+", default=[320, 416, 512, 640],
+                         help="Lados a probar (múltiplos de 32; un ONNX exportado sin dynamic ignora esto)")
+
+    p_comparar = sub.add_parser("comparar", help="Diferencias entre dos reportes")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo")
+    args = parser.parse_args()
+
+    if args.accion == "comparar":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.nuevo, encoding="utf-8") as f:
+            nuevo = json.load(f)
+        comparar(base, nuevo)
+        return
+
+    if args.accion == "imgsz":
+        reporte = barrido_imgsz(args)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(json.dumps(reporte, indent=2, sort_keys=True, ensure_ascii=False) + "\n")
+            print(f"[+] Reporte guardado en {args.salida}")
+        return
+
+    reporte = medir(args)
+    texto = json.dumps(reporte, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+        print(f"[+] Reporte guardado en {args.salida}")
+        print(json.dumps({"latencia_ms.total": reporte["latencia_ms"]["total"], **reporte["exactitud"]}, indent=2))
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Exporta license_plate_detector.pt a ONNX (y opcionalmente a INT8) para el
+backend "onnx" del detector.
+
+Uso (desde la raíz del proyecto):
+    python -m tools.exportar_detector
+    python -m tools.exportar_detector --int8 --imgsz 640
+"""
+import argparse
+import os
+import shutil
+
+MODELO_PT = "app/vision/modelo/license_plate_detector.pt"
+
+
+def exportar_onnx(ruta_pt: str, imgsz: int) -> str:
+    from ultralytics import YOLO
+    # dynamic=True deja el tamaño de lote libre para los micro-lotes
+    ruta = YOLO(ruta_pt).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    destino = os.path.splitext(ruta_pt)[0] + ".onnx"
+    if os.path.abspath(ruta) != os.path.abspath(destino):
+        shutil.move(ruta, destino)
+    return destino
+
+
+def cuantizar_int8(ruta_onnx: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    base, ext = os.path.splitext(ruta_onnx)
+    destino = f"{base}.int8{ext}"
+    quantize_dynamic(ruta_onnx, destino, weight_type=QuantType.QUInt8)
+    return destino
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta el detector de placas a ONNX / INT8")
+    parser.add_argument("--modelo", default=MODELO_PT)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true", help="Genera también la versión cuantizada INT8")
+    args = parser.parse_args()
+
+    ruta_onnx = exportar_onnx(args.modelo, args.imgsz)
+    print(f"[+] ONNX: {ruta_onnx} ({os.path.getsize(ruta_onnx) / 1e6:.1f} MB)")
+
+    if args.int8:
+        ruta_int8 = cuantizar_int8(ruta_onnx)
+        print(f"[+] INT8: {ruta_int8} ({os.path.getsize(ruta_int8) / 1e6:.1f} MB)")
+
+    print("[+] Verifica la paridad con: python -m tools.paridad_detector --imagenes <carpeta>")
+
+
+if __name__ == "__main__":
+    main()
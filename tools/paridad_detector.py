@@ -0,0 +1,71 @@
+"""
+Compara las cajas del detector PyTorch contra un backend exportado sobre una
+carpeta de imágenes de muestra, y mide la latencia de cada uno.
+
+Uso (desde la raíz del proyecto):
+    python -m tools.paridad_detector --imagenes app/vision/capturas/muestras
+    python -m tools.paridad_detector --imagenes <carpeta> --candidato app/vision/modelo/license_plate_detector.int8.onnx
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from app.vision.detectores import DetectorONNX, DetectorYOLO, comparar_detectores
+
+EXTENSIONES = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def cargar_imagenes(carpeta: str):
+    rutas = sorted(
+        r for r in glob.glob(os.path.join(carpeta, "**", "*"), recursive=True)
+        if r.lower().endswith(EXTENSIONES)
+    )
+    imagenes = [cv2.imread(r) for r in rutas]
+    return [img for img in imagenes if img is not None]
+
+
+def latencia_ms(detector, imagenes) -> float:
+    inicio = time.perf_counter()
+    for img in imagenes:
+        detector.detectar_lote([img])
+    return (time.perf_counter() - inicio) * 1000 / max(1, len(imagenes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad de cajas entre backends del detector")
+    parser.add_argument("--imagenes", required=True, help="Carpeta con imágenes de muestra")
+    parser.add_argument("--referencia", default="app/vision/modelo/license_plate_detector.pt")
+    parser.add_argument("--candidato", default="app/vision/modelo/license_plate_detector.onnx")
+    parser.add_argument("--iou-min", type=float, default=0.5)
+    parser.add_argument("--recall-min", type=float, default=0.98,
+                        help="Recall mínimo aceptable del candidato (código de salida 1 si no se cumple)")
+    args = parser.parse_args()
+
+    imagenes = cargar_imagenes(args.imagenes)
+    if not imagenes:
+        print(f"[!] No hay imágenes en {args.imagenes}")
+        sys.exit(2)
+
+    ref = DetectorYOLO(args.referencia)
+    cand = DetectorONNX(args.candidato)
+    ref.calentar()
+    cand.calentar()
+
+    reporte = comparar_detectores(ref, cand, imagenes, iou_min=args.iou_min)
+    reporte["latencia_ms_referencia"] = latencia_ms(ref, imagenes)
+    reporte["latencia_ms_candidato"] = latencia_ms(cand, imagenes)
+    print(json.dumps(reporte, indent=2))
+
+    if reporte["recall"] < args.recall_min:
+        print(f"[!] Paridad insuficiente: recall {reporte['recall']:.3f} < {args.recall_min}")
+        sys.exit(1)
+    print("[+] Paridad OK")
+
+
+if __name__ == "__main__":
+    main()
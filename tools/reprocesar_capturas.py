@@ -0,0 +1,270 @@
+"""
+Re-lee las capturas históricas (LecturaPlaca.ruta_imagen) con el modelo y el
+preprocesado actuales y compara contra la placa guardada. Sirve después de
+reentrenar license_plate_detector.pt o de cambiar la cascada de preprocesado.
+
+Las rutas salen de la BD por id creciente, en páginas (no se cargan todas) y se
+reparten en un pool de procesos con un LectorPlacas por proceso. De cada imagen
+se quita el panel con el recorte que se guardó junto al frame (si no, YOLO lo
+encuentra como una placa más) y se lee con la zona de detección de su cámara. El reporte es
+un JSONL, una línea por imagen, escrito en orden de id a medida que avanza:
+si se interrumpe, correr el mismo comando continúa después de la última
+imagen escrita. Con --aplicar también se corrigen las lecturas en la BD (el
+texto anterior queda en el reporte).
+
+Uso (desde la raíz del proyecto):
+    python -m tools.reprocesar_capturas --salida reproceso.jsonl
+    python -m tools.reprocesar_capturas --salida onnx.jsonl --detector onnx --workers 4
+    python -m tools.reprocesar_capturas --salida nuevo.jsonl --modelo runs/best.pt --aplicar --min-confianza 0.7
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from sqlmodel import Session, col, select
+
+from app.config import get_settings
+from app.db import engine
+from app.models.camara import Camara
+from app.models.lectura_placa import LecturaPlaca
+from app.vision.almacen_imagenes import SUFIJO_COMPACTA, frame_de_captura
+from app.vision.indice_placas import normalizar_placa
+from app.vision.roi import parsear_roi
+from app.vision.votacion import distancia_edicion
+
+SIN_TEXTO = ("NO DETECTADO", "NO LEIDO")
+
+_lector = None   # uno por proceso del pool
+
+
+# ---------------------- en cada proceso del pool ----------------------
+def _iniciar_worker(ajustes: dict, niveles, hilos: int, rois: dict) -> None:
+    global _lector
+    import cv2
+    from app.vision.lector_placas import LectorPlacas
+
+    # Un proceso por núcleo: cada uno con pocos hilos para no competir entre sí
+    cv2.setNumThreads(hilos)
+    cfg = get_settings().model_copy(update=ajustes)
+    if cfg.detector_backend == "torch":
+        import torch
+        torch.set_num_threads(hilos)
+    _lector = LectorPlacas(
+        guardar_img=False,
+        nivel_procesamiento=0.4,
+        niveles_cascada=niveles or cfg.procesamiento_niveles,
+        cascada_min_confianza=cfg.procesamiento_min_confianza,
+        model_path=cfg.ruta_detector(),
+        detector_backend=cfg.detector_backend,
+        detector_opciones=cfg.opciones_detector(),
+        ocr_backend=cfg.ocr_backend,
+        ocr_opciones=cfg.opciones_ocr(),
+        cache_max=0,    # cada imagen es distinta: la cache solo estorba
+        rois=rois,
+    )
+    _lector.calentar_detector()
+    _lector.calentar_ocr()
+
+
+def reprocesar(ruta: str, camara_id: int) -> dict:
+    import cv2
+
+    img = cv2.imread(ruta, cv2.IMREAD_COLOR)
+    if img is None:
+        return {"estado": "ERR_ARCHIVO", "lecturas": []}
+    resultado = _lector.leer_placas(frame_de_captura(img, ruta), camara_id)
+    return {
+        "estado": resultado["estado"],
+        "lecturas": [(l["placa"], round(l["confianza"], 4), l["nivel_procesamiento"]) for l in resultado["lecturas"]],
+    }
+
+
+# ---------------------- en el proceso principal ----------------------
+def filas_con_imagen(desde_id: int, hasta_id: int | None, camara_id: int | None, pagina: int = 500):
+    """(id, ruta_imagen, placa_detectada, confianza, camara_id) por id creciente, paginado por id."""
+    ultimo = desde_id
+    while True:
+        stmt = select(
+            LecturaPlaca.id, LecturaPlaca.ruta_imagen, LecturaPlaca.placa_detectada, LecturaPlaca.confianza,
+            LecturaPlaca.camara_id,
+        ).where(
+            LecturaPlaca.id > ultimo, col(LecturaPlaca.ruta_imagen).is_not(None)
+        )
+        if hasta_id is not None:
+            stmt = stmt.where(LecturaPlaca.id <= hasta_id)
+        if camara_id is not None:
+            stmt = stmt.where(LecturaPlaca.camara_id == camara_id)
+        with Session(engine) as session:
+            filas = session.exec(stmt.order_by(LecturaPlaca.id).limit(pagina)).all()
+        if not filas:
+            return
+        yield from filas
+        ultimo = filas[-1][0]
+
+
+def imagenes(filas):
+    """Agrupa las filas de un mismo frame (se guardan seguidas, una por placa)."""
+    for ruta, grupo in groupby(filas, key=lambda f: f[1]):
+        yield ruta, list(grupo)
+
+
+def comparar_lecturas(filas, nuevas) -> tuple[list[dict], list]:
+    """
+    Empareja cada fila guardada con la lectura nueva más parecida.
+    Devuelve (entradas por fila, lecturas nuevas que no corresponden a ninguna fila).
+    """
+    libres = list(nuevas)
+    entradas = []
+    for lectura_id, _, antes, conf_antes, _ in filas:
+        despues = None
+        if libres:
+            clave = normalizar_placa(antes) if antes not in SIN_TEXTO else ""
+            despues = min(libres, key=lambda l: distancia_edicion(clave, normalizar_placa(l[0])))
+            libres.remove(despues)
+        entradas.append({
+            "id": lectura_id,
+            "antes": antes,
+            "confianza_antes": round(conf_antes, 4),
+            "despues": despues[0] if despues else None,
+            "confianza_despues": despues[1] if despues else None,
+            "nivel": despues[2] if despues else None,
+            "cambio": despues is not None and despues[0] != antes,
+        })
+    return entradas, libres
+
+
+def aplicar(entradas: list[dict], min_confianza: float) -> int:
+    """Corrige en la BD las filas cuyo texto nuevo es legible y confiable; nunca empeora a 'sin lectura'."""
+    aplicadas = 0
+    with Session(engine) as session:
+        for e in entradas:
+            e["aplicada"] = False
+            if not e["cambio"] or e["despues"] in SIN_TEXTO or e["confianza_despues"] < min_confianza:
+                continue
+            lectura = session.get(LecturaPlaca, e["id"])
+            if lectura is None:
+                continue
+            lectura.placa_detectada = e["despues"]
+            lectura.confianza = e["confianza_despues"]
+            lectura.nivel_procesamiento = e["nivel"]
+            session.add(lectura)
+            e["aplicada"] = True
+            aplicadas += 1
+        session.commit()
+    return aplicadas
+
+
+def ultimo_id_escrito(ruta: str) -> int:
+    """
+    Mayor id ya reportado en `ruta`. Si el proceso murió a mitad de una línea,
+    la recorta para que el archivo siga siendo JSONL válido.
+    """
+    if not os.path.exists(ruta):
+        return 0
+    ultimo, valido_hasta = 0, 0
+    with open(ruta, "rb") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                break
+            ultimo = max([ultimo] + [e["id"] for e in registro["lecturas"]])
+            valido_hasta = f.tell()
+    if valido_hasta < os.path.getsize(ruta):
+        with open(ruta, "r+b") as f:
+            f.truncate(valido_hasta)
+    return ultimo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-lee las capturas guardadas y compara con las lecturas en BD")
+    parser.add_argument("--salida", required=True, help="Reporte JSONL (se continúa si ya existe)")
+    parser.add_argument("--reiniciar", action="store_true", help="Borra el reporte y empieza desde el principio")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos (un modelo en cada uno)")
+    parser.add_argument("--hilos", type=int, default=1, help="Hilos de OpenCV/torch por proceso")
+    parser.add_argument("--detector", choices=["torch", "onnx"], help="Por defecto el de la configuración")
+    parser.add_argument("--modelo", help="Ruta del modelo a probar (.pt o .onnx según --detector)")
+    parser.add_argument("--niveles", type=float, nargs="+", help="Cascada de preprocesado (p.ej. 0 0.4 1)")
+    parser.add_argument("--camara", type=int, help="Solo lecturas de esta cámara")
+    parser.add_argument("--desde-id", type=int, default=0, help="Empieza después de este id de LecturaPlaca")
+    parser.add_argument("--hasta-id", type=int)
+    parser.add_argument("--aplicar", action="store_true", help="Corrige placa_detectada/confianza en la BD")
+    parser.add_argument("--min-confianza", type=float, default=0.6, help="Confianza mínima para --aplicar")
+    args = parser.parse_args()
+
+    if args.reiniciar and os.path.exists(args.salida):
+        os.remove(args.salida)
+    desde = max(args.desde_id, ultimo_id_escrito(args.salida))
+    if desde > args.desde_id:
+        print(f"[i] Continuando después de la lectura {desde}")
+
+    ajustes = {"detector_hilos": args.hilos}
+    if args.detector:
+        ajustes["detector_backend"] = args.detector
+    if args.modelo:
+        backend = args.detector or get_settings().detector_backend
+        ajustes["detector_onnx_modelo" if backend == "onnx" else "detector_modelo"] = args.modelo
+        ajustes["detector_int8"] = False
+
+    # Zona de detección de cada cámara, igual que en vivo (las fracciones valen para el frame sin panel)
+    with Session(engine) as session:
+        rois = {c.id: parsear_roi(c.roi_deteccion) for c in session.exec(select(Camara))}
+
+    conteo = {"imagenes": 0, "filas": 0, "cambios": 0, "aplicadas": 0, "errores": 0}
+    ventana = max(1, args.workers) * 4     # trabajos en vuelo: acota la memoria y permite escribir en orden
+    pendientes = deque()
+    inicio = time.perf_counter()
+
+    def escribir(salida, ruta, filas, fut) -> None:
+        resultado = fut.result()
+        entradas, sobrantes = comparar_lecturas(filas, resultado["lecturas"])
+        if args.aplicar:
+            conteo["aplicadas"] += aplicar(entradas, args.min_confianza)
+        salida.write(json.dumps({
+            "ruta": ruta,
+            "compactada": ruta.endswith(SUFIJO_COMPACTA),
+            "estado": resultado["estado"],
+            "lecturas": entradas,
+            "sin_fila": sobrantes,
+        }, ensure_ascii=False) + "\n")
+        salida.flush()
+        conteo["imagenes"] += 1
+        conteo["filas"] += len(entradas)
+        conteo["cambios"] += sum(e["cambio"] for e in entradas)
+        conteo["errores"] += resultado["estado"] == "ERR_ARCHIVO"
+        if conteo["imagenes"] % 100 == 0:
+            ritmo = conteo["imagenes"] / (time.perf_counter() - inicio)
+            print(f"  {conteo['imagenes']} imágenes ({ritmo:.1f}/s), {conteo['cambios']} cambios, hasta id {filas[-1][0]}")
+
+    # spawn: cada proceso importa torch/EasyOCR limpio (sin hilos ni conexiones heredadas)
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_iniciar_worker,
+        initargs=(ajustes, args.niveles, args.hilos, rois),
+    )
+    try:
+        with open(args.salida, "a", encoding="utf-8") as salida:
+            for ruta, filas in imagenes(filas_con_imagen(desde, args.hasta_id, args.camara)):
+                pendientes.append((ruta, filas, pool.submit(reprocesar, ruta, filas[0][4])))
+                if len(pendientes) >= ventana:
+                    escribir(salida, *pendientes.popleft())
+            while pendientes:
+                escribir(salida, *pendientes.popleft())
+    except KeyboardInterrupt:
+        print("\n[!] Interrumpido: vuelve a correr el mismo comando para continuar")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    duracion = time.perf_counter() - inicio
+    print(json.dumps({**conteo, "duracion_s": round(duracion, 1)}, indent=2))
+    print(f"[+] Reporte en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()